@@ -18,6 +18,8 @@ DATA_RAW_PATH = os.path.join(BASE_DIR, 'data', 'raw')
 ANOMALY_DATA_PATH = os.path.join(BASE_DIR, 'data', 'anomaly')
 DATA_PROCESSED_PATH = os.path.join(BASE_DIR, 'data', 'processed')
 DATA_OUTLIERS_PATH = os.path.join(BASE_DIR, 'data', 'outliers')
+FEATURE_STORE_PATH = os.path.join(BASE_DIR, 'data', 'features')  # Cache fitur per hash konten
+FEATURE_STORE_DTYPE = 'float32'  # 'float16' memperkecil cache fitur setengahnya (presisi relatif ~5e-4)
 
 # Path untuk model dan hasil eksperimen
 SAVED_MODEL_PATH = os.path.join(BASE_DIR, 'saved_models', 'svm_model.pkl')
@@ -38,6 +40,10 @@ HOG_ORIENTATIONS = 9          # Jumlah bins orientasi gradien
 HOG_PIXELS_PER_CELL = (8, 8)  # Ukuran sel dalam piksel
 HOG_CELLS_PER_BLOCK = (2, 2)  # Jumlah sel dalam satu blok
 
+# Tingkat keabuan GLCM (256 = tanpa kuantisasi). 64 atau 32 jauh lebih cepat,
+# tetapi mengubah fitur GLCM sehingga model harus dilatih ulang.
+GLCM_LEVELS = 256
+
 
 # =============================================================================
 # PENGATURAN PELATIHAN MODEL
@@ -45,6 +51,17 @@ HOG_CELLS_PER_BLOCK = (2, 2)  # Jumlah sel dalam satu blok
 TEST_SIZE = 0.2     # Proporsi dataset yang akan digunakan sebagai data uji
 RANDOM_STATE = 42   # Seed untuk reproduktifitas
 
+# Backend kernel klasifikasi: 'svc' (RBF eksak), 'nystroem', atau 'rff' (random Fourier features)
+MODEL_BACKEND = 'svc'
+KERNEL_APPROX_COMPONENTS = 1000  # Dimensi peta fitur kernel aproksimasi (akurasi vs kecepatan)
+
+
+# =============================================================================
+# PENGATURAN KOMPUTASI PARALEL
+# =============================================================================
+N_JOBS = -1               # Jumlah proses pekerja (-1 berarti semua core CPU)
+FEATURE_CHUNK_SIZE = 64   # Jumlah gambar per potongan yang dikirim ke pekerja
+
 
 # =============================================================================
 # KELAS DATASET
@@ -0,0 +1,261 @@
+"""Augmentasi data latih yang malas (lazy) dan deterministik.
+
+Notebook pelatihan sebelumnya membentuk setiap varian augmentasi (asli, flip
+horizontal, rotasi acak, sharpening) sebagai gambar resolusi penuh, lalu
+menyalin semuanya ke array objek sebelum ekstraksi fitur dimulai, sehingga
+puncak memori berlipat sesuai jumlah varian. Modul ini menggantinya dengan
+`AugmentedView`: catatan kecil berisi referensi ke gambar sumber, nama
+augmentasi, dan sudut rotasinya. Tidak ada piksel yang disalin sampai
+ekstraksi fitur.
+
+Augmentasi dibagi menurut tempat penerapannya terhadap resize ke `IMAGE_SIZE`:
+
+- `RESIZED_OPS` ('original', 'hflip', 'rotate') diterapkan setelah resize,
+  di dalam proses pekerja. Untuk sumber yang lebih besar dari `IMAGE_SIZE`,
+  flip komutatif dengan resize INTER_AREA (paling banyak selisih pembulatan
+  +-1 pada segelintir piksel) dan rotasi memakai matriks affine yang
+  dikoreksi rasio aspek sumber (S R S^-1), sehingga geometrinya sama dengan
+  rotasi pada resolusi sumber.
+- `SOURCE_OPS` ('sharpen') tidak komutatif dengan resize sehingga diterapkan
+  pada gambar sumber sebelum resize, satu gambar setiap kali.
+
+Notebook pelatihan memuat dataset dengan
+`stream_images_from_folder(..., target_size=IMAGE_SIZE)`, sehingga gambar
+sumber sudah berukuran 128x128: sharpening berjalan pada gambar 128x128,
+resize menjadi no-op, dan rotasi adalah rotasi biasa pada gambar 128x128
+yang rasio aspek aslinya sudah dipaksa persegi saat pemuatan.
+
+Sudut rotasi setiap sampel diturunkan dari `(random_state, indeks sampel)`,
+sehingga hasilnya sama berapa pun jumlah pekerja, ukuran potongan, atau
+urutan pemrosesan.
+"""
+
+import cv2
+import numpy as np
+
+from src.configs.config import IMAGE_SIZE, RANDOM_STATE
+
+
+AUGMENTATIONS = ('original', 'hflip', 'rotate', 'sharpen')
+RESIZED_OPS = ('original', 'hflip', 'rotate')
+SOURCE_OPS = ('sharpen',)
+MAX_ROTATION = 15.0
+
+# Naikkan versi ini jika implementasi augmentasi berubah (memengaruhi kunci cache fitur).
+AUGMENTATION_VERSION = 1
+
+SHARPEN_KERNEL = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+
+
+class AugmentedView:
+    """Referensi malas ke satu varian augmentasi dari gambar sumber.
+
+    Attributes:
+        source (np.ndarray): Gambar BGR uint8 sumber (tidak disalin).
+        op (str): Nama augmentasi (salah satu dari `AUGMENTATIONS`).
+        angle (float): Sudut rotasi dalam derajat (hanya dipakai oleh 'rotate').
+    """
+
+    __slots__ = ('source', 'op', 'angle')
+
+    def __init__(self, source, op='original', angle=0.0):
+        if op not in AUGMENTATIONS:
+            raise ValueError(f"Augmentasi tidak dikenal: {op}")
+        self.source = source
+        self.op = op
+        self.angle = float(angle)
+
+    def __repr__(self):
+        return f"AugmentedView(op={self.op!r}, angle={self.angle:.3f}, shape={self.source.shape})"
+
+    def base(self):
+        """Gambar sumber setelah augmentasi tingkat sumber (`SOURCE_OPS`), sebelum resize."""
+        if self.op == 'sharpen':
+            return cv2.filter2D(self.source, -1, SHARPEN_KERNEL)
+        return self.source
+
+    def render(self, image_size=IMAGE_SIZE):
+        """Membentuk gambar augmentasi berukuran `image_size` (untuk inspeksi atau visualisasi)."""
+        resized = cv2.resize(self.base(), image_size, interpolation=cv2.INTER_AREA)
+        return apply_resized_op(resized, self.op, self.angle, self.source.shape[:2])
+
+
+def rotation_angle(index, random_state=RANDOM_STATE, max_angle=MAX_ROTATION):
+    """Sudut rotasi deterministik untuk sampel ke-`index`.
+
+    Args:
+        index (int): Indeks global gambar sumber.
+        random_state (int): Seed dasar.
+        max_angle (float): Sudut maksimum (derajat); sudut diambil seragam dari [-max_angle, max_angle).
+
+    Returns:
+        float: Sudut rotasi dalam derajat.
+    """
+    return float(np.random.default_rng((random_state, index)).uniform(-max_angle, max_angle))
+
+
+def apply_resized_op(image, op, angle=0.0, source_shape=None):
+    """Menerapkan augmentasi `RESIZED_OPS` pada gambar yang sudah di-resize.
+
+    Args:
+        image (np.ndarray): Gambar BGR uint8 hasil resize.
+        op (str): Nama augmentasi; augmentasi `SOURCE_OPS` diperlakukan sebagai 'original'.
+        angle (float): Sudut rotasi dalam derajat.
+        source_shape (tuple, optional): (tinggi, lebar) gambar sumber untuk koreksi
+                                        rasio aspek rotasi; None berarti sama dengan `image`.
+
+    Returns:
+        np.ndarray: Gambar hasil augmentasi dengan ukuran sama seperti `image`.
+    """
+    if op == 'hflip':
+        return cv2.flip(image, 1)
+    if op != 'rotate':
+        return image
+    height, width = image.shape[:2]
+    src_height, src_width = source_shape if source_shape is not None else (height, width)
+    # Rotasi di sekitar pusat gambar sumber, dipetakan ke koordinat gambar hasil resize.
+    rotation = np.vstack([cv2.getRotationMatrix2D((src_width // 2, src_height // 2), angle, 1.0), [0, 0, 1]])
+    scale = np.diag([width / src_width, height / src_height, 1.0])
+    matrix = (scale @ rotation @ np.linalg.inv(scale))[:2]
+    return cv2.warpAffine(image, matrix, (width, height))
+
+
+def apply_resized_ops(stack, ops, angles, source_shapes):
+    """Menerapkan `apply_resized_op` pada setiap gambar dalam tumpukan (in-place).
+
+    Args:
+        stack (np.ndarray): Tumpukan gambar uint8 (N, H, W, 3) yang dapat ditulis.
+        ops (sequence of str): Nama augmentasi per gambar.
+        angles (sequence of float): Sudut rotasi per gambar.
+        source_shapes (sequence of tuple): (tinggi, lebar) sumber per gambar.
+
+    Returns:
+        np.ndarray: `stack` yang sama setelah diaugmentasi.
+    """
+    for i, (op, angle, shape) in enumerate(zip(ops, angles, source_shapes)):
+        if op in ('hflip', 'rotate'):
+            stack[i] = apply_resized_op(stack[i], op, angle, shape)
+    return stack
+
+
+def augment_dataset(images, labels, augmentations=AUGMENTATIONS, random_state=RANDOM_STATE, start_index=0):
+    """Membentuk set latih teraugmentasi sebagai `AugmentedView` tanpa menyalin piksel.
+
+    Args:
+        images (sequence): Gambar BGR uint8 sumber.
+        labels (sequence): Label per gambar sumber.
+        augmentations (tuple of str): Varian yang dibentuk untuk setiap gambar, berurutan.
+        random_state (int): Seed dasar sudut rotasi.
+        start_index (int): Indeks global gambar pertama (untuk pemrosesan bertahap).
+
+    Returns:
+        tuple: (array objek `AugmentedView` berukuran N * len(augmentations),
+                array label yang sesuai). Varian satu gambar berada berurutan.
+    """
+    views, expanded = [], []
+    for offset, (image, label) in enumerate(zip(images, labels)):
+        angle = rotation_angle(start_index + offset, random_state) if 'rotate' in augmentations else 0.0
+        for op in augmentations:
+            views.append(AugmentedView(image, op, angle if op == 'rotate' else 0.0))
+            expanded.append(label)
+    X = np.empty(len(views), dtype=object)
+    X[:] = views
+    return X, np.asarray(expanded)
+
+
+def augment_stream(chunks, augmentations=AUGMENTATIONS, random_state=RANDOM_STATE):
+    """Membungkus aliran potongan dataset menjadi aliran potongan teraugmentasi.
+
+    Args:
+        chunks (iterable): Potongan (images, labels, filenames), misalnya dari
+                           `stream_images_from_folder`.
+        augmentations (tuple of str): Varian yang dibentuk untuk setiap gambar.
+        random_state (int): Seed dasar sudut rotasi.
+
+    Yields:
+        tuple: (array `AugmentedView`, label, nama file berakhiran '#<augmentasi>').
+    """
+    index = 0
+    for images, labels, filenames in chunks:
+        views, expanded = augment_dataset(images, labels, augmentations, random_state, start_index=index)
+        names = [f"{name}#{op}" for name in filenames for op in augmentations]
+        index += len(images)
+        yield views, expanded, names
+
+
+class StagingPlan:
+    """Rencana penyiapan gambar untuk ekstraksi fitur dari campuran gambar dan `AugmentedView`.
+
+    Setiap baris keluaran dipetakan ke satu "basis": gambar sumber setelah
+    augmentasi tingkat sumber. Basis yang sama (misalnya asli, flip, dan
+    rotasi dari satu foto) hanya di-resize sekali.
+
+    Attributes:
+        bases (list): Pasangan (gambar sumber, augmentasi tingkat sumber atau None) unik.
+        base_rows (np.ndarray): Indeks basis untuk setiap baris keluaran.
+        ops (list of str): Augmentasi per baris keluaran.
+        angles (np.ndarray): Sudut rotasi per baris keluaran.
+        source_shapes (list of tuple): (tinggi, lebar) sumber per baris keluaran.
+    """
+
+    def __init__(self, items):
+        self.bases, self.ops, self.source_shapes = [], [], []
+        base_ids, base_rows, angles = {}, [], []
+        for item in items:
+            view = item if isinstance(item, AugmentedView) else AugmentedView(item)
+            source_op = view.op if view.op in SOURCE_OPS else None
+            key = (id(view.source), source_op)
+            if key not in base_ids:
+                base_ids[key] = len(self.bases)
+                self.bases.append(view)
+            base_rows.append(base_ids[key])
+            self.ops.append(view.op)
+            angles.append(view.angle)
+            self.source_shapes.append(view.source.shape[:2])
+        self.base_rows = np.asarray(base_rows, dtype=np.int64)
+        self.angles = np.asarray(angles, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.base_rows)
+
+    def stage(self, buffer, rows=None, image_size=IMAGE_SIZE):
+        """Menulis basis (di-resize) ke `buffer`; satu basis dibentuk dan dilepas setiap kali.
+
+        Args:
+            buffer (np.ndarray): Tujuan uint8 (M, H, W, 3).
+            rows (sequence of int, optional): Indeks basis yang ditulis; default seluruhnya.
+            image_size (tuple): Ukuran gambar (lebar, tinggi).
+        """
+        width, height = image_size
+        for i, row in enumerate(range(len(self.bases)) if rows is None else rows):
+            image = self.bases[row].base()
+            if image.shape[:2] == (height, width):
+                buffer[i] = image
+            else:
+                cv2.resize(image, image_size, dst=buffer[i], interpolation=cv2.INTER_AREA)
+
+    def task(self, start, stop):
+        """Argumen per baris [start, stop) untuk pekerja: (indeks basis, augmentasi, sudut, bentuk sumber)."""
+        return (self.base_rows[start:stop], self.ops[start:stop],
+                self.angles[start:stop], self.source_shapes[start:stop])
+
+    def render(self, start, stop, buffer):
+        """Membentuk gambar augmentasi baris [start, stop) tanpa buffer basis bersama.
+
+        Args:
+            start (int): Baris awal.
+            stop (int): Baris akhir (eksklusif).
+            buffer (np.ndarray): Buffer kerja uint8 (>= stop - start, H, W, 3).
+
+        Returns:
+            np.ndarray: Tumpukan uint8 (stop - start, H, W, 3) siap diekstrak.
+        """
+        base_rows, ops, angles, shapes = self.task(start, stop)
+        unique, inverse = np.unique(base_rows, return_inverse=True)
+        self.stage(buffer, unique)
+        return apply_resized_ops(buffer[inverse.ravel()], ops, angles, shapes)
+
+
+def is_augmented(images):
+    """True jika `images` berisi setidaknya satu `AugmentedView`."""
+    return any(isinstance(item, AugmentedView) for item in images)
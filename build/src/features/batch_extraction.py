@@ -0,0 +1,260 @@
+"""Ekstraksi fitur tervektorisasi untuk tumpukan gambar.
+
+`extract_features` memproses satu gambar per panggilan dan setiap deskriptor
+mengonversi ulang gambar float ke uint8 secara terpisah. Modul ini
+menyediakan `extract_features_batch` yang menerima tumpukan gambar uint8
+berukuran N x 128 x 128 x 3, melakukan konversi uint8/float sekali saja,
+lalu menghitung deskriptor HSV, Lab, Sobel, GLCM, Gabor, dan HOG secara
+tervektorisasi untuk seluruh batch. LBP dan GLCM dihitung oleh mesin tekstur
+di `src.features.texture`. Hasilnya berupa matriks float32 N x D
+yang kontigu dengan urutan kolom sama seperti `extract_features`.
+"""
+
+import numpy as np
+import cv2
+
+from src.configs.config import IMAGE_SIZE, HOG_ORIENTATIONS, HOG_PIXELS_PER_CELL, HOG_CELLS_PER_BLOCK, GLCM_LEVELS
+from src.features.gabor import GABOR_BANK
+from src.features.texture import (
+    LBP_RADIUS, LBP_POINTS, GLCM_DISTANCES, GLCM_ANGLES, lbp_histogram_batch, glcm_features_batch
+)
+
+
+SOBEL_BINS = 32
+
+
+def preprocess_batch(images):
+    """Mengubah ukuran sekumpulan gambar mentah menjadi satu tumpukan uint8.
+
+    Args:
+        images (iterable): Gambar BGR uint8 dengan ukuran sembarang.
+
+    Returns:
+        np.ndarray: Tumpukan gambar berbentuk (N, tinggi, lebar, 3) bertipe uint8.
+    """
+    width, height = IMAGE_SIZE
+    resized = [cv2.resize(image, IMAGE_SIZE, interpolation=cv2.INTER_AREA) for image in images]
+    if not resized:
+        return np.empty((0, height, width, 3), dtype=np.uint8)
+    return np.ascontiguousarray(np.stack(resized))
+
+
+def feature_layout(image_size=IMAGE_SIZE):
+    """Menghitung posisi kolom setiap deskriptor di dalam vektor fitur gabungan.
+
+    Args:
+        image_size (tuple): Ukuran gambar (lebar, tinggi).
+
+    Returns:
+        dict: Pemetaan nama deskriptor ke `slice` kolomnya, sesuai urutan
+              `extract_features` ('hog', 'color_histogram', 'lbp', 'gabor',
+              'sobel', 'glcm', 'color_moments').
+    """
+    width, height = image_size
+    n_cells_row = height // HOG_PIXELS_PER_CELL[0]
+    n_cells_col = width // HOG_PIXELS_PER_CELL[1]
+    n_blocks = ((n_cells_row - HOG_CELLS_PER_BLOCK[0] + 1) *
+                (n_cells_col - HOG_CELLS_PER_BLOCK[1] + 1))
+    dims = [
+        ('hog', n_blocks * HOG_CELLS_PER_BLOCK[0] * HOG_CELLS_PER_BLOCK[1] * HOG_ORIENTATIONS),
+        ('color_histogram', 180 + 32 + 32),
+        ('lbp', LBP_POINTS + 2),
+        ('gabor', GABOR_BANK.n_features),
+        ('sobel', SOBEL_BINS),
+        ('glcm', 6 * len(GLCM_DISTANCES) * len(GLCM_ANGLES)),
+        ('color_moments', 9),
+    ]
+    layout, start = {}, 0
+    for name, dim in dims:
+        layout[name] = slice(start, start + dim)
+        start += dim
+    return layout
+
+
+def feature_dimension(image_size=IMAGE_SIZE):
+    """Menghitung panjang vektor fitur gabungan untuk ukuran gambar tertentu.
+
+    Args:
+        image_size (tuple): Ukuran gambar (lebar, tinggi).
+
+    Returns:
+        int: Jumlah kolom matriks fitur.
+    """
+    return feature_layout(image_size)['color_moments'].stop
+
+
+def _batch_bincount(values, n_bins):
+    """Menghitung histogram bilangan bulat per gambar dalam satu panggilan `bincount`.
+
+    Args:
+        values (np.ndarray): Array bilangan bulat berbentuk (N, ...) dengan nilai
+                             pada rentang [0, n_bins).
+        n_bins (int): Jumlah bin histogram.
+
+    Returns:
+        np.ndarray: Histogram berbentuk (N, n_bins).
+    """
+    n_images = values.shape[0]
+    flat = values.reshape(n_images, -1).astype(np.int64)
+    flat += (np.arange(n_images, dtype=np.int64) * n_bins)[:, None]
+    return np.bincount(flat.ravel(), minlength=n_images * n_bins).reshape(n_images, n_bins)
+
+
+def _l2_normalize_rows(hist):
+    """Normalisasi L2 per baris, setara dengan `cv2.normalize(hist, hist)`."""
+    norms = np.sqrt(np.sum(hist.astype(np.float64) ** 2, axis=1, keepdims=True))
+    return hist / np.where(norms > 0, norms, 1.0)
+
+
+def color_histogram_batch(hsv_stack):
+    """Histogram HSV (180 + 32 + 32 bin) ternormalisasi L2 untuk tumpukan gambar."""
+    hist_h = _l2_normalize_rows(_batch_bincount(hsv_stack[..., 0], 180))
+    hist_s = _l2_normalize_rows(_batch_bincount(hsv_stack[..., 1] >> 3, 32))
+    hist_v = _l2_normalize_rows(_batch_bincount(hsv_stack[..., 2] >> 3, 32))
+    return np.hstack([hist_h, hist_s, hist_v])
+
+
+def color_moments_batch(lab_stack):
+    """Mean, standar deviasi, dan skewness per kanal Lab untuk tumpukan gambar."""
+    n_images = lab_stack.shape[0]
+    channels = lab_stack.reshape(n_images, -1, 3).astype(np.float64)
+    mean = channels.mean(axis=1)
+    centered = channels - mean[:, None, :]
+    m2 = np.mean(centered ** 2, axis=1)
+    m3 = np.mean(centered ** 3, axis=1)
+    std = np.sqrt(m2)
+    # Skewness dianggap nol untuk kanal yang konstan.
+    skewness = np.where(std > 1e-6, m3 / np.where(m2 > 0, m2, 1.0) ** 1.5, 0.0)
+    return np.stack([mean, std, skewness], axis=2).reshape(n_images, 9)
+
+
+def sobel_histogram_batch(gray_stack):
+    """Histogram magnitudo Sobel (32 bin pada rentang [0, 256]) untuk tumpukan gambar.
+
+    Gradien dihitung sebagai bilangan bulat dengan tepi BORDER_REFLECT_101
+    seperti `cv2.Sobel`, dan bin ditentukan dengan membandingkan kuadrat
+    magnitudo terhadap kuadrat batas bin sehingga tidak ada galat pembulatan.
+    """
+    n_images = gray_stack.shape[0]
+    padded = np.pad(gray_stack.astype(np.int32), ((0, 0), (1, 1), (1, 1)), mode='reflect')
+    smooth_rows = padded[:, :-2, :] + 2 * padded[:, 1:-1, :] + padded[:, 2:, :]
+    smooth_cols = padded[:, :, :-2] + 2 * padded[:, :, 1:-1] + padded[:, :, 2:]
+    sobelx = smooth_rows[:, :, 2:] - smooth_rows[:, :, :-2]
+    sobely = smooth_cols[:, 2:, :] - smooth_cols[:, :-2, :]
+    magnitude_sq = sobelx.astype(np.int64) ** 2 + sobely.astype(np.int64) ** 2
+
+    bin_width = 256 // SOBEL_BINS
+    edges_sq = (np.arange(1, SOBEL_BINS) * bin_width) ** 2
+    bins = np.searchsorted(edges_sq, magnitude_sq, side='right')
+    # Nilai di luar rentang histogram (> 256) diabaikan seperti pada np.histogram.
+    bins[magnitude_sq > 256 ** 2] = SOBEL_BINS
+    hist = _batch_bincount(bins, SOBEL_BINS + 1)[:, :SOBEL_BINS].astype(np.float64)
+    return hist / (hist.sum(axis=1, keepdims=True) + 1e-6)
+
+
+def hog_features_batch(gray_float_stack):
+    """Deskriptor HOG (L2-Hys, transform_sqrt) untuk tumpukan gambar grayscale float32.
+
+    Mengikuti langkah `skimage.feature.hog`: gradien selisih pusat, orientasi
+    tanpa tanda [0, 180), histogram per sel, lalu normalisasi blok L2-Hys.
+    Hasilnya cocok dengan skimage hingga presisi float32.
+    """
+    n_images, height, width = gray_float_stack.shape
+    c_row, c_col = HOG_PIXELS_PER_CELL
+    b_row, b_col = HOG_CELLS_PER_BLOCK
+    n_cells_row, n_cells_col = height // c_row, width // c_col
+
+    image = np.sqrt(gray_float_stack)
+    g_row = np.zeros_like(image)
+    g_col = np.zeros_like(image)
+    g_row[:, 1:-1, :] = image[:, 2:, :] - image[:, :-2, :]
+    g_col[:, :, 1:-1] = image[:, :, 2:] - image[:, :, :-2]
+    g_row = g_row.astype(np.float64)
+    g_col = g_col.astype(np.float64)
+
+    magnitude = np.hypot(g_col, g_row)
+    orientation = np.rad2deg(np.arctan2(g_row, g_col)) % 180
+    bin_width = 180.0 / HOG_ORIENTATIONS
+    bins = np.floor(orientation / bin_width).astype(np.int64)
+    # Koreksi batas bin agar identik dengan perbandingan [awal, akhir) milik skimage.
+    bins[orientation < bins * bin_width] -= 1
+    bins[orientation >= (bins + 1) * bin_width] += 1
+    valid = (bins >= 0) & (bins < HOG_ORIENTATIONS)
+
+    # Indeks sel untuk setiap piksel (piksel sisa di luar grid sel diabaikan).
+    cropped = (slice(None), slice(0, n_cells_row * c_row), slice(0, n_cells_col * c_col))
+    cell_rows = np.arange(n_cells_row * c_row) // c_row
+    cell_cols = np.arange(n_cells_col * c_col) // c_col
+    cell_index = (cell_rows[:, None] * n_cells_col + cell_cols[None, :]) * HOG_ORIENTATIONS
+    n_cell_bins = n_cells_row * n_cells_col * HOG_ORIENTATIONS
+    flat_index = (cell_index[None] + np.where(valid, bins, 0)[cropped]
+                  + (np.arange(n_images) * n_cell_bins)[:, None, None])
+    weights = np.where(valid, magnitude, 0.0)[cropped]
+    histogram = np.bincount(flat_index.ravel(), weights=weights.ravel(),
+                            minlength=n_images * n_cell_bins)
+    histogram = histogram.reshape(n_images, n_cells_row, n_cells_col, HOG_ORIENTATIONS) / (c_row * c_col)
+
+    n_blocks_row = n_cells_row - b_row + 1
+    n_blocks_col = n_cells_col - b_col + 1
+    blocks = np.empty((n_images, n_blocks_row, n_blocks_col, b_row, b_col, HOG_ORIENTATIONS))
+    for r in range(b_row):
+        for c in range(b_col):
+            blocks[:, :, :, r, c, :] = histogram[:, r:r + n_blocks_row, c:c + n_blocks_col, :]
+
+    eps = 1e-5
+    flat_blocks = blocks.reshape(n_images, n_blocks_row, n_blocks_col, -1)
+    flat_blocks = flat_blocks / np.sqrt(np.sum(flat_blocks ** 2, axis=3, keepdims=True) + eps ** 2)
+    flat_blocks = np.minimum(flat_blocks, 0.2)
+    flat_blocks = flat_blocks / np.sqrt(np.sum(flat_blocks ** 2, axis=3, keepdims=True) + eps ** 2)
+    return flat_blocks.reshape(n_images, -1)
+
+
+def extract_features_batch(images, chunk_size=64, gabor_method='fft', glcm_method='fast'):
+    """Mengekstrak vektor fitur gabungan untuk tumpukan gambar secara tervektorisasi.
+
+    Konversi warna dan tipe data dilakukan sekali per potongan: tumpukan
+    uint8 langsung dikonversi ke HSV, Lab, dan grayscale dengan satu panggilan
+    `cv2.cvtColor`, lalu deskriptor dihitung untuk seluruh potongan.
+
+    Args:
+        images (np.ndarray): Tumpukan gambar BGR uint8 berbentuk (N, 128, 128, 3)
+                             yang sudah diubah ukurannya (lihat `preprocess_batch`).
+        chunk_size (int): Jumlah gambar per potongan untuk membatasi memori.
+        gabor_method (str): 'fft' (tervektorisasi) atau 'direct' (bit-exact).
+        glcm_method (str): 'fast' (satu lintasan tervektorisasi) atau 'exact' (skimage, bit-exact).
+
+    Returns:
+        np.ndarray: Matriks fitur float32 kontigu berbentuk (N, D).
+
+    Raises:
+        ValueError: Jika `images` bukan tumpukan uint8 berbentuk (N, H, W, 3).
+    """
+    images = np.asarray(images)
+    if images.ndim != 4 or images.shape[3] != 3 or images.dtype != np.uint8:
+        raise ValueError(f"Diharapkan tumpukan uint8 (N, H, W, 3), diterima {images.shape} {images.dtype}")
+
+    n_images, height, width, _ = images.shape
+    output = np.empty((n_images, feature_dimension((width, height))), dtype=np.float32)
+
+    for start in range(0, n_images, chunk_size):
+        chunk = np.ascontiguousarray(images[start:start + chunk_size])
+        n_chunk = chunk.shape[0]
+        # Satu konversi untuk seluruh potongan: gambar ditumpuk secara vertikal.
+        tall = chunk.reshape(n_chunk * height, width, 3)
+        gray = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(n_chunk, height, width)
+        hsv = cv2.cvtColor(tall, cv2.COLOR_BGR2HSV).reshape(n_chunk, height, width, 3)
+        lab = cv2.cvtColor(tall, cv2.COLOR_BGR2Lab).reshape(n_chunk, height, width, 3)
+        gray_float = gray.astype(np.float32) / 255.0
+
+        features = np.hstack([
+            hog_features_batch(gray_float),
+            color_histogram_batch(hsv),
+            lbp_histogram_batch(gray),
+            GABOR_BANK.extract_batch(gray, method=gabor_method),
+            sobel_histogram_batch(gray),
+            glcm_features_batch(gray, method=glcm_method),
+            color_moments_batch(lab),
+        ])
+        output[start:start + n_chunk] = np.nan_to_num(features)
+
+    return output
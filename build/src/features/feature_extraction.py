@@ -2,6 +2,14 @@
 
 Berisi kumpulan fungsi untuk mengekstrak berbagai jenis fitur visual,
 seperti HOG, histogram warna, LBP, GLCM, Gabor, Sobel, dan color moments.
+
+Setiap deskriptor bergantung pada hasil antara yang sama (grayscale dan BGR
+uint8, gradien Sobel, magnitudo, HSV, Lab). `ImageIntermediates` menyusun
+hasil antara tersebut sebagai graf dependensi kecil yang dihitung secara
+malas: setiap simpul dihitung paling banyak sekali per gambar lalu dipakai
+bersama oleh semua deskriptor yang membutuhkannya. `extract_features` dapat
+menghitung sebagian deskriptor saja; hanya simpul yang dibutuhkan deskriptor
+terpilih yang dihitung.
 """
 
 import numpy as np
@@ -9,20 +17,120 @@ import cv2
 from skimage.feature import hog, local_binary_pattern, graycomatrix, graycoprops
 from scipy.stats import skew
 
-from src.configs.config import HOG_ORIENTATIONS, HOG_PIXELS_PER_CELL, HOG_CELLS_PER_BLOCK
+from src.configs.config import HOG_ORIENTATIONS, HOG_PIXELS_PER_CELL, HOG_CELLS_PER_BLOCK, GLCM_LEVELS
+from src.features.gabor import GABOR_BANK
+from src.features.texture import quantize_gray
 
 
-def extract_hog_features(gray_image):
-    """Mengekstrak fitur Histogram of Oriented Gradients (HOG).
+# Urutan deskriptor di dalam vektor fitur gabungan (sama dengan `feature_layout`).
+DESCRIPTOR_ORDER = ('hog', 'color_histogram', 'lbp', 'gabor', 'sobel', 'glcm', 'color_moments')
+
+LBP_RADIUS = 8
+LBP_POINTS = 24
+GLCM_DISTANCES = (1, 3, 5)
+GLCM_ANGLES = (0, np.pi/4, np.pi/2, 3*np.pi/4)
+GLCM_PROPS = ('contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation', 'ASM')
+SOBEL_BINS = 32
+
+
+def _gray_u8(cache):
+    if cache.gray_image is None:
+        raise ValueError("Hasil antara grayscale membutuhkan gambar grayscale")
+    return (cache.gray_image * 255).astype(np.uint8)
+
+
+def _bgr_u8(cache):
+    if cache.color_image is None:
+        raise ValueError("Hasil antara berwarna membutuhkan gambar berwarna")
+    return (cache.color_image * 255).astype(np.uint8)
+
+
+def _gray_float(cache):
+    return cache['gray_u8'].astype(np.float32) / 255.0
+
+
+def _hsv(cache):
+    return cv2.cvtColor(cache['bgr_u8'], cv2.COLOR_BGR2HSV)
+
+
+def _lab(cache):
+    return cv2.cvtColor(cache['bgr_u8'], cv2.COLOR_BGR2Lab)
+
+
+def _sobel_gradients(cache):
+    # Gradien Sobel 3x3 dari uint8 selalu bilangan bulat dalam [-1020, 1020], jadi int16 sudah eksak.
+    gray = cache['gray_u8']
+    return cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3), cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3)
+
+
+def _gradient_magnitude(cache):
+    sobelx, sobely = cache['sobel_gradients']
+    return cv2.magnitude(sobelx.astype(np.float32), sobely.astype(np.float32))
+
+
+# Simpul graf hasil antara. Dependensi diselesaikan secara malas melalui `cache[nama]`.
+INTERMEDIATES = {
+    'gray_u8': _gray_u8,
+    'bgr_u8': _bgr_u8,
+    'gray_float': _gray_float,
+    'hsv': _hsv,
+    'lab': _lab,
+    'sobel_gradients': _sobel_gradients,
+    'gradient_magnitude': _gradient_magnitude,
+}
+
+
+class ImageIntermediates:
+    """Cache hasil antara satu gambar yang dihitung paling banyak sekali.
+
+    Konversi float -> uint8, konversi warna, dan gradien hanya dihitung ketika
+    pertama kali diminta oleh sebuah deskriptor, lalu dipakai ulang oleh
+    deskriptor lain pada gambar yang sama.
 
     Args:
-        gray_image (np.ndarray): Gambar input dalam format grayscale dan tipe float.
+        gray_image (np.ndarray, optional): Gambar grayscale ternormalisasi [0, 1].
+        color_image (np.ndarray, optional): Gambar berwarna (BGR) ternormalisasi [0, 1].
 
-    Returns:
-        np.ndarray: Vektor fitur HOG 1D.
+    Attributes:
+        computed (dict): Hasil antara yang sudah dihitung, dikunci dengan nama simpul.
     """
-    features = hog(
-        gray_image,
+
+    def __init__(self, gray_image=None, color_image=None):
+        self.gray_image = gray_image
+        self.color_image = color_image
+        self.computed = {}
+        if gray_image is not None:
+            self.computed['gray_float'] = gray_image
+
+    @classmethod
+    def from_bgr(cls, image):
+        """Membangun cache langsung dari gambar BGR uint8 yang sudah diubah ukurannya.
+
+        Jalur ini melewati normalisasi float sama sekali; hasilnya identik dengan
+        `preprocess_image_for_feature_extraction` karena konversi uint8 -> float32
+        -> uint8 tidak kehilangan nilai.
+
+        Args:
+            image (np.ndarray): Gambar BGR uint8 berukuran `IMAGE_SIZE`.
+
+        Returns:
+            ImageIntermediates: Cache dengan simpul 'bgr_u8' dan 'gray_u8' terisi.
+        """
+        cache = cls()
+        cache.computed['bgr_u8'] = image
+        cache.computed['gray_u8'] = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cache
+
+    def __getitem__(self, name):
+        value = self.computed.get(name)
+        if value is None:
+            value = self.computed[name] = INTERMEDIATES[name](self)
+        return value
+
+
+def _hog(cache):
+    return hog(
+        cache['gray_float'],
         orientations=HOG_ORIENTATIONS,
         pixels_per_cell=HOG_PIXELS_PER_CELL,
         cells_per_block=HOG_CELLS_PER_BLOCK,
@@ -30,7 +138,75 @@ def extract_hog_features(gray_image):
         visualize=False,
         transform_sqrt=True
     )
-    return features
+
+
+def _color_histogram(cache):
+    hsv_image = cache['hsv']
+    hist = np.empty(180 + 32 + 32, dtype=np.float32)
+    for channel, (start, bins, upper) in enumerate(((0, 180, 180), (180, 32, 256), (212, 32, 256))):
+        channel_hist = cv2.calcHist([hsv_image], [channel], None, [bins], [0, upper])
+        cv2.normalize(channel_hist, channel_hist)
+        hist[start:start + bins] = channel_hist.ravel()
+    return hist
+
+
+def _normalized_histogram(values, bins, value_range):
+    (hist, _) = np.histogram(values.ravel(), bins=bins, range=value_range)
+    hist = hist.astype("float")
+    hist /= (hist.sum() + 1e-6)
+    return hist
+
+
+def _lbp(cache):
+    lbp = local_binary_pattern(cache['gray_u8'], LBP_POINTS, LBP_RADIUS, method='uniform')
+    return _normalized_histogram(lbp, np.arange(0, LBP_POINTS + 3), (0, LBP_POINTS + 2))
+
+
+def _color_moments(cache):
+    lab_image = cache['lab']
+    features = []
+    for c in range(3):
+        channel = lab_image[:, :, c]
+        features.extend([np.mean(channel), np.std(channel), skew(channel, axis=None)])
+    return np.array(features)
+
+
+def _glcm(cache):
+    glcm = graycomatrix(quantize_gray(cache['gray_u8'], GLCM_LEVELS), distances=GLCM_DISTANCES, angles=GLCM_ANGLES,
+                        levels=GLCM_LEVELS, symmetric=True, normed=True)
+    return np.concatenate([graycoprops(glcm, prop).ravel() for prop in GLCM_PROPS])
+
+
+def _gabor(cache):
+    return GABOR_BANK.extract(cache['gray_u8'])
+
+
+def _sobel(cache):
+    return _normalized_histogram(cache['gradient_magnitude'], SOBEL_BINS, (0, 256))
+
+
+# Fungsi setiap deskriptor; masing-masing hanya membaca simpul `ImageIntermediates`.
+DESCRIPTORS = {
+    'hog': _hog,
+    'color_histogram': _color_histogram,
+    'lbp': _lbp,
+    'gabor': _gabor,
+    'sobel': _sobel,
+    'glcm': _glcm,
+    'color_moments': _color_moments,
+}
+
+
+def extract_hog_features(gray_image):
+    """Mengekstrak fitur Histogram of Oriented Gradients (HOG).
+
+    Args:
+        gray_image (np.ndarray): Gambar input dalam format grayscale dan tipe float.
+
+    Returns:
+        np.ndarray: Vektor fitur HOG 1D.
+    """
+    return _hog(ImageIntermediates(gray_image=gray_image))
 
 
 def extract_color_histogram(color_image):
@@ -43,14 +219,7 @@ def extract_color_histogram(color_image):
     Returns:
         np.ndarray: Vektor fitur histogram warna 1D.
     """
-    hsv_image = cv2.cvtColor((color_image * 255).astype(np.uint8), cv2.COLOR_BGR2HSV)
-    hist_h = cv2.calcHist([hsv_image], [0], None, [180], [0, 180])
-    hist_s = cv2.calcHist([hsv_image], [1], None, [32], [0, 256])
-    hist_v = cv2.calcHist([hsv_image], [2], None, [32], [0, 256])
-    cv2.normalize(hist_h, hist_h)
-    cv2.normalize(hist_s, hist_s)
-    cv2.normalize(hist_v, hist_v)
-    return np.concatenate((hist_h, hist_s, hist_v)).flatten()
+    return _color_histogram(ImageIntermediates(color_image=color_image))
 
 
 def extract_lbp_features(gray_image):
@@ -63,16 +232,7 @@ def extract_lbp_features(gray_image):
     Returns:
         np.ndarray: Vektor fitur histogram LBP 1D.
     """
-    gray_image_uint8 = (gray_image * 255).astype(np.uint8)
-    radius = 8
-    n_points = 24
-    lbp = local_binary_pattern(gray_image_uint8, n_points, radius, method='uniform')
-    (hist, _) = np.histogram(lbp.ravel(),
-                             bins=np.arange(0, n_points + 3),
-                             range=(0, n_points + 2))
-    hist = hist.astype("float")
-    hist /= (hist.sum() + 1e-6)
-    return hist
+    return _lbp(ImageIntermediates(gray_image=gray_image))
 
 
 def extract_color_moments(color_image):
@@ -85,15 +245,7 @@ def extract_color_moments(color_image):
     Returns:
         np.ndarray: Vektor fitur color moments 1D (9 nilai).
     """
-    lab_image = cv2.cvtColor((color_image * 255).astype(np.uint8), cv2.COLOR_BGR2Lab)
-    l, a, b = cv2.split(lab_image)
-    features = []
-    for channel in [l, a, b]:
-        mean = np.mean(channel)
-        std = np.std(channel)
-        skewness = skew(channel.flatten())
-        features.extend([mean, std, skewness])
-    return np.array(features)
+    return _color_moments(ImageIntermediates(color_image=color_image))
 
 
 def extract_glcm_features(gray_image):
@@ -106,20 +258,15 @@ def extract_glcm_features(gray_image):
     Returns:
         np.ndarray: Vektor fitur properti GLCM 1D.
     """
-    gray_image_uint8 = (gray_image * 255).astype(np.uint8)
-    distances = [1, 3, 5]
-    angles = [0, np.pi/4, np.pi/2, 3*np.pi/4]
-    glcm = graycomatrix(gray_image_uint8, distances=distances, angles=angles, symmetric=True, normed=True)
-    features = []
-    props = ['contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation', 'ASM']
-    for prop in props:
-        features.append(graycoprops(glcm, prop).ravel())
-    return np.concatenate(features)
+    return _glcm(ImageIntermediates(gray_image=gray_image))
 
 
 def extract_gabor_features(gray_image):
     """Mengekstrak fitur tekstur menggunakan bank filter Gabor.
 
+    Kernel Gabor dibangun sekali saat impor modul (lihat `src.features.gabor`)
+    dan dipakai ulang untuk setiap gambar.
+
     Args:
         gray_image (np.ndarray): Gambar input grayscale yang sudah
                                   dinormalisasi ke rentang [0, 1].
@@ -127,20 +274,7 @@ def extract_gabor_features(gray_image):
     Returns:
         np.ndarray: Vektor fitur Gabor 1D (mean dan std dari respons filter).
     """
-    img = (gray_image * 255).astype(np.uint8)
-    filters = []
-    ksize = 31
-    for theta in np.arange(0, np.pi, np.pi / 4):
-        for lambd in np.arange(np.pi / 4, np.pi, np.pi / 4):
-            for sigma in (1, 3):
-                kernel = cv2.getGaborKernel((ksize, ksize), sigma, theta, lambd, 0.5, 0, ktype=cv2.CV_32F)
-                filters.append(kernel)
-    features = []
-    for kernel in filters:
-        filtered_img = cv2.filter2D(img, cv2.CV_8UC3, kernel)
-        features.append(filtered_img.mean())
-        features.append(filtered_img.std())
-    return np.array(features)
+    return GABOR_BANK.extract(gray_image)
 
 
 def extract_sobel_features(gray_image):
@@ -153,37 +287,42 @@ def extract_sobel_features(gray_image):
     Returns:
         np.ndarray: Vektor fitur histogram magnitudo Sobel 1D.
     """
-    img_uint8 = (gray_image * 255).astype(np.uint8)
-    sobelx = cv2.Sobel(img_uint8, cv2.CV_64F, 1, 0, ksize=3)
-    sobely = cv2.Sobel(img_uint8, cv2.CV_64F, 0, 1, ksize=3)
-    magnitude = np.sqrt(sobelx**2 + sobely**2)
-    (hist, _) = np.histogram(magnitude.ravel(), bins=32, range=(0, 256))
-    hist = hist.astype("float")
-    hist /= (hist.sum() + 1e-6)
-    return hist
+    return _sobel(ImageIntermediates(gray_image=gray_image))
 
 
-def extract_features(gray_image, color_image):
-    """Mengekstrak dan menggabungkan semua fitur menjadi satu vektor.
+def extract_features(gray_image=None, color_image=None, descriptors=None, intermediates=None):
+    """Mengekstrak dan menggabungkan fitur menjadi satu vektor.
+
+    Hasil antara dibagi oleh semua deskriptor melalui `ImageIntermediates`,
+    sehingga setiap konversi dan gradien dihitung sekali per gambar.
 
     Args:
-        gray_image (np.ndarray): Gambar input grayscale ternormalisasi.
-        color_image (np.ndarray): Gambar input berwarna (BGR) ternormalisasi.
+        gray_image (np.ndarray, optional): Gambar input grayscale ternormalisasi.
+        color_image (np.ndarray, optional): Gambar input berwarna (BGR) ternormalisasi.
+        descriptors (iterable of str, optional): Subset nama deskriptor (kunci
+                                                 `DESCRIPTORS`). Default semua.
+                                                 Urutan keluaran selalu mengikuti
+                                                 `DESCRIPTOR_ORDER`.
+        intermediates (ImageIntermediates, optional): Cache yang sudah ada, misalnya
+                                                      dari `ImageIntermediates.from_bgr`,
+                                                      dipakai sebagai ganti kedua gambar.
 
     Returns:
-        np.ndarray: Vektor fitur gabungan 1D yang komprehensif.
+        np.ndarray: Vektor fitur gabungan 1D.
+
+    Raises:
+        ValueError: Jika ada nama deskriptor yang tidak dikenal.
     """
-    hog_features = extract_hog_features(gray_image)
-    color_hist_features = extract_color_histogram(color_image)
-    lbp_features = extract_lbp_features(gray_image)
-    gabor_features = extract_gabor_features(gray_image)
-    sobel_features = extract_sobel_features(gray_image)
-    glcm_features = extract_glcm_features(gray_image)
-    color_moments = extract_color_moments(color_image)
+    if descriptors is None:
+        names = DESCRIPTOR_ORDER
+    else:
+        unknown = set(descriptors) - set(DESCRIPTORS)
+        if unknown:
+            raise ValueError(f"Deskriptor tidak dikenal: {sorted(unknown)}")
+        selected = set(descriptors)
+        names = [name for name in DESCRIPTOR_ORDER if name in selected]
+    if intermediates is None:
+        intermediates = ImageIntermediates(gray_image, color_image)
 
     # Menggabungkan semua vektor fitur menjadi satu
-    combined_features = np.hstack([
-        hog_features, color_hist_features, lbp_features, gabor_features,
-        sobel_features, glcm_features, color_moments
-    ])
-    return combined_features
+    return np.hstack([DESCRIPTORS[name](intermediates) for name in names])
@@ -0,0 +1,379 @@
+"""Cache fitur persisten di disk yang dialamatkan berdasarkan konten.
+
+Setiap vektor fitur disimpan dengan kunci hash konten gambar (piksel atau
+byte berkas). Seluruh isi cache berada di bawah sub-direktori yang dinamai
+dengan sidik jari (fingerprint) konfigurasi ekstraktor, sehingga perubahan
+`IMAGE_SIZE`, parameter HOG, atau himpunan deskriptor otomatis memakai cache
+yang baru tanpa mencampur fitur lama.
+
+Fitur disimpan sebagai segmen `.npy` float32 yang hanya ditambahkan
+(append-only) dan dibaca dengan memory-map. Indeks `index.json` memetakan
+kunci ke (segmen, baris). Penambahan bersifat inkremental, invalidasi hanya
+menghapus entri indeks, dan `compact` menulis ulang segmen tanpa baris mati.
+
+Segmen juga dapat disimpan sebagai float16 (`FEATURE_STORE_DTYPE`) untuk
+memperkecil cache setengahnya; fitur selalu dikembalikan sebagai float32.
+Cache float16 berada di direktori terpisah agar tidak tercampur dengan fitur
+float32, dan segmen yang nilainya melampaui rentang float16 tetap disimpan
+sebagai float32.
+
+Beberapa proses boleh memakai direktori cache yang sama (misalnya dua
+notebook). Setiap segmen diberi nama unik, dan setiap perubahan indeks
+dilakukan di bawah kunci berkas (`index.lock`): indeks di disk dibaca ulang,
+digabung dengan perubahan proses ini, lalu diganti secara atomik. Pembaca
+memuat ulang indeks jika berkasnya berubah sejak terakhir dibaca.
+"""
+
+import os
+import json
+import uuid
+import hashlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+
+from src.configs.config import (
+    IMAGE_SIZE, HOG_ORIENTATIONS, HOG_PIXELS_PER_CELL, HOG_CELLS_PER_BLOCK, FEATURE_STORE_PATH,
+    FEATURE_STORE_DTYPE
+)
+from src.features import batch_extraction
+from src.features.gabor import GABOR_BANK
+from src.features.augmentation import AugmentedView, AUGMENTATION_VERSION
+from src.utils.logger import logger
+
+
+# Naikkan versi ini jika implementasi deskriptor berubah tanpa perubahan parameter.
+FEATURE_VERSION = 1
+DESCRIPTORS = ('hog', 'color_histogram', 'lbp', 'gabor', 'sobel', 'glcm', 'color_moments')
+
+
+def extractor_fingerprint(descriptors=DESCRIPTORS):
+    """Menghitung sidik jari konfigurasi ekstraktor fitur.
+
+    Args:
+        descriptors (tuple of str): Himpunan deskriptor yang dipakai.
+
+    Returns:
+        str: Hash heksadesimal pendek dari seluruh parameter yang memengaruhi fitur.
+    """
+    config = {
+        'version': FEATURE_VERSION,
+        'image_size': list(IMAGE_SIZE),
+        'hog': [HOG_ORIENTATIONS, list(HOG_PIXELS_PER_CELL), list(HOG_CELLS_PER_BLOCK)],
+        'lbp': [batch_extraction.LBP_POINTS, batch_extraction.LBP_RADIUS],
+        'glcm': [list(batch_extraction.GLCM_DISTANCES), batch_extraction.GLCM_LEVELS],
+        'gabor': hashlib.blake2b(GABOR_BANK.kernels.tobytes(), digest_size=8).hexdigest(),
+        'descriptors': list(descriptors),
+    }
+    payload = json.dumps(config, sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def image_key(image):
+    """Kunci konten untuk gambar dalam memori (bentuk, tipe, dan byte piksel)."""
+    image = np.ascontiguousarray(image)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.shape}{image.dtype}".encode('utf-8'))
+    digest.update(image.data)
+    return digest.hexdigest()
+
+
+def sample_keys(images):
+    """Kunci konten untuk gambar dan `AugmentedView`.
+
+    Kunci varian augmentasi diturunkan dari kunci gambar sumbernya, nama
+    augmentasi, dan sudutnya, sehingga pikselnya tidak perlu dibentuk. Sumber
+    yang dipakai beberapa varian hanya di-hash sekali, dan varian 'original'
+    memakai kunci yang sama dengan gambar sumbernya.
+    """
+    source_keys, keys = {}, []
+    for item in images:
+        if not isinstance(item, AugmentedView):
+            keys.append(image_key(item))
+            continue
+        source_key = source_keys.get(id(item.source))
+        if source_key is None:
+            source_key = source_keys[id(item.source)] = image_key(item.source)
+        if item.op == 'original':
+            keys.append(source_key)
+        else:
+            payload = f"{source_key}:{item.op}:{item.angle!r}:{AUGMENTATION_VERSION}".encode('utf-8')
+            keys.append(hashlib.blake2b(payload, digest_size=16).hexdigest())
+    return keys
+
+
+@contextmanager
+def _file_lock(path):
+    """Kunci eksklusif antar-proses pada berkas `path` selama blok `with`."""
+    with open(path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def file_key(path, block_size=1 << 20):
+    """Kunci konten untuk berkas gambar (hash byte berkas, tanpa decoding)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """Penyimpanan fitur yang dapat di-memory-map, dikunci hash konten.
+
+    Args:
+        root (str): Direktori dasar cache.
+        fingerprint (str): Sidik jari ekstraktor; default dari konfigurasi saat ini.
+        dtype (str): Tipe data segmen di disk, 'float32' atau 'float16'.
+    """
+
+    def __init__(self, root=FEATURE_STORE_PATH, fingerprint=None, dtype=FEATURE_STORE_DTYPE):
+        if dtype not in ('float32', 'float16'):
+            raise ValueError(f"Tipe data cache fitur tidak didukung: {dtype}")
+        self.fingerprint = fingerprint or extractor_fingerprint()
+        self.dtype = np.dtype(dtype)
+        self.path = os.path.join(root, self.fingerprint if dtype == 'float32' else f"{self.fingerprint}-{dtype}")
+        os.makedirs(self.path, exist_ok=True)
+        self._index_path = os.path.join(self.path, 'index.json')
+        self._lock_path = os.path.join(self.path, 'index.lock')
+        self._segments = {}
+        self._index = {}
+        self._index_mtime = None
+        self._reload()
+
+    def __len__(self):
+        self._refresh()
+        return len(self._index)
+
+    def __contains__(self, key):
+        self._refresh()
+        return key in self._index
+
+    def _segment_path(self, segment_id):
+        """Path berkas segmen; id bilangan bulat berasal dari indeks format lama."""
+        if isinstance(segment_id, int):
+            return os.path.join(self.path, f"segment-{segment_id:05d}.npy")
+        return os.path.join(self.path, f"segment-{segment_id}.npy")
+
+    def _segment(self, segment_id):
+        """Membuka segmen dengan memory-map (di-cache per instance)."""
+        segment = self._segments.get(segment_id)
+        if segment is None:
+            segment = np.load(self._segment_path(segment_id), mmap_mode='r')
+            self._segments[segment_id] = segment
+        return segment
+
+    def _reload(self):
+        """Membaca indeks dari disk (kosong jika belum ada)."""
+        try:
+            with open(self._index_path, 'r') as f:
+                self._index_mtime = os.fstat(f.fileno()).st_mtime_ns
+                state = json.load(f)
+        except FileNotFoundError:
+            self._index, self._index_mtime = {}, None
+            return
+        self._index = {key: tuple(loc) for key, loc in state['index'].items()}
+
+    def _refresh(self):
+        """Memuat ulang indeks jika proses lain mengubahnya sejak terakhir dibaca."""
+        try:
+            mtime = os.stat(self._index_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._index_mtime:
+            self._reload()
+
+    def _save_index(self):
+        """Menulis indeks secara atomik (berkas sementara lalu rename); dipanggil di bawah kunci."""
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'index': self._index}, f)
+        os.replace(tmp_path, self._index_path)
+        self._index_mtime = os.stat(self._index_path).st_mtime_ns
+
+    def _write_segment(self, features):
+        """Menulis matriks fitur sebagai segmen baru bernama unik; mengembalikan id segmen."""
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        if self.dtype != np.float32:
+            if np.abs(features).max(initial=0.0) <= np.finfo(self.dtype).max:
+                features = features.astype(self.dtype)
+            else:
+                logger.warning(f"Fitur melampaui rentang {self.dtype}; segmen disimpan sebagai float32.")
+        segment_id = uuid.uuid4().hex
+        np.save(self._segment_path(segment_id), features)
+        return segment_id
+
+    def get_many(self, keys):
+        """Mengambil fitur untuk sekumpulan kunci.
+
+        Args:
+            keys (list of str): Kunci konten.
+
+        Returns:
+            tuple: Sebuah tuple berisi:
+                - features (np.ndarray or None): Matriks float32 (N, D) dengan baris
+                  kosong (NaN) untuk kunci yang tidak ada, atau None jika cache kosong.
+                - hit (np.ndarray): Mask boolean kunci yang ditemukan.
+        """
+        self._refresh()
+        hit = np.array([key in self._index for key in keys], dtype=bool)
+        if not hit.any():
+            return None, hit
+        first = self._index[keys[int(np.argmax(hit))]]
+        n_features = self._segment(first[0]).shape[1]
+        features = np.full((len(keys), n_features), np.nan, dtype=np.float32)
+        for i in np.flatnonzero(hit):
+            segment_id, row = self._index[keys[i]]
+            features[i] = self._segment(segment_id)[row]
+        return features, hit
+
+    def put_many(self, keys, features):
+        """Menambahkan fitur baru sebagai satu segmen baru.
+
+        Segmen ditulis dan indeks digabung dengan indeks terbaru di disk di bawah
+        kunci, sehingga entri yang ditambahkan proses lain tidak hilang.
+
+        Args:
+            keys (list of str): Kunci konten, satu per baris `features`.
+            features (np.ndarray): Matriks fitur (N, D).
+        """
+        if len(keys) == 0:
+            return
+        with _file_lock(self._lock_path):
+            segment_id = self._write_segment(features)
+            self._reload()
+            for row, key in enumerate(keys):
+                self._index[key] = (segment_id, row)
+            self._save_index()
+
+    def invalidate(self, keys):
+        """Menghapus kunci dari indeks; baris datanya dibersihkan saat `compact`."""
+        with _file_lock(self._lock_path):
+            self._reload()
+            removed = 0
+            for key in keys:
+                if self._index.pop(key, None) is not None:
+                    removed += 1
+            if removed:
+                self._save_index()
+        return removed
+
+    def compact(self):
+        """Menulis ulang seluruh entri hidup ke satu segmen dan menghapus segmen lama.
+
+        Penulis lain menunggu kunci selama pemadatan. Pembaca di proses lain yang
+        sedang membuka segmen lama sebaiknya tidak berjalan bersamaan.
+        """
+        with _file_lock(self._lock_path):
+            self._reload()
+            keys = list(self._index)
+            features, _ = self.get_many(keys)
+            live = set()
+            if keys:
+                segment_id = self._write_segment(features)
+                self._index = {key: (segment_id, row) for row, key in enumerate(keys)}
+                live.add(os.path.basename(self._segment_path(segment_id)))
+            self._save_index()
+            self._segments.clear()
+            for filename in os.listdir(self.path):
+                if filename.startswith('segment-') and filename.endswith('.npy') and filename not in live:
+                    os.remove(os.path.join(self.path, filename))
+
+    def clear(self):
+        """Mengosongkan cache untuk sidik jari ini."""
+        self._refresh()
+        self.invalidate(list(self._index))
+        self.compact()
+
+
+def _fill_from_store(store, keys, compute_missing):
+    """Mengambil fitur dari cache dan menghitung hanya yang belum ada.
+
+    Args:
+        store (FeatureStore): Cache fitur.
+        keys (list of str): Kunci konten berurutan.
+        compute_missing (callable): Menerima indeks yang hilang dan mengembalikan
+                                    (features, valid) untuk indeks tersebut.
+
+    Returns:
+        tuple: (matriks fitur float32 (N, D), mask valid).
+    """
+    cached, hit = store.get_many(keys)
+    missing = np.flatnonzero(~hit)
+    logger.info(f"Cache fitur: {int(hit.sum())} hit, {len(missing)} miss.")
+    valid = hit.copy()
+    if len(missing) == 0:
+        return cached, valid
+
+    new_features, new_valid = compute_missing(missing)
+    features = cached if cached is not None else np.full(
+        (len(keys), new_features.shape[1]), np.nan, dtype=np.float32)
+    features[missing] = new_features
+    valid[missing] = new_valid
+    stored = missing[new_valid]
+    store.put_many([keys[i] for i in stored], new_features[new_valid])
+    return features, valid
+
+
+def cached_transform(extractor, images, store, desc="Feature Extraction"):
+    """Ekstraksi fitur untuk gambar dalam memori dengan memanfaatkan cache.
+
+    Args:
+        extractor (ParallelFeatureExtractor): Ekstraktor untuk gambar yang belum di-cache.
+        images (sequence): Gambar BGR uint8 atau `AugmentedView`.
+        store (FeatureStore): Cache fitur.
+        desc (str): Label progress bar.
+
+    Returns:
+        np.ndarray: Matriks fitur float32 (N, D) berurutan sesuai input.
+    """
+    keys = sample_keys(images)
+
+    def compute_missing(missing):
+        features = extractor.transform([images[i] for i in missing], desc=desc)
+        return features, np.ones(len(missing), dtype=bool)
+
+    features, _ = _fill_from_store(store, keys, compute_missing)
+    return features
+
+
+def cached_transform_files(extractor, paths, store, desc="Feature Extraction", keys=None):
+    """Ekstraksi fitur untuk berkas gambar dengan memanfaatkan cache.
+
+    Args:
+        extractor (ParallelFeatureExtractor): Ekstraktor untuk berkas yang belum di-cache.
+        paths (list of str): Path berkas gambar.
+        store (FeatureStore): Cache fitur.
+        desc (str): Label progress bar.
+        keys (list of str, optional): Kunci konten yang sudah dihitung, misalnya kolom
+                                      `content_hash` manifest dataset. Jika None, setiap
+                                      berkas dibaca dan di-hash dengan `file_key`.
+
+    Returns:
+        tuple: (matriks fitur float32 (N, D), mask boolean berkas yang valid).
+    """
+    if keys is None:
+        keys = [file_key(path) for path in paths]
+
+    def compute_missing(missing):
+        return extractor.transform_files([paths[i] for i in missing], desc=desc)
+
+    return _fill_from_store(store, keys, compute_missing)
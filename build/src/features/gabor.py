@@ -0,0 +1,229 @@
+"""Bank filter Gabor yang dibangun sekali dan dapat dipakai ulang.
+
+`extract_gabor_features` versi lama membangun ulang 24 kernel 31x31 dengan
+`cv2.getGaborKernel` untuk setiap gambar, lalu menjalankan 24 kali
+`cv2.filter2D` yang masing-masing diikuti perhitungan mean/std terpisah.
+Modul ini menyediakan `GaborFilterBank` yang menyimpan kernel sejak awal,
+serta jalur batch berbasis FFT yang menghitung seluruh respons dan
+statistiknya untuk tumpukan gambar sekaligus.
+
+Modul ini juga dapat dijalankan sebagai skrip untuk microbenchmark
+terhadap implementasi lama::
+
+    python -m src.features.gabor
+"""
+
+import time
+
+import numpy as np
+import cv2
+from scipy import fft as sp_fft
+
+
+GABOR_KSIZE = 31
+GABOR_THETAS = np.arange(0, np.pi, np.pi / 4)
+GABOR_LAMBDAS = np.arange(np.pi / 4, np.pi, np.pi / 4)
+GABOR_SIGMAS = (1, 3)
+GABOR_GAMMA = 0.5
+GABOR_PSI = 0
+
+
+def _to_uint8(gray_image):
+    """Mengubah gambar grayscale ternormalisasi [0, 1] menjadi uint8.
+
+    Gambar yang sudah bertipe uint8 dikembalikan apa adanya sehingga
+    pemanggil yang sudah memegang versi uint8 tidak perlu konversi ulang.
+    """
+    if gray_image.dtype == np.uint8:
+        return gray_image
+    return (gray_image * 255).astype(np.uint8)
+
+
+class GaborFilterBank:
+    """Kumpulan kernel Gabor yang dihitung satu kali.
+
+    Urutan kernel (theta -> lambda -> sigma) dan fitur keluaran (mean lalu
+    std untuk setiap kernel) sama persis dengan `extract_gabor_features`
+    versi lama, sehingga vektor 48 fitur yang dihasilkan kompatibel dengan
+    model yang sudah dilatih.
+
+    Attributes:
+        kernels (np.ndarray): Array kernel berbentuk (n_kernels, ksize, ksize)
+                              bertipe float32.
+    """
+
+    def __init__(self, ksize=GABOR_KSIZE, thetas=GABOR_THETAS, lambdas=GABOR_LAMBDAS,
+                 sigmas=GABOR_SIGMAS, gamma=GABOR_GAMMA, psi=GABOR_PSI):
+        self.ksize = ksize
+        kernels = []
+        for theta in thetas:
+            for lambd in lambdas:
+                for sigma in sigmas:
+                    kernels.append(cv2.getGaborKernel((ksize, ksize), sigma, theta, lambd,
+                                                      gamma, psi, ktype=cv2.CV_32F))
+        self.kernels = np.ascontiguousarray(np.stack(kernels))
+        self._spectra = {}
+
+    @property
+    def n_features(self):
+        """Jumlah fitur per gambar (mean dan std untuk setiap kernel)."""
+        return 2 * len(self.kernels)
+
+    def extract(self, gray_image):
+        """Mengekstrak fitur Gabor untuk satu gambar dengan kernel yang sudah dibangun.
+
+        Hasilnya identik (bit-exact) dengan `extract_gabor_features` versi lama.
+
+        Args:
+            gray_image (np.ndarray): Gambar grayscale ternormalisasi [0, 1]
+                                     atau sudah bertipe uint8.
+
+        Returns:
+            np.ndarray: Vektor fitur Gabor 1D (mean dan std dari respons filter).
+        """
+        img = _to_uint8(gray_image)
+        features = np.empty(self.n_features)
+        for i, kernel in enumerate(self.kernels):
+            filtered_img = cv2.filter2D(img, cv2.CV_8U, kernel)
+            features[2 * i] = filtered_img.mean()
+            features[2 * i + 1] = filtered_img.std()
+        return features
+
+    def _kernel_spectra(self, fft_shape):
+        """Mengambil (atau menghitung dan menyimpan) spektrum FFT kernel untuk ukuran tertentu."""
+        spectra = self._spectra.get(fft_shape)
+        if spectra is None:
+            # filter2D melakukan korelasi, sehingga kernel dibalik untuk konvolusi FFT.
+            flipped = np.zeros((len(self.kernels),) + fft_shape, dtype=np.float32)
+            flipped[:, :self.ksize, :self.ksize] = self.kernels[:, ::-1, ::-1]
+            spectra = sp_fft.rfft2(flipped)
+            self._spectra[fft_shape] = spectra
+        return spectra
+
+    def responses_batch(self, gray_stack):
+        """Menghitung seluruh respons filter untuk tumpukan gambar melalui FFT.
+
+        Tepi gambar dipantulkan (BORDER_REFLECT_101, sama seperti default
+        `cv2.filter2D`) dan respons dibulatkan serta dipotong ke rentang uint8.
+        FFT dihitung dalam float32 pada ukuran yang cepat untuk FFT. Respons
+        dapat berbeda paling banyak satu tingkat keabuan dari `cv2.filter2D`
+        pada piksel yang nilainya tepat di batas pembulatan (`cv2.filter2D`
+        sendiri juga menghitung dalam float32), sehingga setiap fitur mean/std
+        berbeda paling banyak 1. Pada gambar bertekstur selisih fitur umumnya
+        di bawah 1e-2; wilayah datar yang seluruhnya jatuh di batas pembulatan
+        dapat mendekati batas 1. Komputasi float64 tidak menghilangkan selisih
+        ini, sehingga jalur 'direct' dipakai jika hasil bit-exact diperlukan.
+
+        Args:
+            gray_stack (np.ndarray): Tumpukan gambar grayscale berbentuk (N, H, W),
+                                     ternormalisasi [0, 1] atau bertipe uint8.
+
+        Returns:
+            np.ndarray: Respons uint8 berbentuk (N, n_kernels, H, W).
+        """
+        stack = _to_uint8(np.asarray(gray_stack))
+        _, height, width = stack.shape
+        pad = self.ksize // 2
+        padded = np.pad(stack.astype(np.float32), ((0, 0), (pad, pad), (pad, pad)), mode='reflect')
+        # Ukuran FFT minimal sebesar gambar berpadding agar wilayah valid tidak terkena wrap-around.
+        fft_shape = tuple(sp_fft.next_fast_len(n, real=True) for n in padded.shape[1:])
+        spectra = self._kernel_spectra(fft_shape)
+        full = sp_fft.irfft2(sp_fft.rfft2(padded, s=fft_shape)[:, None] * spectra[None], s=fft_shape)
+        valid = full[:, :, 2 * pad:2 * pad + height, 2 * pad:2 * pad + width]
+        return np.clip(np.rint(valid), 0, 255).astype(np.uint8)
+
+    def extract_batch(self, gray_stack, method='fft', chunk_size=8):
+        """Mengekstrak fitur Gabor untuk tumpukan gambar dalam satu panggilan tervektorisasi.
+
+        Args:
+            gray_stack (np.ndarray): Tumpukan gambar grayscale berbentuk (N, H, W).
+            method (str): 'fft' untuk konvolusi FFT tervektorisasi, atau 'direct'
+                          untuk `cv2.filter2D` per gambar (bit-exact).
+            chunk_size (int): Jumlah gambar per potongan pada jalur FFT untuk
+                              membatasi memori spektrum sementara.
+
+        Returns:
+            np.ndarray: Matriks fitur berbentuk (N, n_features).
+
+        Raises:
+            ValueError: Jika `method` tidak dikenali.
+        """
+        gray_stack = np.asarray(gray_stack)
+        if method == 'direct':
+            return np.array([self.extract(img) for img in gray_stack]).reshape(len(gray_stack), -1)
+        if method != 'fft':
+            raise ValueError(f"Metode Gabor tidak dikenali: {method}")
+
+        features = np.empty((len(gray_stack), self.n_features))
+        for start in range(0, len(gray_stack), chunk_size):
+            responses = self.responses_batch(gray_stack[start:start + chunk_size])
+            flat = responses.reshape(responses.shape[0], responses.shape[1], -1)
+            features[start:start + chunk_size, 0::2] = flat.mean(axis=2)
+            features[start:start + chunk_size, 1::2] = flat.std(axis=2)
+        return features
+
+
+# Bank filter global yang dibangun sekali saat modul diimpor.
+GABOR_BANK = GaborFilterBank()
+
+
+def _legacy_gabor_features(gray_image):
+    """Implementasi lama (kernel dibangun ulang per gambar), dipertahankan sebagai acuan benchmark."""
+    img = (gray_image * 255).astype(np.uint8)
+    filters = []
+    ksize = 31
+    for theta in np.arange(0, np.pi, np.pi / 4):
+        for lambd in np.arange(np.pi / 4, np.pi, np.pi / 4):
+            for sigma in (1, 3):
+                kernel = cv2.getGaborKernel((ksize, ksize), sigma, theta, lambd, 0.5, 0, ktype=cv2.CV_32F)
+                filters.append(kernel)
+    features = []
+    for kernel in filters:
+        filtered_img = cv2.filter2D(img, cv2.CV_8UC3, kernel)
+        features.append(filtered_img.mean())
+        features.append(filtered_img.std())
+    return np.array(features)
+
+
+def benchmark_gabor(n_images=64, image_size=(128, 128), repeats=3, seed=42):
+    """Membandingkan waktu dan kecocokan numerik bank filter dengan implementasi lama.
+
+    Args:
+        n_images (int): Jumlah gambar sintetis per pengulangan.
+        image_size (tuple): Ukuran gambar (tinggi, lebar).
+        repeats (int): Jumlah pengulangan; waktu terbaik yang dilaporkan.
+        seed (int): Seed generator gambar sintetis.
+
+    Returns:
+        dict: Waktu terbaik per gambar (milidetik) untuk setiap jalur dan
+              selisih absolut maksimum terhadap implementasi lama.
+    """
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 256, (n_images,) + tuple(image_size), dtype=np.uint8)
+    stack = np.stack([cv2.GaussianBlur(img, (5, 5), 0) for img in noise]).astype(np.float32) / 255.0
+
+    def best_time(fn):
+        best, result = float('inf'), None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000.0 / n_images, result
+
+    legacy_ms, legacy = best_time(lambda: np.array([_legacy_gabor_features(img) for img in stack]))
+    direct_ms, direct = best_time(lambda: GABOR_BANK.extract_batch(stack, method='direct'))
+    fft_ms, fft = best_time(lambda: GABOR_BANK.extract_batch(stack, method='fft'))
+
+    return {
+        'legacy_ms_per_image': legacy_ms,
+        'direct_ms_per_image': direct_ms,
+        'fft_ms_per_image': fft_ms,
+        'direct_max_abs_diff': float(np.abs(direct - legacy).max()),
+        'fft_max_abs_diff': float(np.abs(fft - legacy).max()),
+    }
+
+
+if __name__ == '__main__':
+    results = benchmark_gabor()
+    for key, value in results.items():
+        print(f"{key:>24}: {value:.6f}")
@@ -0,0 +1,393 @@
+"""Ekstraksi fitur paralel multi-proses untuk pelatihan dan penilaian massal.
+
+Gambar dikirim ke proses pekerja melalui blok shared memory, bukan dengan
+mem-pickle setiap ndarray. Setiap pekerja hanya menerima indeks awal dan
+akhir potongan, mengekstrak fitur dengan `extract_features_batch`, lalu
+menulis hasilnya langsung ke matriks fitur keluaran yang juga berada di
+shared memory. Karena setiap potongan menulis ke barisnya sendiri, urutan
+hasil selalu sama dengan urutan input.
+
+Input juga boleh berisi `AugmentedView` (lihat `src.features.augmentation`):
+hanya gambar basis yang di-resize ke shared memory, dan augmentasi murah
+(flip, rotasi) diterapkan oleh pekerja pada gambar 128x128.
+
+`transform_stream` memakai satu process pool dan dua slot shared memory untuk
+seluruh aliran: setiap potongan dibagi ke semua pekerja, dan potongan
+berikutnya disiapkan di slot lain selagi potongan saat ini diekstrak.
+"""
+
+import os
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import cv2
+from tqdm import tqdm
+
+from src.configs.config import IMAGE_SIZE, N_JOBS, FEATURE_CHUNK_SIZE
+from src.features.augmentation import StagingPlan, apply_resized_ops, is_augmented
+from src.features.batch_extraction import extract_features_batch, feature_dimension
+from src.utils.logger import logger
+
+
+# Status milik setiap proses pekerja, diisi oleh `_init_worker`.
+_worker_state = {}
+
+
+def _attach(name, shape, dtype):
+    """Menempelkan blok shared memory yang sudah ada sebagai array NumPy."""
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _init_worker(input_spec, output_spec):
+    """Initializer pekerja: menempelkan buffer input (opsional) dan output sekali per proses."""
+    blocks = []
+    if input_spec is not None:
+        block, images = _attach(*input_spec)
+        blocks.append(block)
+        _worker_state['images'] = images
+    block, features = _attach(*output_spec)
+    blocks.append(block)
+    _worker_state['features'] = features
+    _worker_state['blocks'] = blocks
+
+
+def _attached(spec):
+    """Buffer bersama berdasarkan spesifikasinya; ditempelkan sekali per proses lalu dipakai ulang."""
+    attached = _worker_state.setdefault('attached', {})
+    if spec[0] not in attached:
+        attached[spec[0]] = _attach(*spec)
+    return attached[spec[0]][1]
+
+
+def _extract_chunk(start, stop, task=None, specs=None):
+    """Mengekstrak fitur untuk baris [start, stop) dari buffer input bersama.
+
+    Jika `task` diberikan (dari `StagingPlan.task`), buffer input berisi gambar
+    basis dan baris keluaran dibentuk dengan menerapkan augmentasinya di sini.
+    `specs` (spesifikasi input, output) dipakai oleh `transform_stream`, yang
+    buffernya berganti antar-potongan; tanpa `specs` dipakai buffer dari `_init_worker`.
+    """
+    if specs is None:
+        images, features = _worker_state['images'], _worker_state['features']
+    else:
+        images, features = (_attached(spec) for spec in specs)
+    if task is None:
+        batch = images[start:stop]
+    else:
+        base_rows, ops, angles, shapes = task
+        batch = apply_resized_ops(images[base_rows], ops, angles, shapes)
+    features[start:stop] = extract_features_batch(batch)
+    return start, stop
+
+
+def _read_resized(path):
+    """Membaca dan mengubah ukuran satu berkas gambar; None jika gagal dibaca."""
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    return cv2.resize(image, IMAGE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def _load_and_extract(paths):
+    """Membaca sekumpulan berkas lalu mengekstrak fitur untuk yang berhasil dibaca.
+
+    Returns:
+        tuple: (list indeks relatif berkas yang valid, matriks fitur atau None).
+    """
+    images, valid = [], []
+    for i, path in enumerate(paths):
+        image = _read_resized(path)
+        if image is not None:
+            images.append(image)
+            valid.append(i)
+    if not images:
+        return valid, None
+    return valid, extract_features_batch(np.stack(images))
+
+
+def _extract_file_chunk(start, paths):
+    """Tugas pekerja: mengekstrak fitur dari berkas dan menulisnya ke buffer output bersama."""
+    valid, features = _load_and_extract(paths)
+    if features is not None:
+        _worker_state['features'][[start + i for i in valid]] = features
+    return start, valid
+
+
+def _resolve_workers(n_workers):
+    """Menerjemahkan n_workers gaya scikit-learn (-1 = semua core) menjadi bilangan positif."""
+    cpu_count = os.cpu_count() or 1
+    if n_workers is None or n_workers == 0:
+        return 1
+    if n_workers < 0:
+        return max(1, cpu_count + 1 + n_workers)
+    return n_workers
+
+
+class _StreamSlot:
+    """Pasangan buffer shared memory (input, output) yang dipakai ulang oleh `transform_stream`.
+
+    Buffer hanya dibuat ulang jika potongan berikutnya lebih besar dari kapasitasnya.
+    """
+
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.capacity = 0
+        self.blocks = []
+        self.specs = None
+
+    def reserve(self, n_rows):
+        """Memastikan kapasitas minimal `n_rows` baris; mengembalikan (gambar, fitur) bersama."""
+        if n_rows > self.capacity:
+            self.release()
+            width, height = IMAGE_SIZE
+            input_shape = (n_rows, height, width, 3)
+            output_shape = (n_rows, self.n_features)
+            self.blocks = [
+                shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(input_shape)))),
+                shared_memory.SharedMemory(
+                    create=True, size=max(1, int(np.prod(output_shape)) * np.dtype(np.float32).itemsize)),
+            ]
+            self.specs = ((self.blocks[0].name, input_shape, np.uint8),
+                          (self.blocks[1].name, output_shape, np.float32))
+            self.capacity = n_rows
+        return tuple(np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                     for block, (_, shape, dtype) in zip(self.blocks, self.specs))
+
+    def release(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+        self.capacity = 0
+
+
+class ParallelFeatureExtractor:
+    """Tahap ekstraksi fitur berbasis process pool dengan buffer shared memory.
+
+    Args:
+        n_workers (int): Jumlah proses pekerja. -1 berarti semua core, 1 berarti
+                         ekstraksi dijalankan di proses utama tanpa pool.
+        chunk_size (int): Jumlah gambar per tugas yang dikirim ke pekerja.
+        show_progress (bool): Menampilkan progress bar tqdm.
+    """
+
+    def __init__(self, n_workers=N_JOBS, chunk_size=FEATURE_CHUNK_SIZE, show_progress=True):
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self.show_progress = show_progress
+
+    def _chunks(self, n_items):
+        return [(start, min(start + self.chunk_size, n_items))
+                for start in range(0, n_items, self.chunk_size)]
+
+    def _stage_images(self, images, buffer):
+        """Menulis gambar (di-resize bila perlu) langsung ke buffer input bersama."""
+        width, height = IMAGE_SIZE
+        for i, image in enumerate(images):
+            if image.shape[:2] == (height, width):
+                buffer[i] = image
+            else:
+                cv2.resize(image, IMAGE_SIZE, dst=buffer[i], interpolation=cv2.INTER_AREA)
+
+    def transform(self, images, desc="Feature Extraction"):
+        """Mengekstrak matriks fitur untuk sekumpulan gambar secara paralel.
+
+        Args:
+            images (sequence): Gambar BGR uint8 (ukuran sembarang), tumpukan
+                               uint8 (N, 128, 128, 3), atau `AugmentedView`.
+            desc (str): Label progress bar.
+
+        Returns:
+            np.ndarray: Matriks fitur float32 berbentuk (N, D) dengan urutan baris
+                        sama seperti input.
+        """
+        n_images = len(images)
+        width, height = IMAGE_SIZE
+        n_features = feature_dimension()
+        n_workers = _resolve_workers(self.n_workers)
+        chunks = self._chunks(n_images)
+        plan = StagingPlan(images) if is_augmented(images) else None
+
+        if n_workers == 1 or len(chunks) <= 1:
+            output = np.empty((n_images, n_features), dtype=np.float32)
+            stack = np.empty((self.chunk_size, height, width, 3), dtype=np.uint8)
+            for start, stop in tqdm(chunks, desc=desc, disable=not self.show_progress):
+                if plan is None:
+                    self._stage_images(images[start:stop], stack)
+                    batch = stack[:stop - start]
+                else:
+                    batch = plan.render(start, stop, stack)
+                output[start:stop] = extract_features_batch(batch)
+            return output
+
+        # Dengan augmentasi, buffer input hanya berisi gambar basis unik.
+        n_staged = n_images if plan is None else len(plan.bases)
+        input_shape = (n_staged, height, width, 3)
+        output_shape = (n_images, n_features)
+        input_block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(input_shape))))
+        output_block = shared_memory.SharedMemory(
+            create=True, size=max(1, int(np.prod(output_shape)) * np.dtype(np.float32).itemsize))
+        try:
+            staged = np.ndarray(input_shape, dtype=np.uint8, buffer=input_block.buf)
+            if plan is None:
+                self._stage_images(images, staged)
+            else:
+                plan.stage(staged)
+            input_spec = (input_block.name, input_shape, np.uint8)
+            output_spec = (output_block.name, output_shape, np.float32)
+
+            logger.info(f"Ekstraksi fitur paralel: {n_images} gambar ({n_staged} disiapkan), "
+                        f"{n_workers} pekerja, potongan {self.chunk_size}.")
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(input_spec, output_spec)) as executor:
+                futures = [executor.submit(_extract_chunk, start, stop,
+                                           None if plan is None else plan.task(start, stop))
+                           for start, stop in chunks]
+                for future in tqdm(as_completed(futures), total=len(futures), desc=desc,
+                                   disable=not self.show_progress):
+                    future.result()
+
+            output = np.ndarray(output_shape, dtype=np.float32, buffer=output_block.buf).copy()
+            del staged
+        finally:
+            input_block.close()
+            input_block.unlink()
+            output_block.close()
+            output_block.unlink()
+        return output
+
+    def transform_stream(self, chunks, desc="Feature Extraction"):
+        """Mengekstrak fitur dari aliran potongan tanpa menampung seluruh gambar di RAM.
+
+        Satu process pool dan dua slot shared memory dipakai untuk seluruh aliran.
+        Setiap potongan dibagi rata ke semua pekerja; selagi potongan saat ini
+        diekstrak, potongan berikutnya sudah dibaca (dekode berjalan di thread
+        pool `stream_images_from_folder`) dan disiapkan di slot lainnya.
+
+        Args:
+            chunks (iterable): Potongan (images, labels, filenames), misalnya dari
+                               `stream_images_from_folder` atau `augment_stream`.
+            desc (str): Label progress bar.
+
+        Returns:
+            tuple: Sebuah tuple berisi:
+                - features (np.ndarray): Matriks fitur float32 (N, D).
+                - labels (np.ndarray): Label integer yang sesuai.
+                - filenames (list): Nama file yang sesuai.
+        """
+        n_workers = _resolve_workers(self.n_workers)
+        n_features = feature_dimension()
+        feature_blocks, label_blocks, filenames = [], [], []
+        progress = tqdm(chunks, desc=desc, unit="chunk", disable=not self.show_progress)
+
+        if n_workers == 1:
+            show_progress = self.show_progress
+            self.show_progress = False
+            try:
+                for images, labels, chunk_filenames in progress:
+                    feature_blocks.append(self.transform(images))
+                    label_blocks.append(np.asarray(labels))
+                    filenames.extend(chunk_filenames)
+            finally:
+                self.show_progress = show_progress
+        else:
+            slots = [_StreamSlot(n_features), _StreamSlot(n_features)]
+
+            def collect(pending):
+                slot_features, futures, n_rows = pending
+                for future in futures:
+                    future.result()
+                feature_blocks.append(slot_features[:n_rows].copy())
+
+            try:
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    pending = None
+                    for index, (images, labels, chunk_filenames) in enumerate(progress):
+                        # Slot ini terakhir dipakai dua potongan sebelumnya, yang sudah dikumpulkan.
+                        slot = slots[index % 2]
+                        n_rows = len(images)
+                        plan = StagingPlan(images) if is_augmented(images) else None
+                        staged, slot_features = slot.reserve(n_rows)
+                        if plan is None:
+                            self._stage_images(images, staged)
+                        else:
+                            plan.stage(staged)
+                        step = max(1, min(self.chunk_size, math.ceil(n_rows / n_workers)))
+                        bounds = [(start, min(start + step, n_rows)) for start in range(0, n_rows, step)]
+                        futures = [executor.submit(_extract_chunk, start, stop,
+                                                   None if plan is None else plan.task(start, stop), slot.specs)
+                                   for start, stop in bounds]
+                        if pending is not None:
+                            collect(pending)
+                        pending = (slot_features, futures, n_rows)
+                        label_blocks.append(np.asarray(labels))
+                        filenames.extend(chunk_filenames)
+                    if pending is not None:
+                        collect(pending)
+            finally:
+                for slot in slots:
+                    slot.release()
+
+        if not feature_blocks:
+            return np.empty((0, n_features), dtype=np.float32), np.empty(0, dtype=int), []
+        return np.vstack(feature_blocks), np.concatenate(label_blocks), filenames
+
+    def transform_files(self, paths, desc="Feature Extraction"):
+        """Mengekstrak fitur langsung dari berkas gambar; pekerja membaca berkasnya sendiri.
+
+        Hanya path yang dikirim ke pekerja, sehingga piksel tidak pernah
+        berpindah antar-proses. Berkas yang gagal dibaca ditandai tidak valid.
+
+        Args:
+            paths (list of str): Path berkas gambar.
+            desc (str): Label progress bar.
+
+        Returns:
+            tuple: Sebuah tuple berisi:
+                - features (np.ndarray): Matriks fitur float32 (N, D); baris untuk
+                  berkas yang gagal dibaca bernilai NaN.
+                - valid (np.ndarray): Mask boolean berkas yang berhasil diproses.
+        """
+        n_files = len(paths)
+        n_features = feature_dimension()
+        n_workers = _resolve_workers(self.n_workers)
+        chunks = self._chunks(n_files)
+        valid = np.zeros(n_files, dtype=bool)
+
+        if n_workers == 1 or len(chunks) <= 1:
+            output = np.full((n_files, n_features), np.nan, dtype=np.float32)
+            for start, stop in tqdm(chunks, desc=desc, disable=not self.show_progress):
+                chunk_valid, chunk_features = _load_and_extract(paths[start:stop])
+                rows = [start + i for i in chunk_valid]
+                if chunk_features is not None:
+                    output[rows] = chunk_features
+                valid[rows] = True
+        else:
+            output_shape = (n_files, n_features)
+            output_block = shared_memory.SharedMemory(
+                create=True, size=max(1, int(np.prod(output_shape)) * np.dtype(np.float32).itemsize))
+            try:
+                features = np.ndarray(output_shape, dtype=np.float32, buffer=output_block.buf)
+                features[:] = np.nan
+                output_spec = (output_block.name, output_shape, np.float32)
+                with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                         initargs=(None, output_spec)) as executor:
+                    futures = [executor.submit(_extract_file_chunk, start, paths[start:stop])
+                               for start, stop in chunks]
+                    for future in tqdm(as_completed(futures), total=len(futures), desc=desc,
+                                       disable=not self.show_progress):
+                        start, chunk_valid = future.result()
+                        valid[[start + i for i in chunk_valid]] = True
+                output = features.copy()
+                del features
+            finally:
+                output_block.close()
+                output_block.unlink()
+
+        n_invalid = int((~valid).sum())
+        if n_invalid:
+            logger.warning(f"{n_invalid} berkas gagal dibaca dan dilewati.")
+        return output, valid
@@ -0,0 +1,200 @@
+"""Gerbang anomali bertahap (cascade) dengan deskriptor murah di tahap pertama.
+
+Detektor anomali satu tahap bekerja pada vektor fitur gabungan, sehingga
+deskriptor mahal (HOG 8100 dimensi, 24 konvolusi Gabor, GLCM 12 pasangan)
+tetap dihitung untuk gambar yang jelas bukan cuaca (dokumen, potret), lalu
+dibuang. Modul ini melatih gerbang tahap pertama yang hanya memakai
+deskriptor murah (histogram warna HSV, histogram Sobel, dan color moments):
+
+1. Tahap pertama: StandardScaler -> SVC RBF pada deskriptor murah. Gambar
+   dengan skor keputusan di bawah ambang langsung ditolak sebagai anomali.
+2. Tahap kedua: detektor anomali penuh yang sudah ada, hanya untuk gambar
+   yang lolos tahap pertama (normal atau belum pasti).
+
+Ambang dipilih dari skor validasi silang pada data latih sehingga proporsi
+gambar cuaca yang ikut ditolak tahap pertama tidak melebihi
+`max_normal_rejection`. Kolom deskriptor murah diambil langsung dari matriks
+fitur gabungan (lihat `feature_layout`), jadi tidak perlu ekstraksi ulang.
+
+Gerbang disimpan sebagai dict biasa (pipeline scikit-learn, ambang, dan
+nama deskriptor) agar aplikasi web dapat memuatnya tanpa kelas tambahan.
+"""
+
+import time
+
+import cv2
+import numpy as np
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from src.configs.config import RANDOM_STATE
+from src.features.batch_extraction import (
+    feature_layout, extract_features_batch, color_histogram_batch, sobel_histogram_batch, color_moments_batch
+)
+from src.utils.logger import logger
+
+
+# Naikkan versi ini jika struktur dict gerbang berubah.
+GATE_FORMAT_VERSION = 1
+
+# Deskriptor tahap pertama, dalam urutan kolom vektor fitur gabungan.
+CHEAP_DESCRIPTORS = ('color_histogram', 'sobel', 'color_moments')
+
+# Label detektor anomali: 1 untuk gambar cuaca (normal), -1 untuk anomali.
+NORMAL_LABEL, ANOMALY_LABEL = 1, -1
+
+
+def cheap_columns(descriptors=CHEAP_DESCRIPTORS):
+    """Mengembalikan indeks kolom deskriptor murah di dalam vektor fitur gabungan.
+
+    Args:
+        descriptors (tuple of str): Nama deskriptor (kunci `feature_layout`).
+
+    Returns:
+        np.ndarray: Indeks kolom bertipe int, terurut sesuai `descriptors`.
+    """
+    layout = feature_layout()
+    return np.concatenate([np.arange(layout[name].start, layout[name].stop) for name in descriptors])
+
+
+def cheap_features_batch(images):
+    """Menghitung hanya deskriptor murah untuk tumpukan gambar yang sudah diubah ukurannya.
+
+    Args:
+        images (np.ndarray): Tumpukan gambar BGR uint8 berbentuk (N, 128, 128, 3).
+
+    Returns:
+        np.ndarray: Matriks float32 (N, D_murah) dengan kolom yang sama seperti
+                    `X[:, cheap_columns()]`.
+    """
+    n_images, height, width, _ = images.shape
+    tall = np.ascontiguousarray(images).reshape(n_images * height, width, 3)
+    gray = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(n_images, height, width)
+    hsv = cv2.cvtColor(tall, cv2.COLOR_BGR2HSV).reshape(n_images, height, width, 3)
+    lab = cv2.cvtColor(tall, cv2.COLOR_BGR2Lab).reshape(n_images, height, width, 3)
+    features = np.hstack([color_histogram_batch(hsv), sobel_histogram_batch(gray), color_moments_batch(lab)])
+    return np.nan_to_num(features).astype(np.float32)
+
+
+def train_gate(X_train, y_train, C=10.0, gamma='scale', max_normal_rejection=0.005, cv=5):
+    """Melatih gerbang tahap pertama dan memilih ambang penolakannya.
+
+    Args:
+        X_train (np.ndarray): Matriks fitur gabungan data latih.
+        y_train (np.ndarray): Label (1 normal, -1 anomali).
+        C (float): Parameter regularisasi SVC.
+        gamma (float or str): Parameter gamma kernel RBF.
+        max_normal_rejection (float): Proporsi maksimum gambar normal yang boleh
+                                      ditolak oleh tahap pertama.
+        cv (int): Jumlah fold validasi silang untuk kalibrasi ambang.
+
+    Returns:
+        dict: Gerbang berisi 'format_version', 'pipeline', 'threshold',
+              'descriptors', dan 'max_normal_rejection'.
+    """
+    X_cheap = np.asarray(X_train)[:, cheap_columns()]
+    y_train = np.asarray(y_train)
+    pipeline = Pipeline([
+        ('scaler', StandardScaler()),
+        ('svc', SVC(kernel='rbf', C=C, gamma=gamma, class_weight='balanced', random_state=RANDOM_STATE)),
+    ])
+
+    # Skor out-of-fold agar ambang tidak terlalu optimistis terhadap data latih.
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=RANDOM_STATE)
+    scores = cross_val_predict(pipeline, X_cheap, y_train, cv=folds, method='decision_function')
+    threshold = float(np.quantile(scores[y_train == NORMAL_LABEL], max_normal_rejection))
+    anomaly_rejected = float(np.mean(scores[y_train == ANOMALY_LABEL] < threshold))
+    logger.info(f"Ambang gerbang {threshold:.4f}: menolak {anomaly_rejected:.1%} anomali (validasi silang), "
+                f"maksimum {max_normal_rejection:.1%} gambar normal")
+
+    pipeline.fit(X_cheap, y_train)
+    return {
+        'format_version': GATE_FORMAT_VERSION,
+        'pipeline': pipeline,
+        'threshold': threshold,
+        'descriptors': list(CHEAP_DESCRIPTORS),
+        'max_normal_rejection': max_normal_rejection,
+    }
+
+
+def gate_rejects(gate, X_cheap):
+    """Mengembalikan mask gambar yang ditolak tahap pertama.
+
+    Args:
+        gate (dict): Gerbang hasil `train_gate`.
+        X_cheap (np.ndarray): Matriks deskriptor murah.
+
+    Returns:
+        np.ndarray: Mask boolean; True berarti anomali yang ditolak lebih awal.
+    """
+    return gate['pipeline'].decision_function(X_cheap) < gate['threshold']
+
+
+def measure_extraction_cost(images, repeats=3):
+    """Mengukur biaya ekstraksi deskriptor murah dan vektor fitur penuh per gambar.
+
+    Args:
+        images (np.ndarray): Tumpukan gambar BGR uint8 (N, 128, 128, 3).
+        repeats (int): Jumlah pengulangan; waktu terbaik yang dipakai.
+
+    Returns:
+        tuple: (ms deskriptor murah per gambar, ms fitur penuh per gambar).
+    """
+    def best_ms(fn):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn(images)
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000.0 / len(images)
+
+    return best_ms(cheap_features_batch), best_ms(extract_features_batch)
+
+
+def evaluate_cascade(gate, detector, X_test, y_test, cheap_ms=None, full_ms=None):
+    """Membandingkan cascade dengan detektor anomali satu tahap pada data uji.
+
+    Args:
+        gate (dict): Gerbang hasil `train_gate`.
+        detector (estimator): Detektor anomali satu tahap pada vektor fitur penuh.
+        X_test (np.ndarray): Matriks fitur gabungan data uji.
+        y_test (np.ndarray): Label uji (1 normal, -1 anomali).
+        cheap_ms (float, optional): Biaya deskriptor murah per gambar (ms).
+        full_ms (float, optional): Biaya fitur penuh per gambar (ms).
+
+    Returns:
+        dict: Tingkat penolakan tahap pertama, akurasi dan recall anomali kedua
+              pendekatan, jumlah putusan yang berubah, dan (jika biaya diberikan)
+              estimasi biaya ekstraksi per gambar serta penghematannya.
+    """
+    X_test, y_test = np.asarray(X_test), np.asarray(y_test)
+    rejected = gate_rejects(gate, X_test[:, cheap_columns()])
+    single = detector.predict(X_test)
+    cascade = np.where(rejected, ANOMALY_LABEL, single)
+    is_anomaly = y_test == ANOMALY_LABEL
+
+    report = {
+        'rejection_rate': float(rejected.mean()),
+        'anomaly_rejection_rate': float(rejected[is_anomaly].mean()) if is_anomaly.any() else 0.0,
+        'normal_false_rejection_rate': float(rejected[~is_anomaly].mean()) if (~is_anomaly).any() else 0.0,
+        'single_stage_accuracy': float(accuracy_score(y_test, single)),
+        'cascade_accuracy': float(accuracy_score(y_test, cascade)),
+        'single_stage_anomaly_recall': float(np.mean(single[is_anomaly] == ANOMALY_LABEL)) if is_anomaly.any() else 0.0,
+        'cascade_anomaly_recall': float(np.mean(cascade[is_anomaly] == ANOMALY_LABEL)) if is_anomaly.any() else 0.0,
+        'decisions_changed': int(np.sum(cascade != single)),
+    }
+    if cheap_ms is not None and full_ms is not None:
+        # Gambar yang lolos tahap pertama tetap membayar ekstraksi penuh.
+        cascade_ms = cheap_ms + (1.0 - report['rejection_rate']) * full_ms
+        report.update({
+            'single_stage_ms_per_image': full_ms,
+            'cascade_ms_per_image': cascade_ms,
+            'compute_saved': 1.0 - cascade_ms / full_ms,
+        })
+
+    for key, value in report.items():
+        logger.info(f"{key:>28}: {value:.4f}" if isinstance(value, float) else f"{key:>28}: {value}")
+    return report
@@ -0,0 +1,218 @@
+"""Backend kernel aproksimasi (Nyström / random Fourier features) untuk SVM.
+
+`SVC` dengan kernel RBF eksak memiliki biaya pelatihan yang tumbuh kira-kira
+kuadratik terhadap jumlah sampel, sehingga tuning hanya dijalankan pada
+subset data. Modul ini menyediakan kepala klasifikasi alternatif yang
+mengganti kernel eksak dengan peta fitur eksplisit (`Nystroem` atau
+`RBFSampler`) diikuti classifier linear (`LogisticRegression`), sehingga
+biaya pelatihan tumbuh linear terhadap jumlah sampel.
+
+Seluruh kepala klasifikasi hanya tersusun dari komponen scikit-learn, sehingga
+model yang disimpan tetap dapat dimuat oleh aplikasi web tanpa kode tambahan
+dan tetap menyediakan `fit`/`predict`/`predict_proba`. Trade-off akurasi dan
+kecepatan diatur melalui `n_components`.
+
+Gamma string ('scale'/'auto') diselesaikan menjadi nilai numerik oleh
+`fit_classifier_pipeline` dari input peta fitur saat fit, dengan rumus yang
+sama seperti `SVC`, sehingga backend aproksimasi memakai kernel yang sama
+dengan SVC yang dibandingkan. Nilai C `LogisticRegression` tidak sebanding
+dengan C `SVC`, sehingga kepala linear memakai grid C sendiri
+(`LINEAR_C_GRID`).
+"""
+
+import time
+
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from src.configs.config import KERNEL_APPROX_COMPONENTS, RANDOM_STATE
+from src.utils.logger import logger
+
+
+BACKENDS = ('svc', 'nystroem', 'rff')
+
+# Grid C untuk kepala `LogisticRegression`; C kecil dari grid SVC berarti regularisasi berlebihan di sini.
+LINEAR_C_GRID = [0.1, 1.0, 10.0]
+
+# Nama langkah peta fitur di dalam pipeline kepala klasifikasi (nama otomatis make_pipeline).
+_MAP_STEP = {'nystroem': 'nystroem', 'rff': 'rbfsampler'}
+
+
+def _gamma_value(gamma, X):
+    """Nilai numerik gamma gaya `SVC` ('scale' = 1 / (n_features * X.var()), 'auto' = 1 / n_features)."""
+    if gamma == 'scale':
+        variance = float(np.var(X, dtype=np.float64))
+        return 1.0 / (X.shape[1] * variance) if variance > 0 else 1.0
+    if gamma == 'auto':
+        return 1.0 / X.shape[1]
+    return gamma
+
+
+def fit_classifier_pipeline(pipeline, X, y):
+    """Melatih pipeline klasifikasi, menyelesaikan gamma string peta fitur dari inputnya.
+
+    `Nystroem` tidak menerima gamma string, dan 'scale' harus dihitung dari
+    input peta fitur (keluaran PCA), bukan dari fitur mentah. Jika kepala
+    pipeline berupa peta fitur dengan gamma string, tahap sebelumnya dilatih
+    terlebih dahulu, gamma diganti nilai numeriknya, lalu kepala dilatih.
+
+    Args:
+        pipeline (Pipeline): Pipeline (praproses ... -> kepala dari `build_classifier_head`).
+        X (np.ndarray): Matriks fitur latih.
+        y (np.ndarray): Label latih.
+
+    Returns:
+        Pipeline: `pipeline` yang sama setelah dilatih.
+    """
+    head = pipeline.steps[-1][1]
+    feature_map = head.steps[0][1] if isinstance(head, Pipeline) else None
+    if feature_map is None or not isinstance(feature_map.gamma, str):
+        return pipeline.fit(X, y)
+    Xt = X
+    for _, step in pipeline.steps[:-1]:
+        Xt = step.fit_transform(Xt, y)
+    feature_map.set_params(gamma=_gamma_value(feature_map.gamma, Xt))
+    head.fit(Xt, y)
+    return pipeline
+
+
+def build_classifier_head(backend='svc', C=1.0, gamma='scale', n_components=KERNEL_APPROX_COMPONENTS,
+                          probability=True, class_weight='balanced', random_state=RANDOM_STATE):
+    """Membuat tahap klasifikasi terakhir sesuai backend yang dipilih.
+
+    Args:
+        backend (str): 'svc' untuk SVC RBF eksak, 'nystroem' atau 'rff' untuk
+                       kernel aproksimasi dengan classifier linear.
+        C (float): Parameter regularisasi.
+        gamma (float or str): Parameter gamma kernel RBF; string pada backend
+                              aproksimasi diselesaikan oleh `fit_classifier_pipeline`.
+        n_components (int): Dimensi peta fitur kernel aproksimasi.
+        probability (bool): Mengaktifkan `predict_proba` pada backend 'svc'
+                            (backend aproksimasi selalu menyediakannya).
+        class_weight (str or dict): Bobot kelas.
+        random_state (int): Seed untuk reproduktifitas.
+
+    Returns:
+        estimator: `SVC` atau pipeline (peta fitur -> `LogisticRegression`).
+
+    Raises:
+        ValueError: Jika backend tidak dikenali.
+    """
+    if backend == 'svc':
+        return SVC(kernel='rbf', C=C, gamma=gamma, probability=probability,
+                   random_state=random_state, class_weight=class_weight)
+    if backend == 'nystroem':
+        feature_map = Nystroem(kernel='rbf', gamma=gamma,
+                               n_components=n_components, random_state=random_state)
+    elif backend == 'rff':
+        feature_map = RBFSampler(gamma=gamma,
+                                 n_components=n_components, random_state=random_state)
+    else:
+        raise ValueError(f"Backend model tidak dikenali: {backend}. Pilihan: {BACKENDS}")
+    classifier = LogisticRegression(C=C, class_weight=class_weight, max_iter=1000, random_state=random_state)
+    return make_pipeline(feature_map, classifier)
+
+
+def backend_param_grid(param_grid, backend='svc', prefix='', X=None, linear_C_grid=LINEAR_C_GRID):
+    """Menerjemahkan grid {'C': [...], 'gamma': [...]} ke nama parameter backend.
+
+    Untuk backend aproksimasi, nilai C diambil dari `linear_C_grid` (skala C
+    `LogisticRegression` berbeda dari `SVC`), dan gamma string diselesaikan
+    menjadi nilai numerik dari `X` karena pencarian pada pipeline biasa tidak
+    melewati `fit_classifier_pipeline`.
+
+    Args:
+        param_grid (dict): Grid dengan kunci 'C' dan/atau 'gamma' (skala `SVC`).
+        backend (str): Backend kepala klasifikasi.
+        prefix (str): Awalan nama langkah kepala di pipeline luar, misalnya 'svc__'.
+        X (np.ndarray, optional): Input kepala klasifikasi (misalnya fitur latih setelah
+                                  StandardScaler); wajib jika grid berisi gamma string.
+        linear_C_grid (list of float): Grid C untuk kepala `LogisticRegression`.
+
+    Returns:
+        dict: Grid yang dapat langsung dipakai oleh GridSearchCV/RandomizedSearchCV.
+
+    Raises:
+        ValueError: Jika gamma string dipakai pada backend aproksimasi tanpa `X`.
+    """
+    if backend == 'svc':
+        return {f"{prefix}{name}": values for name, values in param_grid.items()}
+    grid = {}
+    if 'C' in param_grid:
+        grid[f"{prefix}logisticregression__C"] = list(linear_C_grid)
+    if 'gamma' in param_grid:
+        gammas = []
+        for gamma in param_grid['gamma']:
+            if isinstance(gamma, str):
+                if X is None:
+                    raise ValueError(f"Gamma '{gamma}' untuk backend {backend} memerlukan X untuk dihitung.")
+                gamma = _gamma_value(gamma, X)
+            # 'scale' dan 'auto' dapat bernilai sama pada input terstandardisasi.
+            if gamma not in gammas:
+                gammas.append(gamma)
+        grid[f"{prefix}{_MAP_STEP[backend]}__gamma"] = gammas
+    return grid
+
+
+def benchmark_backends(X_train, y_train, X_test, y_test, C=1.0, gamma='scale', backends=BACKENDS,
+                       n_components=KERNEL_APPROX_COMPONENTS, latency_repeats=20, linear_C=1.0):
+    """Membandingkan backend kernel pada split yang sama.
+
+    Setiap backend dilatih di atas StandardScaler -> PCA(0.95) yang sama
+    dengan pipeline produksi, langsung dari matriks fitur.
+
+    Args:
+        X_train (np.ndarray): Matriks fitur latih.
+        y_train (np.ndarray): Label latih.
+        X_test (np.ndarray): Matriks fitur uji.
+        y_test (np.ndarray): Label uji.
+        C (float): Parameter regularisasi backend 'svc'.
+        gamma (float or str): Parameter gamma kernel RBF.
+        backends (tuple of str): Backend yang dibandingkan.
+        n_components (int): Dimensi peta fitur kernel aproksimasi.
+        latency_repeats (int): Jumlah pengulangan pengukuran latensi satu gambar.
+        linear_C (float): Parameter regularisasi `LogisticRegression` backend aproksimasi.
+
+    Returns:
+        list of dict: Waktu latih (detik), latensi `predict_proba` per gambar
+                      untuk batch uji dan satu gambar (milidetik), serta akurasi
+                      uji per backend.
+    """
+    results = []
+    for backend in backends:
+        model = make_pipeline(
+            StandardScaler(),
+            PCA(n_components=0.95, random_state=RANDOM_STATE),
+            build_classifier_head(backend, C=C if backend == 'svc' else linear_C, gamma=gamma,
+                                  n_components=n_components)
+        )
+        start = time.perf_counter()
+        fit_classifier_pipeline(model, X_train, y_train)
+        train_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        proba = model.predict_proba(X_test)
+        batch_ms = (time.perf_counter() - start) * 1000.0 / len(X_test)
+
+        start = time.perf_counter()
+        for _ in range(latency_repeats):
+            model.predict_proba(X_test[:1])
+        single_ms = (time.perf_counter() - start) * 1000.0 / latency_repeats
+
+        accuracy = accuracy_score(y_test, model.classes_[np.argmax(proba, axis=1)])
+        results.append({
+            'backend': backend,
+            'train_time_s': train_time,
+            'batch_ms_per_image': batch_ms,
+            'single_ms_per_image': single_ms,
+            'accuracy': accuracy,
+        })
+        logger.info(f"[{backend}] latih {train_time:.2f} s | batch {batch_ms:.3f} ms/gambar | "
+                    f"tunggal {single_ms:.3f} ms | akurasi {accuracy:.4f}")
+    return results
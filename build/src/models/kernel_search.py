@@ -0,0 +1,275 @@
+"""Pencarian hyperparameter SVC RBF yang memakai ulang matriks Gram.
+
+`GridSearchCV` atas pipeline StandardScaler -> PCA -> SVC melatih ulang
+seluruh pipeline untuk setiap sel (C, gamma) dan setiap fold, padahal:
+
+- StandardScaler dan PCA hanya bergantung pada data latih fold, bukan pada
+  C atau gamma;
+- kernel RBF untuk satu gamma identik untuk semua nilai C, dan untuk setiap
+  gamma hanya merupakan `exp(-gamma * D)` dari matriks jarak kuadrat D yang
+  sama.
+
+`PrecomputedKernelSearch` memanfaatkan kedua hal tersebut. Scaler dan PCA
+di-fit sekali per fold, D dihitung sekali per fold, lalu setiap gamma
+menghasilkan satu kernel yang dipakai oleh `SVC(kernel='precomputed')` untuk
+seluruh nilai C. Dengan `halving=True`, kandidat disaring dengan successive
+halving: iterasi awal memakai subset kecil data latih fold (cukup dengan
+mengambil sub-matriks kernel), dan hanya 1/`factor` kandidat terbaik yang
+lanjut ke iterasi berikutnya dengan data `factor` kali lebih banyak. Iterasi
+terakhir selalu memakai seluruh data latih setiap fold.
+
+Tanpa halving, skor dan `best_params_` sama dengan `GridSearchCV` (fold
+`StratifiedKFold` yang sama, seluruh data latih fold, akurasi, dan pemutus
+seri berupa urutan `ParameterGrid`). Dengan halving, skor kandidat yang
+bertahan hingga iterasi terakhir sama dengan skor `GridSearchCV`-nya. `compare_with_grid_search` menghasilkan laporan waktu
+terhadap pendekatan `GridSearchCV` saat ini.
+"""
+
+import math
+import time
+
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.metrics import accuracy_score
+from sklearn.metrics.pairwise import euclidean_distances
+from sklearn.model_selection import GridSearchCV, ParameterGrid, check_cv, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from src.configs.config import RANDOM_STATE
+from src.models.kernel_approximation import build_classifier_head
+from src.utils.logger import logger
+
+
+def _resolve_gamma(gamma, n_features, variance):
+    """Menerjemahkan gamma 'scale'/'auto' ke nilai numerik seperti `SVC`."""
+    if gamma == 'scale':
+        return 1.0 / (n_features * variance) if variance != 0 else 1.0
+    if gamma == 'auto':
+        return 1.0 / n_features
+    return float(gamma)
+
+
+class _FoldKernel:
+    """Data satu fold: jarak kuadrat hasil PCA dan label, dihitung sekali.
+
+    Attributes:
+        train_sq (np.ndarray): Jarak kuadrat antar sampel latih (n_latih, n_latih).
+        test_sq (np.ndarray): Jarak kuadrat sampel validasi ke sampel latih (n_val, n_latih).
+        y_train (np.ndarray): Label latih fold.
+        y_test (np.ndarray): Label validasi fold.
+    """
+
+    def __init__(self, X, y, train, test, random_state):
+        preprocess = make_pipeline(StandardScaler(), PCA(n_components=0.95, random_state=random_state))
+        Z_train = preprocess.fit_transform(X[train])
+        Z_test = preprocess.transform(X[test])
+        self.train_sq = euclidean_distances(Z_train, squared=True)
+        self.test_sq = euclidean_distances(Z_test, Z_train, squared=True)
+        self.y_train, self.y_test = y[train], y[test]
+        self.n_features = Z_train.shape[1]
+        self.variance = float(Z_train.var())
+
+    def kernels(self, gamma, rows=None):
+        """Kernel RBF latih dan validasi untuk satu gamma, opsional pada subset baris latih."""
+        gamma = _resolve_gamma(gamma, self.n_features, self.variance)
+        train_sq = self.train_sq if rows is None else self.train_sq[np.ix_(rows, rows)]
+        test_sq = self.test_sq if rows is None else self.test_sq[:, rows]
+        return np.exp(-gamma * train_sq), np.exp(-gamma * test_sq)
+
+
+class PrecomputedKernelSearch:
+    """Pencarian grid (C, gamma) untuk StandardScaler -> PCA -> SVC RBF dengan kernel yang dipakai ulang.
+
+    Antarmukanya mengikuti objek pencarian scikit-learn: panggil `fit(X, y)`
+    pada matriks fitur, lalu baca `best_params_`, `best_score_`, dan
+    `cv_results_`.
+
+    Args:
+        param_grid (dict): Grid dengan kunci 'C' dan 'gamma'.
+        cv (int or splitter): Skema validasi silang; int berarti `StratifiedKFold`.
+        halving (bool): Menyaring kandidat dengan successive halving.
+        factor (int): Proporsi kandidat yang dipertahankan (1/factor) dan pengali
+                      jumlah sampel antar-iterasi halving.
+        min_resources (int, optional): Jumlah sampel latih per fold pada iterasi
+                                       pertama; default dipilih agar iterasi
+                                       terakhir memakai seluruh data latih fold.
+        class_weight (str or dict): Bobot kelas SVC.
+        random_state (int): Seed PCA dan subset halving.
+    """
+
+    def __init__(self, param_grid, cv=3, halving=False, factor=3, min_resources=None,
+                 class_weight='balanced', random_state=RANDOM_STATE):
+        self.param_grid = param_grid
+        self.cv = cv
+        self.halving = halving
+        self.factor = factor
+        self.min_resources = min_resources
+        self.class_weight = class_weight
+        self.random_state = random_state
+
+    def _schedule(self, n_candidates, n_train, n_classes, n_splits):
+        """Jumlah sampel latih per fold untuk setiap iterasi; None berarti seluruh data latih fold."""
+        if not self.halving:
+            return [None]
+        n_iterations = 1 + int(math.floor(math.log(n_candidates, self.factor))) if n_candidates > 1 else 1
+        smallest = 2 * n_splits * n_classes
+        min_resources = self.min_resources or n_train // self.factor ** (n_iterations - 1)
+        min_resources = max(min_resources, smallest)
+        return [min(n_train, min_resources * self.factor ** i) for i in range(n_iterations - 1)] + [None]
+
+    def _subset(self, fold, n_rows):
+        """Indeks subset latih terstratifikasi yang deterministik untuk satu fold.
+
+        Mengembalikan None (seluruh data latih fold) jika `n_rows` None atau jika
+        subset akan menyisakan kurang dari satu sampel per kelas di luar subset,
+        karena split terstratifikasi memerlukan setiap kelas di kedua sisi.
+        """
+        n_classes = len(np.unique(fold.y_train))
+        if n_rows is None or n_rows > len(fold.y_train) - n_classes:
+            return None
+        rows, _ = train_test_split(np.arange(len(fold.y_train)), train_size=max(n_rows, n_classes),
+                                   stratify=fold.y_train, random_state=self.random_state)
+        return np.sort(rows)
+
+    def _score_candidates(self, folds, candidates, n_rows):
+        """Skor akurasi (n_kandidat, n_fold); kernel dihitung sekali per gamma per fold."""
+        scores = np.empty((len(candidates), len(folds)))
+        by_gamma = {}
+        for index, params in enumerate(candidates):
+            by_gamma.setdefault(params['gamma'], []).append(index)
+        for f, fold in enumerate(folds):
+            rows = self._subset(fold, n_rows)
+            y_train = fold.y_train if rows is None else fold.y_train[rows]
+            for gamma, indices in by_gamma.items():
+                K_train, K_test = fold.kernels(gamma, rows)
+                for index in indices:
+                    model = SVC(kernel='precomputed', C=candidates[index]['C'], class_weight=self.class_weight)
+                    model.fit(K_train, y_train)
+                    scores[index, f] = accuracy_score(fold.y_test, model.predict(K_test))
+        return scores
+
+    def fit(self, X, y):
+        """Menjalankan pencarian pada matriks fitur.
+
+        Args:
+            X (np.ndarray): Matriks fitur (N, D).
+            y (np.ndarray): Label.
+
+        Returns:
+            PrecomputedKernelSearch: Objek ini, dengan `best_params_`, `best_score_`,
+                                     `cv_results_`, dan `timing_` terisi.
+        """
+        X, y = np.asarray(X), np.asarray(y)
+        cv = check_cv(self.cv, y, classifier=True)
+        splits = list(cv.split(X, y))
+        candidates = list(ParameterGrid(self.param_grid))
+
+        start = time.perf_counter()
+        folds = [_FoldKernel(X, y, train, test, self.random_state) for train, test in splits]
+        preprocess_time = time.perf_counter() - start
+
+        n_train = min(len(fold.y_train) for fold in folds)
+        schedule = self._schedule(len(candidates), n_train, len(np.unique(y)), len(splits))
+        mean_scores = np.full(len(candidates), np.nan)
+        split_scores = np.full((len(candidates), len(splits)), np.nan)
+        n_resources = np.zeros(len(candidates), dtype=int)
+        alive = list(range(len(candidates)))
+        n_fits = 0
+
+        start = time.perf_counter()
+        for iteration, n_rows in enumerate(schedule):
+            scores = self._score_candidates(folds, [candidates[i] for i in alive], n_rows)
+            n_fits += scores.size
+            split_scores[alive], mean_scores[alive] = scores, scores.mean(axis=1)
+            n_resources[alive] = n_train if n_rows is None else n_rows
+            logger.info(f"Iterasi {iteration}: {len(alive)} kandidat, "
+                        f"{'seluruh' if n_rows is None else n_rows} sampel latih per fold, "
+                        f"skor terbaik {scores.mean(axis=1).max():.4f}")
+            if iteration < len(schedule) - 1:
+                # Urutan stabil: kandidat dengan skor sama dipertahankan sesuai urutan ParameterGrid.
+                keep = max(1, math.ceil(len(alive) / self.factor))
+                order = np.argsort(-scores.mean(axis=1), kind='stable')[:keep]
+                alive = [alive[i] for i in sorted(order)]
+        search_time = time.perf_counter() - start
+
+        final = np.array(alive)
+        best = int(final[np.argmax(mean_scores[final])])
+        self.best_index_ = best
+        self.best_params_ = candidates[best]
+        self.best_score_ = float(mean_scores[best])
+        self.cv_results_ = {
+            'params': candidates,
+            'mean_test_score': mean_scores,
+            'split_test_scores': split_scores,
+            'n_resources': n_resources,
+        }
+        self.timing_ = {
+            'preprocess_s': preprocess_time,
+            'search_s': search_time,
+            'total_s': preprocess_time + search_time,
+            'n_fits': n_fits,
+            'n_iterations': len(schedule),
+        }
+        logger.info(f"Parameter terbaik: {self.best_params_} (skor {self.best_score_:.4f}); "
+                    f"{n_fits} fit dalam {self.timing_['total_s']:.2f} s")
+        return self
+
+
+def compare_with_grid_search(X, y, param_grid, cv=3, factor=3, probability=True, random_state=RANDOM_STATE):
+    """Membandingkan `GridSearchCV` atas pipeline penuh dengan `PrecomputedKernelSearch`.
+
+    Args:
+        X (np.ndarray): Matriks fitur (N, D).
+        y (np.ndarray): Label.
+        param_grid (dict): Grid dengan kunci 'C' dan 'gamma'.
+        cv (int): Jumlah fold.
+        factor (int): Faktor successive halving.
+        probability (bool): `probability` SVC pada `GridSearchCV`, seperti pada
+                            `IntegratedClassifier` (Platt scaling menambah biaya fit
+                            tetapi tidak mengubah prediksi).
+        random_state (int): Seed PCA dan subset halving.
+
+    Returns:
+        dict: Waktu (detik), jumlah fit, parameter terbaik, dan skor terbaik untuk
+              'grid_search', 'precomputed', dan 'halving', serta percepatan dan
+              kesamaan parameter terbaik terhadap `GridSearchCV`.
+    """
+    X, y = np.asarray(X), np.asarray(y)
+    pipeline = make_pipeline(
+        StandardScaler(),
+        PCA(n_components=0.95, random_state=random_state),
+        build_classifier_head('svc', probability=probability, random_state=random_state),
+    )
+    grid = {f"svc__{name}": values for name, values in param_grid.items()}
+    start = time.perf_counter()
+    reference = GridSearchCV(pipeline, grid, cv=cv, refit=False, n_jobs=1).fit(X, y)
+    grid_time = time.perf_counter() - start
+    reference_params = {name.split('__', 1)[1]: value for name, value in reference.best_params_.items()}
+
+    report = {
+        'grid_search': {
+            'time_s': grid_time,
+            'n_fits': len(reference.cv_results_['params']) * cv,
+            'best_params': reference_params,
+            'best_score': float(reference.best_score_),
+        }
+    }
+    for name, halving in (('precomputed', False), ('halving', True)):
+        search = PrecomputedKernelSearch(param_grid, cv=cv, halving=halving, factor=factor,
+                                         random_state=random_state).fit(X, y)
+        report[name] = {
+            'time_s': search.timing_['total_s'],
+            'n_fits': search.timing_['n_fits'],
+            'best_params': search.best_params_,
+            'best_score': search.best_score_,
+            'speedup': grid_time / search.timing_['total_s'],
+            'same_best_params': search.best_params_ == reference_params,
+        }
+
+    for name, row in report.items():
+        extra = f" | {row['speedup']:.1f}x | sama: {row['same_best_params']}" if 'speedup' in row else ''
+        logger.info(f"[{name}] {row['time_s']:.2f} s | {row['n_fits']} fit | {row['best_params']} "
+                    f"| skor {row['best_score']:.4f}{extra}")
+    return report
@@ -1,19 +1,222 @@
 """Utilitas untuk memuat dataset gambar.
 
 Modul ini menyediakan fungsi untuk memuat gambar dari struktur direktori
-di mana setiap sub-direktori mewakili sebuah kelas.
+di mana setiap sub-direktori mewakili sebuah kelas, baik sekaligus
+(`load_images_from_folder`) maupun secara streaming per potongan
+(`stream_images_from_folder`) agar seluruh dataset tidak perlu berada di RAM.
+
+Daftar berkas diambil dari manifest dataset (`src.utils.dataset_manifest`),
+bukan dari `os.listdir`. Berkas yang sudah tercatat korup langsung
+dipindahkan ke direktori outliers tanpa didekode ulang.
 """
 
 import os
 import cv2
 import shutil
+from itertools import groupby
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
 from tqdm import tqdm
 
-from src.configs.config import CLASSES, DATA_OUTLIERS_PATH
+from src.configs.config import CLASSES, DATA_OUTLIERS_PATH, IMAGE_SIZE, N_JOBS, FEATURE_CHUNK_SIZE
+from src.utils.dataset_manifest import load_manifest
 from src.utils.logger import logger
 
 
-def load_images_from_folder(folder_path):
+# Faktor reduksi DCT yang didukung `cv2.imread`, dari yang terbesar.
+_REDUCED_COLOR_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def _class_directories(folder_path):
+    """Menghasilkan (label, nama kelas, path direktori) untuk setiap kelas yang ditemukan.
+
+    Menangani nama folder dengan huruf kapital (misal 'Cerah' vs 'cerah') dan
+    melewati kelas yang direktorinya tidak ada.
+    """
+    for class_label, class_name in enumerate(CLASSES):
+        class_path = os.path.join(folder_path, class_name)
+        if not os.path.isdir(class_path):
+            fallback_class_path = os.path.join(folder_path, class_name.capitalize())
+            if os.path.isdir(fallback_class_path):
+                class_path = fallback_class_path
+            else:
+                logger.warning(f"Direktori untuk kelas '{class_name}' tidak ditemukan, dilewati.")
+                continue
+        yield class_label, class_name, class_path
+
+
+def _manifest_entries(folder_path, manifest=None):
+    """Mengambil daftar berkas setiap kelas dari manifest, terurut berdasarkan path.
+
+    Args:
+        folder_path (str): Direktori dataset.
+        manifest (DatasetManifest, optional): Manifest yang sudah dimuat; jika None,
+                                              manifest dimuat dan disinkronkan.
+
+    Returns:
+        tuple: (manifest, list (path, label, nama kelas, nama file, path relatif, valid)).
+    """
+    if manifest is None:
+        manifest = load_manifest(folder_path)
+    entries = []
+    for class_label, class_name, class_path in _class_directories(folder_path):
+        rows = manifest.select(class_name=os.path.basename(class_path), valid=None)
+        for row, img_path in zip(rows, manifest.abs_paths(rows)):
+            entries.append((img_path, class_label, class_name, os.path.basename(img_path),
+                            manifest['path'][row], bool(manifest['valid'][row])))
+    return manifest, entries
+
+
+def _move_to_outliers(img_path, filename):
+    """Memindahkan berkas yang gagal dibaca ke direktori outliers."""
+    os.makedirs(DATA_OUTLIERS_PATH, exist_ok=True)
+    destination_path = os.path.join(DATA_OUTLIERS_PATH, filename)
+    shutil.move(img_path, destination_path)
+    logger.warning(f"Gagal membaca '{filename}'. File dipindahkan ke outliers.")
+
+
+def _try_move_to_outliers(img_path, filename):
+    """Seperti `_move_to_outliers`, tetapi mencatat error alih-alih melemparnya.
+
+    Returns:
+        bool: True jika berkas berhasil dipindahkan.
+    """
+    try:
+        _move_to_outliers(img_path, filename)
+        return True
+    except Exception as e:
+        logger.error(f"Error saat memproses {img_path}: {e}")
+        return False
+
+
+def _reduced_read_flag(img_path, target_size):
+    """Memilih flag `cv2.imread` dengan reduksi terbesar yang masih >= ukuran target.
+
+    Dimensi dibaca dari header berkas melalui PIL tanpa mendekode piksel.
+    Untuk JPEG, OpenCV memakai penskalaan DCT sehingga gambar tidak pernah
+    didekode pada resolusi penuh.
+    """
+    try:
+        with Image.open(img_path) as img:
+            width, height = img.size
+    except Exception:
+        return cv2.IMREAD_COLOR
+    target_width, target_height = target_size
+    for factor, flag in _REDUCED_COLOR_FLAGS:
+        if width // factor >= target_width and height // factor >= target_height:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_image(img_path, target_size=None, reduced_decode=False):
+    """Mendekode satu berkas gambar, opsional langsung ke ukuran target.
+
+    Args:
+        img_path (str): Path berkas gambar.
+        target_size (tuple or None): Ukuran (lebar, tinggi) keluaran. Jika None,
+                                     gambar dikembalikan pada resolusi penuh.
+        reduced_decode (bool): Jika True, JPEG didekode pada resolusi tereduksi
+                               (penskalaan DCT) sebelum resize. Lebih cepat dan hemat
+                               memori, tetapi piksel sedikit berbeda dari decoding penuh.
+
+    Returns:
+        np.ndarray or None: Gambar BGR uint8, atau None jika berkas korup.
+    """
+    if target_size is None:
+        return cv2.imread(img_path)
+    flag = _reduced_read_flag(img_path, target_size) if reduced_decode else cv2.IMREAD_COLOR
+    img = cv2.imread(img_path, flag)
+    if img is None:
+        return None
+    return cv2.resize(img, target_size, interpolation=cv2.INTER_AREA)
+
+
+def stream_images_from_folder(folder_path, chunk_size=FEATURE_CHUNK_SIZE, n_threads=N_JOBS,
+                              target_size=IMAGE_SIZE, reduced_decode=False, manifest=None):
+    """Memuat gambar secara streaming per potongan dengan decoding paralel.
+
+    Decoding dijalankan di thread pool (OpenCV melepas GIL saat decoding) dan
+    hanya satu potongan yang berada di memori pada satu waktu. Seperti
+    `load_images_from_folder`, berkas yang gagal dibaca dipindahkan ke
+    direktori outliers.
+
+    Args:
+        folder_path (str): Path ke direktori utama yang berisi sub-direktori kelas.
+        chunk_size (int): Jumlah gambar per potongan yang dihasilkan.
+        n_threads (int): Jumlah thread decoding (-1 berarti semua core CPU).
+        target_size (tuple or None): Ukuran (lebar, tinggi) hasil decoding. Jika
+                                     None, gambar dikembalikan pada resolusi penuh.
+        reduced_decode (bool): Mendekode JPEG pada resolusi tereduksi (lihat
+                               `decode_image`).
+        manifest (DatasetManifest, optional): Manifest dataset; default dimuat dan
+                                              disinkronkan dari `folder_path`.
+
+    Yields:
+        tuple: Sebuah tuple berisi tiga elemen untuk setiap potongan:
+            - images (np.ndarray or list): Tumpukan uint8 (N, tinggi, lebar, 3)
+              jika `target_size` diberikan, atau list gambar resolusi penuh.
+            - labels (np.ndarray): Label integer yang sesuai.
+            - filenames (list): Nama file gambar yang dimuat.
+
+    Raises:
+        FileNotFoundError: Jika `folder_path` yang diberikan tidak ditemukan.
+    """
+    if not os.path.isdir(folder_path):
+        logger.error(f"Direktori dataset tidak ditemukan di: {folder_path}")
+        raise FileNotFoundError(f"Direktori dataset tidak ditemukan di: {folder_path}")
+
+    manifest, entries = _manifest_entries(folder_path, manifest)
+    moved = [rel_path for img_path, _, _, filename, rel_path, valid in entries
+             if not valid and _try_move_to_outliers(img_path, filename)]
+    entries = [(img_path, class_label, filename, rel_path)
+               for img_path, class_label, _, filename, rel_path, valid in entries if valid]
+
+    if n_threads is None or n_threads < 1:
+        n_threads = os.cpu_count() or 1
+    logger.info(f"Streaming {len(entries)} berkas dari '{folder_path}' "
+                f"({n_threads} thread, potongan {chunk_size}).")
+
+    chunks = [entries[start:start + chunk_size] for start in range(0, len(entries), chunk_size)]
+    total_loaded = 0
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        def submit(chunk):
+            return [executor.submit(decode_image, img_path, target_size, reduced_decode)
+                    for img_path, _, _, _ in chunk]
+
+        pending = submit(chunks[0]) if chunks else []
+        for index, chunk in enumerate(chunks):
+            futures = pending
+            # Potongan berikutnya mulai didekode selagi potongan ini diproses pemanggil.
+            pending = submit(chunks[index + 1]) if index + 1 < len(chunks) else []
+
+            images, labels, filenames = [], [], []
+            for (img_path, class_label, filename, rel_path), future in zip(chunk, futures):
+                img = future.result()
+                if img is None:
+                    if _try_move_to_outliers(img_path, filename):
+                        moved.append(rel_path)
+                    continue
+                images.append(img)
+                labels.append(class_label)
+                filenames.append(filename)
+
+            if not images:
+                continue
+            total_loaded += len(images)
+            if target_size is not None:
+                images = np.stack(images)
+            yield images, np.array(labels), filenames
+
+    manifest.remove(moved)
+    logger.info(f"Total gambar yang berhasil dimuat: {total_loaded}")
+
+
+def load_images_from_folder(folder_path, manifest=None):
     """Memuat semua gambar dari folder, menangani file korup.
 
     Fungsi ini mengiterasi sub-direktori yang sesuai dengan nama kelas yang
@@ -22,6 +225,8 @@ def load_images_from_folder(folder_path):
 
     Args:
         folder_path (str): Path ke direktori utama yang berisi sub-direktori kelas.
+        manifest (DatasetManifest, optional): Manifest dataset; default dimuat dan
+                                              disinkronkan dari `folder_path`.
 
     Returns:
         tuple: Sebuah tuple berisi tiga list:
@@ -42,38 +247,23 @@ def load_images_from_folder(folder_path):
         logger.error(f"Direktori dataset tidak ditemukan di: {folder_path}")
         raise FileNotFoundError(f"Direktori dataset tidak ditemukan di: {folder_path}")
 
+    manifest, entries = _manifest_entries(folder_path, manifest)
+    moved = []
     # Iterasi melalui setiap kelas yang terdaftar di konfigurasi
-    for class_label, class_name in enumerate(CLASSES):
-        class_path = os.path.join(folder_path, class_name)
-
-        # Penanganan jika nama folder menggunakan huruf kapital (misal 'Cerah' vs 'cerah')
-        if not os.path.isdir(class_path):
-            fallback_class_path = os.path.join(folder_path, class_name.capitalize())
-            if os.path.isdir(fallback_class_path):
-                class_path = fallback_class_path
-            else:
-                logger.warning(f"Direktori untuk kelas '{class_name}' tidak ditemukan, dilewati.")
-                continue
-
+    for class_name, class_entries in groupby(entries, key=lambda entry: entry[2]):
         # Gunakan tqdm untuk menampilkan progress bar
-        for filename in tqdm(os.listdir(class_path), desc=f"Loading {class_name}"):
-            img_path = os.path.join(class_path, filename)
-            try:
-                # Baca gambar menggunakan OpenCV
-                img = cv2.imread(img_path)
-                if img is not None:
-                    # Jika berhasil, tambahkan gambar, label, dan nama file ke list
-                    images.append(img)
-                    labels.append(class_label)
-                    filenames.append(filename)
-                else:
-                    # Jika `imread` mengembalikan None, file korup atau bukan gambar
-                    os.makedirs(DATA_OUTLIERS_PATH, exist_ok=True)
-                    destination_path = os.path.join(DATA_OUTLIERS_PATH, filename)
-                    shutil.move(img_path, destination_path)
-                    logger.warning(f"Gagal membaca '{filename}'. File dipindahkan ke outliers.")
-            except Exception as e:
-                logger.error(f"Error saat memproses {img_path}: {e}")
+        for img_path, class_label, _, filename, rel_path, valid in tqdm(list(class_entries), desc=f"Loading {class_name}"):
+            # Berkas yang tercatat korup di manifest tidak perlu didekode ulang
+            img = cv2.imread(img_path) if valid else None
+            if img is not None:
+                # Jika berhasil, tambahkan gambar, label, dan nama file ke list
+                images.append(img)
+                labels.append(class_label)
+                filenames.append(filename)
+            elif _try_move_to_outliers(img_path, filename):
+                # Jika `imread` mengembalikan None, file korup atau bukan gambar
+                moved.append(rel_path)
 
+    manifest.remove(moved)
     logger.info(f"Total gambar yang berhasil dimuat: {len(images)}")
     return images, labels, filenames
@@ -0,0 +1,315 @@
+"""Manifest dataset persisten yang dipakai bersama loader, trimmer, dan deduplicator.
+
+Sebelumnya setiap utilitas menelusuri ulang folder kelas dengan `os.listdir`:
+trimmer memanggil `os.path.getsize` untuk setiap berkas, deduplicator
+mendekode ulang gambar untuk hash perseptual, dan loader mendekode semua
+berkas hanya untuk menemukan yang korup. Modul ini menyimpan satu manifest
+per direktori dataset berisi satu baris per berkas gambar:
+
+- `path` (relatif terhadap direktori dataset) dan `class_name` (folder tingkat
+  pertama, string kosong untuk berkas di akar direktori),
+- `size` dan `mtime_ns` dari `stat`,
+- `width` dan `height` hasil decoding,
+- `content_hash` (blake2b 128-bit isi berkas, sama dengan
+  `src.features.feature_store.file_key`) dan `phash` (average hash 64-bit),
+- `valid` (False jika berkas gagal didekode OpenCV).
+
+Manifest disimpan kolumnar sebagai satu berkas `.npz` (satu array per kolom)
+di dalam direktori dataset. Penelusuran memakai `os.scandir` paralel per
+direktori, dan pembaruan bersifat inkremental: hanya berkas yang baru atau
+yang ukuran/mtime-nya berubah yang dibaca dan didekode ulang.
+"""
+
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cv2
+import imagehash
+import numpy as np
+from PIL import Image
+from tqdm import tqdm
+
+from src.configs.config import N_JOBS
+from src.utils.logger import logger
+
+
+# Naikkan versi ini jika kolom atau cara menghitungnya berubah.
+MANIFEST_VERSION = 1
+MANIFEST_FILENAME = '.manifest.npz'
+
+# Ekstensi berkas yang dicatat di manifest.
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
+
+# Nama kolom dan tipe datanya; kolom string memakai array unicode lebar tetap.
+COLUMNS = {
+    'path': np.str_,
+    'class_name': np.str_,
+    'size': np.int64,
+    'mtime_ns': np.int64,
+    'width': np.int32,
+    'height': np.int32,
+    'content_hash': 'U32',
+    'phash': np.uint64,
+    'valid': np.bool_,
+}
+
+
+def _n_workers(n_workers):
+    """Jumlah pekerja efektif; -1 (atau nilai < 1) berarti semua core CPU."""
+    if n_workers is None or n_workers < 1:
+        return os.cpu_count() or 1
+    return n_workers
+
+
+def _scan_directory(path):
+    """Membaca satu direktori: (list (path absolut, ukuran, mtime_ns), list sub-direktori)."""
+    files, subdirs = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file() and os.path.splitext(entry.name.lower())[1] in IMAGE_EXTENSIONS:
+                stat = entry.stat()
+                files.append((entry.path, stat.st_size, stat.st_mtime_ns))
+    return files, subdirs
+
+
+def scan_dataset(dataset_dir, n_threads=N_JOBS):
+    """Menelusuri direktori dataset secara rekursif dengan `os.scandir` paralel.
+
+    Setiap tingkat direktori dibaca bersamaan oleh thread pool, sehingga folder
+    kelas di-scan (termasuk `stat` setiap berkas) secara paralel.
+
+    Args:
+        dataset_dir (str): Direktori dataset.
+        n_threads (int): Jumlah thread (-1 berarti semua core CPU).
+
+    Returns:
+        list of tuple: (path relatif, ukuran, mtime_ns) untuk setiap berkas gambar,
+                       terurut berdasarkan path relatif.
+    """
+    files, level = [], [dataset_dir]
+    with ThreadPoolExecutor(max_workers=_n_workers(n_threads)) as executor:
+        while level:
+            next_level = []
+            for dir_files, subdirs in executor.map(_scan_directory, level):
+                files.extend(dir_files)
+                next_level.extend(subdirs)
+            level = next_level
+    records = [(os.path.relpath(path, dataset_dir), size, mtime_ns) for path, size, mtime_ns in files]
+    records.sort()
+    return records
+
+
+def inspect_file(path):
+    """Membaca satu berkas sekali lalu menghitung dimensi, hash konten, dan hash perseptual.
+
+    Args:
+        path (str): Path berkas gambar.
+
+    Returns:
+        tuple: (width, height, content_hash, phash, valid). Untuk berkas yang gagal
+               didekode, dimensi dan `phash` bernilai 0 dan `valid` False.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return 0, 0, '', 0, False
+    content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return 0, 0, content_hash, 0, False
+    height, width = image.shape[:2]
+    phash = int(str(imagehash.average_hash(Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)))), 16)
+    return width, height, content_hash, phash, True
+
+
+def _empty_columns():
+    return {name: np.array([], dtype=dtype) for name, dtype in COLUMNS.items()}
+
+
+class DatasetManifest:
+    """Manifest kolumnar satu direktori dataset.
+
+    Args:
+        dataset_dir (str): Direktori dataset yang dicatat.
+        path (str, optional): Path berkas manifest; default `MANIFEST_FILENAME`
+                              di dalam `dataset_dir`.
+
+    Attributes:
+        columns (dict): Pemetaan nama kolom ke array NumPy; semua kolom memiliki
+                        panjang yang sama dan baris terurut berdasarkan `path`.
+    """
+
+    def __init__(self, dataset_dir, path=None):
+        self.dataset_dir = dataset_dir
+        self.path = path or os.path.join(dataset_dir, MANIFEST_FILENAME)
+        self.columns = _empty_columns()
+        if os.path.exists(self.path):
+            with np.load(self.path, allow_pickle=False) as data:
+                if int(data['format_version']) == MANIFEST_VERSION:
+                    self.columns = {name: data[name] for name in COLUMNS}
+                else:
+                    logger.warning(f"Versi manifest {int(data['format_version'])} tidak didukung, "
+                                   f"manifest dibangun ulang.")
+
+    def __len__(self):
+        return len(self.columns['path'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def save(self):
+        """Menulis manifest secara atomik (berkas sementara lalu rename)."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, format_version=np.array(MANIFEST_VERSION), **self.columns)
+        os.replace(tmp_path, self.path)
+
+    def update(self, n_workers=N_JOBS, show_progress=True):
+        """Menyinkronkan manifest dengan isi direktori secara inkremental.
+
+        Berkas yang path, ukuran, dan mtime-nya sama dengan baris tersimpan tidak
+        dibaca ulang. Berkas baru atau berubah diperiksa dengan `inspect_file` di
+        process pool, dan baris untuk berkas yang sudah tidak ada dibuang.
+
+        Args:
+            n_workers (int): Jumlah thread scan dan proses pemeriksa (-1 = semua core).
+            show_progress (bool): Menampilkan progress bar tqdm.
+
+        Returns:
+            dict: Jumlah berkas 'unchanged', 'added', 'changed', dan 'removed'.
+
+        Raises:
+            FileNotFoundError: Jika `dataset_dir` tidak ditemukan.
+        """
+        if not os.path.isdir(self.dataset_dir):
+            raise FileNotFoundError(f"Direktori dataset tidak ditemukan di: {self.dataset_dir}")
+
+        scanned = scan_dataset(self.dataset_dir, n_threads=n_workers)
+        previous = {path: row for row, path in enumerate(self.columns['path'])}
+        kept_new, kept_old, to_inspect = [], [], []
+        for i, (rel_path, size, mtime_ns) in enumerate(scanned):
+            row = previous.get(rel_path)
+            if row is not None and self.columns['size'][row] == size and self.columns['mtime_ns'][row] == mtime_ns:
+                kept_new.append(i)
+                kept_old.append(row)
+            else:
+                to_inspect.append(i)
+
+        n_existing = sum(1 for rel_path, _, _ in scanned if rel_path in previous)
+        stats = {
+            'unchanged': len(kept_new),
+            'added': len(scanned) - n_existing,
+            'changed': n_existing - len(kept_new),
+            'removed': len(previous) - n_existing,
+        }
+        if not to_inspect and stats['removed'] == 0:
+            logger.info(f"Manifest '{self.dataset_dir}' sudah mutakhir ({len(self)} berkas).")
+            return stats
+
+        paths = [os.path.join(self.dataset_dir, scanned[i][0]) for i in to_inspect]
+        n_workers = _n_workers(n_workers)
+        if n_workers > 1 and len(paths) > 1:
+            chunksize = max(1, len(paths) // (n_workers * 16))
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                inspected = list(tqdm(executor.map(inspect_file, paths, chunksize=chunksize), total=len(paths),
+                                      desc="Manifest", disable=not show_progress))
+        else:
+            inspected = [inspect_file(path) for path in tqdm(paths, desc="Manifest", disable=not show_progress)]
+
+        n_rows = len(scanned)
+        columns = {
+            'path': np.array([rel_path for rel_path, _, _ in scanned], dtype=np.str_),
+            'class_name': np.array([_class_of(rel_path) for rel_path, _, _ in scanned], dtype=np.str_),
+            'size': np.array([size for _, size, _ in scanned], dtype=np.int64),
+            'mtime_ns': np.array([mtime_ns for _, _, mtime_ns in scanned], dtype=np.int64),
+        }
+        for name in ('width', 'height', 'content_hash', 'phash', 'valid'):
+            columns[name] = np.zeros(n_rows, dtype=COLUMNS[name])
+            columns[name][kept_new] = self.columns[name][kept_old]
+        for i, (width, height, content_hash, phash, valid) in zip(to_inspect, inspected):
+            columns['width'][i], columns['height'][i] = width, height
+            columns['content_hash'][i], columns['phash'][i], columns['valid'][i] = content_hash, phash, valid
+        self.columns = columns
+        self.save()
+
+        logger.info(f"Manifest '{self.dataset_dir}': {n_rows} berkas ({stats['added']} baru, "
+                    f"{stats['changed']} berubah, {stats['removed']} dihapus, "
+                    f"{int((~columns['valid']).sum())} korup).")
+        return stats
+
+    def select(self, class_name=None, valid=True):
+        """Mengembalikan indeks baris yang cocok, terurut berdasarkan path.
+
+        Args:
+            class_name (str, optional): Hanya baris dari folder kelas ini.
+            valid (bool or None): True untuk berkas yang dapat didekode, False untuk
+                                  berkas korup, None untuk semuanya.
+
+        Returns:
+            np.ndarray: Indeks baris bertipe int.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if class_name is not None:
+            mask &= self.columns['class_name'] == class_name
+        if valid is not None:
+            mask &= self.columns['valid'] == valid
+        return np.flatnonzero(mask)
+
+    def abs_paths(self, rows):
+        """Mengubah indeks baris menjadi path absolut berkas."""
+        return [os.path.join(self.dataset_dir, self.columns['path'][row]) for row in rows]
+
+    def class_counts(self, valid=True):
+        """Menghitung jumlah berkas per folder kelas.
+
+        Returns:
+            dict: Pemetaan nama folder kelas ke jumlah berkas.
+        """
+        names, counts = np.unique(self.columns['class_name'][self.select(valid=valid)], return_counts=True)
+        return {str(name): int(count) for name, count in zip(names, counts)}
+
+    def remove(self, rel_paths):
+        """Membuang baris untuk berkas yang dihapus atau dipindahkan, lalu menyimpan manifest.
+
+        Args:
+            rel_paths (iterable of str): Path relatif berkas.
+
+        Returns:
+            int: Jumlah baris yang dibuang.
+        """
+        drop = np.isin(self.columns['path'], np.array(list(rel_paths), dtype=np.str_))
+        removed = int(drop.sum())
+        if removed:
+            self.columns = {name: column[~drop] for name, column in self.columns.items()}
+            self.save()
+        return removed
+
+
+def _class_of(rel_path):
+    """Nama folder tingkat pertama dari path relatif, atau string kosong untuk berkas di akar."""
+    parts = rel_path.split(os.sep)
+    return parts[0] if len(parts) > 1 else ''
+
+
+def load_manifest(dataset_dir, refresh=True, n_workers=N_JOBS, show_progress=True):
+    """Memuat manifest direktori dataset, opsional menyinkronkannya terlebih dahulu.
+
+    Args:
+        dataset_dir (str): Direktori dataset.
+        refresh (bool): Jika True, jalankan `update` (hanya berkas berubah yang dibaca).
+        n_workers (int): Jumlah pekerja untuk `update`.
+        show_progress (bool): Menampilkan progress bar tqdm.
+
+    Returns:
+        DatasetManifest: Manifest siap di-query.
+    """
+    manifest = DatasetManifest(dataset_dir)
+    if refresh:
+        manifest.update(n_workers=n_workers, show_progress=show_progress)
+    return manifest
@@ -1,69 +1,191 @@
 """Skrip utilitas untuk menghapus gambar duplikat dari dataset.
 
-Skrip ini mengiterasi melalui semua folder kelas dalam direktori dataset,
-menghitung hash perseptual (average hash) untuk setiap gambar, dan
-mengidentifikasi serta menghapus file-file yang memiliki hash yang sama.
+Skrip ini mengambil hash perseptual (average hash 64-bit) setiap gambar di
+folder kelas dari manifest dataset (`src.utils.dataset_manifest`), lalu
+mengidentifikasi serta menghapus file-file yang hash-nya sama atau berbeda
+paling banyak `max_distance` bit (near-duplicate).
+
+Agar tetap cepat untuk ratusan ribu file:
+- Hash dihitung paralel dan disimpan di manifest yang dikunci path, ukuran,
+  dan mtime, sehingga proses ulang hanya meng-hash file yang baru atau berubah.
+  Manifest yang sama dipakai oleh loader dan trimmer.
+- Pencarian radius Hamming memakai multi-index hashing: hash 64-bit dibagi
+  menjadi `max_distance + 1` blok, dan menurut prinsip pigeonhole dua hash
+  yang berjarak <= `max_distance` pasti memiliki minimal satu blok identik.
+  Hanya kandidat dengan blok identik yang dibandingkan, bukan seluruh pasangan.
+
+Secara default skrip berjalan dalam mode dry-run: duplikat hanya dicatat ke
+laporan CSV, dan baru dihapus jika `dry_run=False`.
 """
 
 import os
-from PIL import Image
-import imagehash
+import csv
+
+from src.utils.dataset_manifest import load_manifest
+
+
+# --- KONFIGURASI ---
+# Ganti dengan path ke direktori data 'raw' Anda.
+MAIN_DATASET_DIR = r"D:\program\python-project\svm-models\build\data\raw"
+# Jarak Hamming maksimum (bit) agar dua gambar dianggap duplikat; 0 = hash identik.
+MAX_DISTANCE = 4
+# Jumlah proses pekerja untuk menghitung hash file baru di manifest.
+N_WORKERS = os.cpu_count() or 1
+# True: hanya menulis laporan tanpa menghapus file.
+DRY_RUN = True
+
+HASH_BITS = 64
+REPORT_FILENAME = 'duplicates_report.csv'
 
 
-def find_and_remove_duplicates(dataset_dir):
-    """Mencari dan menghapus gambar duplikat dalam direktori dataset.
+def _hamming(a, b):
+    """Jarak Hamming antara dua hash integer."""
+    return bin(a ^ b).count('1')
+
+
+def manifest_hashes(manifest):
+    """Mengambil hash perseptual gambar valid di folder kelas dari manifest.
+
+    Args:
+        manifest (DatasetManifest): Manifest dataset yang sudah disinkronkan.
+
+    Returns:
+        dict: Pemetaan path relatif ke hash integer.
+    """
+    rows = [row for row in manifest.select(valid=True) if manifest['class_name'][row]]
+    return {str(manifest['path'][row]): int(manifest['phash'][row]) for row in rows}
+
+
+class MultiIndexHash:
+    """Struktur multi-index hashing untuk query radius Hamming pada hash 64-bit.
+
+    Args:
+        max_distance (int): Radius Hamming maksimum yang didukung query.
+    """
+
+    def __init__(self, max_distance):
+        self.max_distance = max_distance
+        n_blocks = max_distance + 1
+        bounds = [round(i * HASH_BITS / n_blocks) for i in range(n_blocks + 1)]
+        self._blocks = [(start, (1 << (stop - start)) - 1) for start, stop in zip(bounds[:-1], bounds[1:])]
+        self._tables = [{} for _ in self._blocks]
+        self._items = []
+
+    def query(self, hash_value):
+        """Mencari item pertama yang berjarak <= max_distance.
+
+        Returns:
+            tuple or None: (id item, jarak) dari kandidat dengan jarak terkecil, atau None.
+        """
+        best = None
+        for (shift, mask), table in zip(self._blocks, self._tables):
+            for item_id in table.get((hash_value >> shift) & mask, ()):
+                distance = _hamming(hash_value, self._items[item_id][0])
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (item_id, distance)
+        return best
+
+    def add(self, hash_value, payload):
+        """Menambahkan hash ke indeks dan mengembalikan id item-nya."""
+        item_id = len(self._items)
+        self._items.append((hash_value, payload))
+        for (shift, mask), table in zip(self._blocks, self._tables):
+            table.setdefault((hash_value >> shift) & mask, []).append(item_id)
+        return item_id
+
+    def payload(self, item_id):
+        return self._items[item_id][1]
+
+
+def find_duplicates(hashes, max_distance=MAX_DISTANCE):
+    """Mengelompokkan gambar duplikat secara greedy sesuai urutan path.
+
+    Gambar pertama dari setiap kelompok dipertahankan; gambar berikutnya yang
+    berjarak <= `max_distance` dari gambar yang dipertahankan ditandai duplikat.
+
+    Args:
+        hashes (dict): Pemetaan path relatif ke hash integer.
+        max_distance (int): Jarak Hamming maksimum.
+
+    Returns:
+        list of tuple: Daftar (path duplikat, path asli, jarak Hamming).
+    """
+    index = MultiIndexHash(max_distance)
+    duplicates = []
+    for rel_path in sorted(hashes):
+        match = index.query(hashes[rel_path])
+        if match is None:
+            index.add(hashes[rel_path], rel_path)
+        else:
+            duplicates.append((rel_path, index.payload(match[0]), match[1]))
+    return duplicates
+
+
+def write_report(duplicates, report_path):
+    """Menulis daftar duplikat ke laporan CSV."""
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['duplicate', 'original', 'hamming_distance'])
+        writer.writerows(duplicates)
+
+
+def find_and_remove_duplicates(dataset_dir, max_distance=MAX_DISTANCE, dry_run=DRY_RUN,
+                               n_workers=N_WORKERS, manifest=None, report_path=None):
+    """Mencari dan (jika bukan dry-run) menghapus gambar duplikat dalam direktori dataset.
 
     Args:
         dataset_dir (str): Path ke direktori utama dataset yang berisi
                            sub-direktori untuk setiap kelas.
-    """
-    hashes = {}
-    duplicates_to_remove = []
+        max_distance (int): Jarak Hamming maksimum agar dianggap duplikat.
+        dry_run (bool): Jika True, hanya menulis laporan tanpa menghapus file.
+        n_workers (int): Jumlah proses pekerja untuk menghitung hash file baru.
+        manifest (DatasetManifest, optional): Manifest dataset; default dimuat dan
+                                              disinkronkan dari `dataset_dir`.
+        report_path (str): Path laporan CSV; default di dalam `dataset_dir`.
 
-    print(f"Memindai duplikat di direktori: {dataset_dir}")
+    Returns:
+        list of tuple: Daftar (path duplikat, path asli, jarak Hamming), relatif
+                       terhadap `dataset_dir`.
+    """
+    report_path = report_path or os.path.join(dataset_dir, REPORT_FILENAME)
 
-    # Iterasi melalui setiap folder kelas
-    for class_folder in os.listdir(dataset_dir):
-        class_path = os.path.join(dataset_dir, class_folder)
-        if not os.path.isdir(class_path):
-            continue
+    print(f"Memindai duplikat di direktori: {dataset_dir} (jarak Hamming <= {max_distance})")
+    if manifest is None:
+        manifest = load_manifest(dataset_dir, n_workers=n_workers)
+    hashes = manifest_hashes(manifest)
+    n_invalid = len(manifest.select(valid=False))
+    print(f"{len(hashes)} hash diambil dari manifest, {n_invalid} file korup dilewati.")
 
-        print(f"\nMemproses folder: {class_folder}")
-        # Iterasi melalui setiap file dalam folder kelas
-        for filename in os.listdir(class_path):
-            filepath = os.path.join(class_path, filename)
-            try:
-                # Buka gambar dan hitung hash-nya
-                with Image.open(filepath) as img:
-                    h = imagehash.average_hash(img)
-
-                # Periksa apakah hash sudah ada
-                if h in hashes:
-                    duplicates_to_remove.append(filepath)
-                    print(f"  - Duplikat ditemukan: {filepath} (sama dengan {hashes[h]})")
-                else:
-                    # Jika belum ada, simpan hash dan path file
-                    hashes[h] = filepath
-            except Exception as e:
-                print(f"  - Error memproses {filepath}: {e}")
+    duplicates = find_duplicates(hashes, max_distance=max_distance)
+    write_report(duplicates, report_path)
+    for duplicate, original, distance in duplicates:
+        print(f"  - Duplikat ditemukan: {duplicate} (sama dengan {original}, jarak {distance})")
+    print(f"\nLaporan duplikat ditulis ke: {report_path}")
 
-    # Hapus semua file duplikat yang telah diidentifikasi
-    if duplicates_to_remove:
+    if not duplicates:
+        print("\nTidak ada file duplikat yang ditemukan.")
+    elif dry_run:
+        print(f"\nMode dry-run: {len(duplicates)} duplikat ditemukan, tidak ada file yang dihapus.")
+    else:
+        # Hapus semua file duplikat yang telah diidentifikasi
         print("\n--- Menghapus file duplikat ---")
-        for filepath in duplicates_to_remove:
+        removed = []
+        for duplicate, _, _ in duplicates:
+            filepath = os.path.join(dataset_dir, duplicate)
             try:
                 os.remove(filepath)
+                removed.append(duplicate)
                 print(f"Menghapus: {filepath}")
             except Exception as e:
                 print(f"Gagal menghapus {filepath}: {e}")
-    else:
-        print("\nTidak ada file duplikat yang ditemukan.")
+        manifest.remove(removed)
+        print(f"\nProses selesai. Total duplikat dihapus: {len(removed)}")
 
-    print(f"\nProses selesai. Total duplikat ditemukan dan dihapus: {len(duplicates_to_remove)}")
+    return duplicates
 
 
 if __name__ == '__main__':
-    # Tentukan direktori dataset utama.
-    # Ganti path ini sesuai dengan struktur direktori Anda.
-    main_dataset_dir = r"D:\program\python-project\svm-models\build\data\raw"
-    find_and_remove_duplicates(main_dataset_dir)
+    # Jalankan dengan DRY_RUN = True terlebih dahulu, periksa laporan,
+    # lalu ubah menjadi False untuk benar-benar menghapus duplikat.
+    # Jalankan dari direktori build/: python -m src.utils.deduplicator
+    find_and_remove_duplicates(MAIN_DATASET_DIR, max_distance=MAX_DISTANCE, dry_run=DRY_RUN)
@@ -7,63 +7,68 @@ dengan ukuran terkecil terlebih dahulu untuk mencapai jumlah target.
 
 import os
 
+import numpy as np
+
+from src.utils.dataset_manifest import load_manifest
+
 # --- KONFIGURASI ---
 # Ganti dengan path ke direktori data 'raw' Anda.
 BASE_DIR = r"D:\program\python-project\svm-models\build\data\raw"
 # Tentukan jumlah gambar yang diinginkan di setiap folder kelas.
 TARGET_COUNT = 300
-# Ekstensi file gambar yang akan diproses.
-IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
 
 
-def trim_image_folders(base_dir, target_count):
+def trim_image_folders(base_dir, target_count, manifest=None):
     """Memangkas jumlah gambar di setiap subfolder ke jumlah target.
 
+    Daftar berkas dan ukurannya diambil dari manifest dataset, sehingga
+    folder tidak perlu di-scan ulang dan `os.path.getsize` tidak dipanggil
+    untuk setiap berkas.
+
     Args:
         base_dir (str): Path ke direktori utama yang berisi subfolder kelas.
         target_count (int): Jumlah file yang diinginkan di setiap subfolder.
+        manifest (DatasetManifest, optional): Manifest dataset; default dimuat dan
+                                              disinkronkan dari `base_dir`.
     """
-    # Dapatkan daftar semua subfolder dalam direktori dasar
-    subfolders = [
-        os.path.join(base_dir, d)
-        for d in os.listdir(base_dir)
-        if os.path.isdir(os.path.join(base_dir, d))
-    ]
+    if manifest is None:
+        manifest = load_manifest(base_dir)
+    # Dapatkan daftar semua subfolder kelas yang tercatat di manifest
+    subfolders = sorted(name for name in manifest.class_counts(valid=None) if name)
 
     print(f"Ditemukan {len(subfolders)} folder di dalam '{base_dir}'")
     print(f"Target jumlah gambar per folder: {target_count}")
 
     # Iterasi melalui setiap folder kelas
     for folder in subfolders:
-        print(f"\nMemproses folder: {os.path.basename(folder)}")
+        print(f"\nMemproses folder: {folder}")
 
         # Dapatkan semua file gambar dalam folder
-        all_files = [
-            os.path.join(folder, f)
-            for f in os.listdir(folder)
-            if os.path.splitext(f.lower())[1] in IMAGE_EXTENSIONS
-        ]
+        rows = manifest.select(class_name=folder, valid=None)
 
-        count = len(all_files)
+        count = len(rows)
         print(f"  Jumlah file ditemukan: {count}")
 
         # Jika jumlah file melebihi target, lakukan pemangkasan
         if count > target_count:
             # Urutkan file berdasarkan ukuran (dari terkecil ke terbesar)
-            all_files.sort(key=lambda f: os.path.getsize(f))
+            rows = rows[np.argsort(manifest['size'][rows], kind='stable')]
 
             # Tentukan file mana yang akan dihapus
-            files_to_delete = all_files[:count - target_count]
+            files_to_delete = rows[:count - target_count]
             print(f"Kelebihan {len(files_to_delete)} file. Memulai penghapusan...")
 
             # Hapus file yang telah ditentukan
-            for file_path in files_to_delete:
+            deleted = []
+            for row, file_path in zip(files_to_delete, manifest.abs_paths(files_to_delete)):
                 try:
                     os.remove(file_path)
+                    deleted.append(manifest['path'][row])
                 except Exception as e:
                     print(f"Gagal menghapus {os.path.basename(file_path)}: {e}")
 
-            remaining_count = len(os.listdir(folder))
+            manifest.remove(deleted)
+            remaining_count = len(manifest.select(class_name=folder, valid=None))
             print(f"Selesai! Folder sekarang berisi {remaining_count} file.")
         elif count < target_count:
             print(f"Jumlah file lebih sedikit dari target. Tidak ada tindakan.")
@@ -72,5 +77,5 @@ def trim_image_folders(base_dir, target_count):
 
 
 if __name__ == '__main__':
-    # Jalankan fungsi utama
+    # Jalankan dari direktori build/: python -m src.utils.trimmer
     trim_image_folders(BASE_DIR, TARGET_COUNT)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Paket `src` diimpor relatif terhadap direktori build, seperti pada notebook.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
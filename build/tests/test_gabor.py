@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.features.gabor import GABOR_BANK
+
+
+@pytest.fixture(scope='module')
+def textured():
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (16, 128, 128), dtype=np.uint8)
+    return np.stack([cv2.GaussianBlur(img, (0, 0), (0.5, 1, 2, 4)[i % 4]) for i, img in enumerate(noise)])
+
+
+@pytest.fixture(scope='module')
+def flat():
+    return np.stack([np.full((128, 128), level, dtype=np.uint8) for level in range(0, 256, 3)])
+
+
+def _direct_responses(stack):
+    return np.stack([[cv2.filter2D(img, cv2.CV_8U, kernel) for kernel in GABOR_BANK.kernels] for img in stack])
+
+
+@pytest.mark.parametrize('images', ['textured', 'flat'])
+def test_fft_responses_within_one_gray_level(images, request):
+    stack = request.getfixturevalue(images)[:8]
+    diff = np.abs(GABOR_BANK.responses_batch(stack).astype(int) - _direct_responses(stack))
+    assert diff.max() <= 1
+
+
+def test_fft_features_match_direct_on_textured_images(textured):
+    fft = GABOR_BANK.extract_batch(textured, method='fft')
+    direct = GABOR_BANK.extract_batch(textured, method='direct')
+    assert np.abs(fft - direct).max() < 1e-2
+
+
+def test_fft_features_bounded_on_flat_images(flat):
+    fft = GABOR_BANK.extract_batch(flat, method='fft')
+    direct = GABOR_BANK.extract_batch(flat, method='direct')
+    assert np.abs(fft - direct).max() <= 1.0
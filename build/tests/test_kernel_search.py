@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.decomposition import PCA
+from sklearn.model_selection import GridSearchCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from src.models.kernel_search import PrecomputedKernelSearch
+
+PARAM_GRID = {'C': [0.1, 1.0, 10.0], 'gamma': ['scale', 0.01, 0.1]}
+
+
+@pytest.fixture(scope='module')
+def data():
+    return make_classification(n_samples=151, n_features=20, n_informative=8, n_classes=4,
+                               n_clusters_per_class=1, random_state=0)
+
+
+@pytest.fixture(scope='module')
+def reference(data):
+    X, y = data
+    pipeline = make_pipeline(StandardScaler(), PCA(n_components=0.95, random_state=42),
+                             SVC(kernel='rbf', class_weight='balanced'))
+    grid = {f"svc__{name}": values for name, values in PARAM_GRID.items()}
+    return GridSearchCV(pipeline, grid, cv=3).fit(X, y)
+
+
+def test_matches_grid_search(data, reference):
+    X, y = data
+    search = PrecomputedKernelSearch(PARAM_GRID, cv=3, random_state=42).fit(X, y)
+    np.testing.assert_allclose(search.cv_results_['mean_test_score'],
+                               reference.cv_results_['mean_test_score'])
+    assert search.best_params_ == {name.split('__', 1)[1]: value
+                                   for name, value in reference.best_params_.items()}
+    assert search.best_score_ == pytest.approx(reference.best_score_)
+
+
+def test_halving_final_round_uses_full_folds(data, reference):
+    X, y = data
+    search = PrecomputedKernelSearch(PARAM_GRID, cv=3, halving=True, random_state=42).fit(X, y)
+    assert search.timing_['n_iterations'] > 1
+    np.testing.assert_allclose(search.best_score_,
+                               reference.cv_results_['mean_test_score'][search.best_index_])
+
+
+def test_unequal_folds_use_full_training_set(data):
+    # 151 sampel -> fold latih 100/101 baris; subset seukuran fold terkecil dulu memicu ValueError.
+    X, y = data
+    search = PrecomputedKernelSearch(PARAM_GRID, cv=3, random_state=42)
+    assert search._schedule(9, 100, 4, 3) == [None]
+    for n_rows in (None, 100, 98):
+        assert search._subset(type('Fold', (), {'y_train': y[:101]})(), n_rows) is None
+    assert len(search._subset(type('Fold', (), {'y_train': y[:101]})(), 40)) == 40
@@ -4,16 +4,245 @@ Berkas utama aplikasi Flask.
 Berkas ini bertanggung jawab untuk menginisialisasi aplikasi Flask,
 memuat model machine learning, mengkonfigurasi pengaturan aplikasi,
 dan mendaftarkan semua blueprint (rute) yang diperlukan.
+
+Modul berat (scikit-image, SciPy, scikit-learn, joblib) tidak diimpor di
+tingkat modul, melainkan di dalam `load_engine`. Dengan `STARTUP_MODE = 'lazy'`
+model baru dimuat saat permintaan pertama, sehingga proses pekerja dapat
+boot tanpa biaya impor dan pemuatan model.
 """
 
 import os
-import joblib
-from flask import Flask
+import sys
+import time
+import threading
+from flask import Flask, request
 
-from utils.model_wrapper import IntegratedClassifier
+from utils.result_cache import MemoryResultCache, SQLiteResultCache, model_version
+from utils.batch_scheduler import MicroBatchScheduler
+from utils.live_session import LiveSessionRegistry
+from utils.temporal_filter import TemporalFilterStore
+from utils.metrics import METRICS
 from routes.main import main_bp
 from routes.predict import predict_bp
 from routes.live import live_bp
+from routes.metrics import metrics_bp
+
+# Endpoint yang tidak memicu pemuatan model pada mode startup 'lazy'.
+_LAZY_EXEMPT_ENDPOINTS = {'static', 'metrics.metrics'}
+
+def _rss_mb():
+    """Mengembalikan resident set size (RSS) proses saat ini dalam MB, atau None jika tidak tersedia."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        # ru_maxrss adalah puncak RSS (KB di Linux, byte di macOS).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
+
+def _format_mb(value):
+    return f"{value:.1f} MB" if value is not None else "n/a"
+
+def create_result_cache(app, version):
+    """
+    Membuat cache hasil prediksi sesuai konfigurasi aplikasi.
+
+    Versi model menjadi bagian kunci cache sehingga hasil lama tidak
+    terpakai setelah model diganti.
+
+    Args:
+        app (Flask): Instance aplikasi yang sudah dikonfigurasi.
+        version (str): Versi model (hash isi berkas model atau artefak).
+
+    Returns:
+        MemoryResultCache or SQLiteResultCache or None: Cache hasil, atau None jika dinonaktifkan.
+    """
+    backend = app.config['RESULT_CACHE']
+    if not backend:
+        return None
+    if backend == 'sqlite':
+        return SQLiteResultCache(version, app.config['RESULT_CACHE_PATH'],
+                                 max_entries=app.config['RESULT_CACHE_MAX_ENTRIES'])
+    return MemoryResultCache(version, max_entries=app.config['RESULT_CACHE_MAX_ENTRIES'],
+                             max_bytes=app.config['RESULT_CACHE_MAX_MB'] * 1024 * 1024)
+
+def collect_runtime_metrics(app):
+    """
+    Menghasilkan metrik sesaat dari cache hasil dan penjadwal micro-batching.
+
+    Args:
+        app (Flask): Instance aplikasi.
+
+    Returns:
+        list of tuple: Daftar (nama, tipe, bantuan, labels, nilai) untuk `MetricsRegistry`.
+    """
+    samples = []
+    rss = _rss_mb()
+    if rss is not None:
+        samples.append(('weather_process_resident_memory_bytes', 'gauge',
+                        'Resident set size proses pekerja dalam byte.', None, int(rss * 1024 * 1024)))
+    cache = app.engine.cache if app.engine else None
+    if cache is not None:
+        stats = cache.stats()
+        samples += [
+            ('weather_result_cache_hits_total', 'counter', 'Jumlah hit cache hasil prediksi.', None, stats['hits']),
+            ('weather_result_cache_misses_total', 'counter', 'Jumlah miss cache hasil prediksi.', None, stats['misses']),
+            ('weather_result_cache_entries', 'gauge', 'Jumlah entri cache hasil prediksi.', None, stats['entries']),
+        ]
+    if app.scheduler is not None:
+        stats = app.scheduler.stats()
+        samples += [
+            ('weather_live_queue_depth', 'gauge', 'Kedalaman antrean micro-batching.', None, stats['queue_depth']),
+            ('weather_live_frames_shed_total', 'counter', 'Jumlah frame yang ditolak karena antrean penuh.', None, stats['shed']),
+            ('weather_live_batches_total', 'counter', 'Jumlah batch micro-batching yang dijalankan.', None, stats['batches']),
+        ]
+    if app.live_sessions is not None:
+        stats = app.live_sessions.stats()
+        samples += [
+            ('weather_live_sessions', 'gauge', 'Jumlah sesi streaming kamera yang aktif.', None, stats['active']),
+            ('weather_live_frames_dropped_total', 'counter', 'Jumlah frame streaming lama yang ditimpa frame baru.', None, stats['dropped']),
+        ]
+    return samples
+
+def load_models(app):
+    """
+    Memuat model klasifikasi dan detektor anomali beserta versinya.
+
+    Jika `MODEL_ARTIFACT_DIR` berisi artefak (lihat `utils.artifact`), array
+    model di-memory-map tanpa unpickle. Jika tidak, kedua
+    pickle dimuat dengan joblib dan model klasifikasi dikompilasi bila
+    `COMPILED_INFERENCE` aktif.
+
+    Args:
+        app (Flask): Instance aplikasi yang sudah dikonfigurasi.
+
+    Returns:
+        tuple: (model klasifikasi, detektor anomali, versi model). Model yang gagal dimuat bernilai None.
+    """
+    artifact_dir = app.config['MODEL_ARTIFACT_DIR']
+    if artifact_dir and os.path.exists(os.path.join(artifact_dir, 'manifest.json')):
+        from utils.artifact import load_artifact
+        try:
+            model, anomaly_detector, manifest = load_artifact(artifact_dir, mmap=app.config['MODEL_ARTIFACT_MMAP'])
+            if manifest['classes'] != app.CLASSES:
+                raise ValueError(f"Kelas artefak {manifest['classes']} tidak sesuai dengan {app.CLASSES}")
+            print(f"* Artefak model v{manifest['format_version']} ({model.precision}) berhasil dimuat dari {artifact_dir}")
+            return model, anomaly_detector, manifest['model_version']
+        except Exception as e:
+            print(f"* GAGAL memuat artefak model, memakai berkas pickle: {e}")
+
+    import joblib
+    from utils.model_wrapper import IntegratedClassifier
+    from utils.compiled_model import CompiledClassifier
+
+    # Pickle dari notebook dapat merujuk `__main__.IntegratedClassifier`.
+    main_module = sys.modules['__main__']
+    if not hasattr(main_module, 'IntegratedClassifier'):
+        main_module.IntegratedClassifier = IntegratedClassifier
+
+    # Memuat model klasifikasi cuaca.
+    model_path = app.config['MODEL_PATH']
+    try:
+        model = joblib.load(model_path)
+        print(f"* Model klasifikasi berhasil dimuat dari {model_path}")
+    except Exception as e:
+        print(f"* GAGAL memuat model klasifikasi: {e}")
+        model = None
+
+    # Memuat model deteksi anomali.
+    anomaly_model_path = app.config['ANOMALY_MODEL_PATH']
+    try:
+        anomaly_detector = joblib.load(anomaly_model_path)
+        print(f"* Model detektor anomali berhasil dimuat dari {anomaly_model_path}")
+    except Exception as e:
+        print(f"* GAGAL memuat model detektor anomali: {e}")
+        anomaly_detector = None
+
+    if model is None or anomaly_detector is None:
+        return model, anomaly_detector, None
+    if app.config['COMPILED_INFERENCE']:
+        try:
+            model = CompiledClassifier.from_classifier(model)
+            print("* Model klasifikasi dikompilasi untuk inferensi NumPy")
+        except Exception as e:
+            print(f"* GAGAL mengompilasi model klasifikasi, memakai pipeline asli: {e}")
+    return model, anomaly_detector, model_version(model_path, anomaly_model_path)
+
+def load_anomaly_gate(app):
+    """
+    Memuat gerbang anomali tahap pertama jika berkasnya ada.
+
+    Args:
+        app (Flask): Instance aplikasi yang sudah dikonfigurasi.
+
+    Returns:
+        tuple: (AnomalyGate, versi berkas gerbang), atau (None, None) jika tidak dipakai.
+    """
+    gate_path = app.config['ANOMALY_GATE_PATH']
+    if not gate_path or not os.path.exists(gate_path):
+        return None, None
+    import joblib
+    from utils.anomaly_gate import AnomalyGate
+    try:
+        gate = AnomalyGate.from_dict(joblib.load(gate_path))
+        print(f"* Gerbang anomali tahap pertama berhasil dimuat dari {gate_path}")
+        return gate, model_version(gate_path)
+    except Exception as e:
+        print(f"* GAGAL memuat gerbang anomali, memakai detektor satu tahap: {e}")
+        return None, None
+
+def load_engine(app):
+    """
+    Memuat model, membangun mesin inferensi dan penjadwal, lalu melakukan warm-up.
+
+    Waktu cold-start dan RSS proses sebelum dan sesudah pemuatan dilaporkan
+    ke stdout.
+
+    Args:
+        app (Flask): Instance aplikasi yang sudah dikonfigurasi.
+    """
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    from utils.inference_engine import InferenceEngine
+
+    app.model, app.anomaly_detector, version = load_models(app)
+    anomaly_gate, gate_version = load_anomaly_gate(app)
+    if gate_version:
+        # Gerbang ikut menentukan putusan, jadi menjadi bagian dari versi cache hasil.
+        version = f"{version}-{gate_version}"
+    load_ms = (time.perf_counter() - start) * 1000
+
+    # Mesin inferensi yang mengekstrak fitur sekali untuk detektor anomali dan klasifikasi.
+    if app.model is not None and app.anomaly_detector is not None:
+        app.engine = InferenceEngine(app.model, app.anomaly_detector, app.CLASSES,
+                                     cache=create_result_cache(app, version), anomaly_gate=anomaly_gate)
+    else:
+        app.engine = None
+
+    warmup_ms = 0.0
+    if app.engine and app.config['STARTUP_WARMUP']:
+        warmup_start = time.perf_counter()
+        app.engine.warm_up()
+        warmup_ms = (time.perf_counter() - warmup_start) * 1000
+
+    # Penjadwal micro-batching untuk frame kamera langsung.
+    if app.engine and app.config['LIVE_MICRO_BATCHING']:
+        app.scheduler = MicroBatchScheduler(app.engine,
+                                            max_batch_size=app.config['LIVE_MAX_BATCH_SIZE'],
+                                            max_wait_ms=app.config['LIVE_MAX_WAIT_MS'],
+                                            max_queue_depth=app.config['LIVE_MAX_QUEUE_DEPTH'])
+    else:
+        app.scheduler = None
+
+    print(f"* Cold-start model (pid {os.getpid()}): impor + muat {load_ms:.0f} ms, warm-up {warmup_ms:.0f} ms, "
+          f"RSS {_format_mb(rss_before)} -> {_format_mb(_rss_mb())}")
 
 def create_app():
     """
@@ -23,7 +252,9 @@ def create_app():
     1. Membuat instance Flask.
     2. Mengatur konfigurasi dasar seperti secret key dan folder unggahan.
     3. Memastikan direktori untuk unggahan ada.
-    4. Memuat model klasifikasi cuaca dan model deteksi anomali.
+    4. Memuat model klasifikasi cuaca dan model deteksi anomali, lalu
+       menggabungkannya dalam satu mesin inferensi (langsung, atau saat
+       permintaan pertama pada mode startup 'lazy').
     5. Mendefinisikan variabel global aplikasi seperti daftar kelas dan ekstensi yang diizinkan.
     6. Mendaftarkan blueprint untuk setiap bagian dari fungsionalitas aplikasi.
 
@@ -36,38 +267,90 @@ def create_app():
     app.config['SECRET_KEY'] = 'supersecretkey'  # Kunci rahasia untuk sesi dan keamanan.
     app.config['UPLOAD_FOLDER'] = 'static/uploads/'  # Direktori penyimpanan berkas unggahan.
     app.config['MAX_CONTENT_LENGTH'] = 30 * 1024 * 1024  # Batas ukuran berkas unggahan (30 MB).
+    app.config['BATCH_CHUNK_SIZE'] = 32  # Jumlah gambar per potongan pada inferensi massal.
+    app.config['MODEL_PATH'] = 'model/svm_model-v1.1.pkl'  # Pickle model klasifikasi.
+    app.config['ANOMALY_MODEL_PATH'] = 'model/anomaly_detector.pkl'  # Pickle detektor anomali.
+    app.config['MODEL_ARTIFACT_DIR'] = 'model/artifact'  # Artefak model ter-memory-map; dipakai jika ada.
+    app.config['MODEL_ARTIFACT_MMAP'] = True  # Memory-map array artefak agar dibagi antar proses pekerja.
+    app.config['ANOMALY_GATE_PATH'] = 'model/anomaly_gate.pkl'  # Gerbang anomali tahap pertama; dipakai jika ada.
+    app.config['STARTUP_MODE'] = 'eager'  # 'eager' (muat saat startup) atau 'lazy' (muat saat permintaan pertama).
+    app.config['STARTUP_WARMUP'] = True  # Menjalankan satu inferensi dummy setelah model dimuat.
+    app.config['COMPILED_INFERENCE'] = True  # Memakai jalur inferensi NumPy terkompilasi untuk klasifikasi.
+    app.config['RESULT_CACHE'] = 'memory'  # Cache hasil prediksi: 'memory', 'sqlite' (antar proses), atau None.
+    app.config['RESULT_CACHE_MAX_ENTRIES'] = 4096  # Jumlah entri maksimum cache hasil.
+    app.config['RESULT_CACHE_MAX_MB'] = 16  # Batas memori cache hasil dalam proses (MB).
+    app.config['RESULT_CACHE_PATH'] = 'cache/results.sqlite'  # Berkas cache hasil bersama.
+    app.config['METRICS_ENABLED'] = True  # Timer per tahap dan endpoint /metrics (Prometheus).
+    app.config['LIVE_MICRO_BATCHING'] = True  # Mengelompokkan frame kamera langsung yang tiba bersamaan.
+    app.config['LIVE_MAX_BATCH_SIZE'] = 16  # Jumlah frame maksimum per batch.
+    app.config['LIVE_MAX_WAIT_MS'] = 20  # Waktu tunggu maksimum pengumpulan batch (milidetik).
+    app.config['LIVE_MAX_QUEUE_DEPTH'] = 64  # Kedalaman antrean sebelum frame baru ditolak.
+    app.config['LIVE_STREAMING'] = True  # Kanal streaming frame JPEG biner per sesi untuk kamera langsung.
+    app.config['LIVE_MAX_SESSIONS'] = 64  # Jumlah sesi streaming aktif maksimum.
+    app.config['LIVE_SESSION_IDLE_S'] = 30  # Sesi tanpa frame selama ini (detik) ditutup.
+    app.config['LIVE_STREAM_HEARTBEAT_S'] = 5  # Interval heartbeat aliran hasil (detik).
+    app.config['LIVE_STREAM_MAX_S'] = 25  # Umur maksimum satu respons aliran hasil; di bawah timeout Gunicorn.
+    app.config['LIVE_TEMPORAL_FILTER'] = True  # Melewati inferensi jika adegan kamera tidak berubah.
+    app.config['LIVE_CHANGE_THRESHOLD'] = 4.0  # Rata-rata selisih piksel (0-255) agar adegan dianggap berubah.
+    app.config['LIVE_MAX_STALENESS_S'] = 10  # Umur maksimum hasil yang dipakai ulang (detik).
+    app.config['LIVE_EMA_ALPHA'] = 0.5  # Bobot frame baru pada EMA probabilitas; None menonaktifkan.
+    app.config['LIVE_TEMPORAL_MAX_CLIENTS'] = 256  # Jumlah klien /predict_frame yang statusnya disimpan.
     
     # Membuat direktori unggahan jika belum ada.
     if not os.path.exists(app.config['UPLOAD_FOLDER']):
         os.makedirs(app.config['UPLOAD_FOLDER'])
-        
-    # Memuat model klasifikasi cuaca.
-    try:
-        model_path = 'model/svm_model-v1.1.pkl' 
-        app.model = joblib.load(model_path)
-        print(f"* Model klasifikasi berhasil dimuat dari {model_path}")
-    except Exception as e:
-        print(f"* GAGAL memuat model klasifikasi: {e}")
-        app.model = None
-
-    # Memuat model deteksi anomali.
-    try:
-        anomaly_model_path = 'model/anomaly_detector.pkl'
-        app.anomaly_detector = joblib.load(anomaly_model_path)
-        print(f"* Model detektor anomali berhasil dimuat dari {anomaly_model_path}")
-    except Exception as e:
-        print(f"* GAGAL memuat model detektor anomali: {e}")
-        app.anomaly_detector = None
 
     # Mendefinisikan variabel konfigurasi yang dapat diakses di seluruh aplikasi.
     app.CLASSES = ["Berawan", "Hujan", "Cerah", "Berkabut"]  # Daftar kelas target.
     app.ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}  # Ekstensi berkas yang diizinkan.
+
+    # Registri sesi streaming kamera langsung (status per koneksi, di memori proses ini).
+    # Seluruh permintaan satu sesi harus sampai ke proses yang sama; lihat gunicorn.conf.py.
+    if app.config['LIVE_STREAMING']:
+        app.live_sessions = LiveSessionRegistry(max_sessions=app.config['LIVE_MAX_SESSIONS'],
+                                                idle_timeout=app.config['LIVE_SESSION_IDLE_S'])
+    else:
+        app.live_sessions = None
+
+    # Status temporal per klien kamera untuk pelewatan frame.
+    if app.config['LIVE_TEMPORAL_FILTER']:
+        app.temporal_filters = TemporalFilterStore(app.CLASSES,
+                                                   max_clients=app.config['LIVE_TEMPORAL_MAX_CLIENTS'],
+                                                   change_threshold=app.config['LIVE_CHANGE_THRESHOLD'],
+                                                   max_staleness=app.config['LIVE_MAX_STALENESS_S'],
+                                                   ema_alpha=app.config['LIVE_EMA_ALPHA'])
+    else:
+        app.temporal_filters = None
+
+    # Memuat model sekarang, atau menundanya hingga permintaan pertama.
+    app.model = app.anomaly_detector = app.engine = app.scheduler = None
+    if app.config['STARTUP_MODE'] == 'lazy':
+        load_lock = threading.Lock()
+        loaded = []
+
+        @app.before_request
+        def ensure_engine_loaded():
+            """Memuat model satu kali, saat permintaan pertama yang membutuhkannya."""
+            if loaded or request.endpoint in _LAZY_EXEMPT_ENDPOINTS:
+                return
+            with load_lock:
+                if not loaded:
+                    load_engine(app)
+                    loaded.append(True)
+    else:
+        load_engine(app)
     
     # Mendaftarkan blueprint untuk mengatur rute.
     app.register_blueprint(main_bp)
     app.register_blueprint(predict_bp)
     app.register_blueprint(live_bp)
 
+    # Instrumentasi latensi dan endpoint metrik; tanpa biaya jika dinonaktifkan.
+    METRICS.enabled = app.config['METRICS_ENABLED']
+    if METRICS.enabled:
+        METRICS.register_collector(lambda: collect_runtime_metrics(app), name='runtime')
+        app.register_blueprint(metrics_bp)
+
     return app
 
 # Titik masuk eksekusi skrip.
@@ -0,0 +1,24 @@
+"""
+Konfigurasi Gunicorn untuk produksi (dimuat otomatis dari direktori kerja).
+
+Sesi streaming kamera langsung, cache hasil dalam memori, dan penjadwal
+micro-batching disimpan di memori proses. Karena itu aplikasi dijalankan
+dalam satu proses pekerja dengan banyak thread: semua permintaan sebuah sesi
+(`/live/sessions/<id>/frames` dan `/results`) sampai ke registri yang sama,
+dan aliran hasil yang panjang hanya menempati satu thread, bukan seluruh
+pekerja. Inferensi (NumPy, OpenCV, scikit-learn) sebagian besar melepas GIL,
+sehingga thread tetap memakai banyak inti.
+
+Untuk skala lebih besar, jalankan beberapa instance seperti ini di belakang
+load balancer dengan sticky routing (misalnya hash alamat klien).
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '16'))
+# Aliran hasil berakhir setelah LIVE_STREAM_MAX_S (25 detik) lalu dibuka ulang oleh klien.
+timeout = 30
+keepalive = 5
@@ -3,21 +3,112 @@ Blueprint untuk fungsionalitas deteksi cuaca secara langsung (live).
 
 Modul ini mendefinisikan rute API yang menerima frame gambar dari klien
 (misalnya, dari kamera web), memprosesnya, dan mengembalikan hasil prediksi
-secara real-time.
+secara real-time. Jika penjadwal micro-batching aktif, frame dari banyak klien
+yang tiba bersamaan diproses dalam satu batch.
+
+Selain endpoint JSON/base64 `/predict_frame`, tersedia kanal streaming per
+sesi (lihat `utils.live_session`): frame JPEG biner dikirim ke
+`/live/sessions/<id>/frames` dan hasilnya dialirkan sebagai NDJSON melalui
+satu respons chunked `/live/sessions/<id>/results`.
+
+Jika filter temporal aktif (lihat `utils.temporal_filter`), frame yang
+adegannya tidak berubah dijawab dengan hasil sebelumnya tanpa inferensi.
+Statusnya disimpan per sesi streaming, atau per `client_id` pada `/predict_frame`.
 """
 
 import numpy as np
 import base64
 import io
+import json
+import time
 from PIL import Image
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request, current_app, url_for, Response, stream_with_context
 
-from utils.model_wrapper import preprocess_image_for_feature_extraction, extract_features
 from utils.prediction_logic import smart_predict
+from utils.batch_scheduler import SchedulerOverloadedError
+from utils.live_session import LiveSessionLimitError
+from utils.temporal_filter import frame_signature
+from utils.metrics import METRICS, stage_timer
 
 # Membuat instance Blueprint untuk rute terkait deteksi langsung.
 live_bp = Blueprint('live', __name__)
 
+def decode_frame(image_bytes):
+    """
+    Men-decode byte gambar frame menjadi array RGB.
+
+    Args:
+        image_bytes (bytes): Isi berkas JPEG atau PNG.
+
+    Returns:
+        np.ndarray: Gambar RGB uint8.
+    """
+    with stage_timer('decode'):
+        image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+        return np.array(image)
+
+def predict_image(engine, image_np):
+    """
+    Menjalankan inferensi satu frame, melalui penjadwal micro-batching jika aktif.
+
+    Args:
+        engine (InferenceEngine): Mesin inferensi aplikasi.
+        image_np (np.ndarray): Gambar RGB uint8.
+
+    Returns:
+        tuple: (is_anomaly, all_confidences) seperti `InferenceEngine.predict`.
+
+    Raises:
+        SchedulerOverloadedError: Jika antrean penjadwal penuh.
+    """
+    scheduler = current_app.scheduler
+    if scheduler:
+        return scheduler.submit(image_np)
+    return engine.predict(image_np)
+
+def predict_frame_bytes(engine, frame_bytes, temporal=None):
+    """
+    Memprediksi satu frame, memakai ulang hasil sebelumnya jika adegan tidak berubah.
+
+    Args:
+        engine (InferenceEngine): Mesin inferensi aplikasi.
+        frame_bytes (bytes): Isi berkas JPEG atau PNG frame.
+        temporal (TemporalFilter, optional): Status temporal klien; None berarti selalu inferensi.
+
+    Returns:
+        tuple: (is_anomaly, all_confidences, reused) dengan `reused` True jika
+               inferensi dilewati.
+    """
+    if temporal is None:
+        return (*predict_image(engine, decode_frame(frame_bytes)), False)
+    with stage_timer('change_detection'):
+        signature = frame_signature(frame_bytes)
+    previous = temporal.reuse(signature)
+    if previous is not None:
+        METRICS.inc('weather_live_frames_reused_total')
+        return (*previous, True)
+    is_anomaly, all_confidences = predict_image(engine, decode_frame(frame_bytes))
+    return (*temporal.update(signature, is_anomaly, all_confidences), False)
+
+def build_frame_result(is_anomaly, all_confidences):
+    """
+    Menyusun hasil prediksi frame untuk dikirim ke klien.
+
+    Args:
+        is_anomaly (bool): True jika frame ditolak detektor anomali.
+        all_confidences (list of tuple or None): Kepercayaan per kelas yang sudah diurutkan.
+
+    Returns:
+        dict: Prediksi akhir dan kepercayaannya.
+    """
+    if is_anomaly:
+        METRICS.inc('weather_anomalies_rejected_total', {'route': request.endpoint})
+        return {'prediction': 'Tidak Terdeteksi', 'confidence': 100, 'is_anomaly': True}
+
+    # Menggunakan logika cerdas untuk mendapatkan prediksi akhir.
+    prediction, _, _ = smart_predict(all_confidences)
+    return {'prediction': prediction, 'confidence': all_confidences[0][1]}
+
 @live_bp.route('/predict_frame', methods=['POST'])
 def predict_frame():
     """
@@ -25,18 +116,17 @@ def predict_frame():
 
     Menerima data gambar dalam format Base64 dari permintaan JSON.
     Gambar tersebut kemudian di-decode, diproses untuk deteksi anomali,
-    dan jika valid, diprediksi kondisi cuacanya.
+    dan jika valid, diprediksi kondisi cuacanya. Jika permintaan menyertakan
+    `client_id`, filter temporal klien tersebut dipakai.
 
     Returns:
         Response: Objek JSON yang berisi hasil prediksi atau pesan kesalahan.
     """
-    # Mengambil model dan konfigurasi dari konteks aplikasi saat ini.
-    model = current_app.model
-    anomaly_detector = current_app.anomaly_detector
-    classes = current_app.CLASSES
+    # Mengambil mesin inferensi dari konteks aplikasi saat ini.
+    engine = current_app.engine
 
     # Memeriksa apakah model telah berhasil dimuat.
-    if not model or not anomaly_detector:
+    if not engine:
         return jsonify({'error': 'Model tidak dimuat'}), 500
 
     try:
@@ -50,48 +140,170 @@ def predict_frame():
         # Memisahkan header dari data Base64.
         # Contoh header: 'data:image/jpeg;base64,'
         header, encoded = image_data.split(',', 1)
-        
-        # Mendekode string Base64 menjadi byte.
-        image_bytes = base64.b64decode(encoded)
-        
-        # Membuka byte gambar menggunakan Pillow dan mengubahnya menjadi array NumPy.
-        image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-        image_np = np.array(image)
-
-        # Langkah 1: Deteksi Anomali
-        # Gambar diproses untuk mengekstrak fitur yang relevan.
-        gray_img, color_img = preprocess_image_for_feature_extraction(image_np)
-        features = extract_features(gray_img, color_img)
-        # Model detektor anomali memprediksi apakah gambar tersebut merupakan anomali.
-        is_anomaly = anomaly_detector.predict(features.reshape(1, -1))
-        
-        # Jika gambar terdeteksi sebagai anomali (nilai prediksi -1), kembalikan respons anomali.
-        if is_anomaly[0] == -1:
-            return jsonify({
-                'prediction': 'Tidak Terdeteksi',
-                'confidence': 100,
-                'is_anomaly': True
-            })
-
-        # Langkah 2: Prediksi Cuaca (jika bukan anomali)
-        # Model klasifikasi memprediksi probabilitas untuk setiap kelas cuaca.
-        confidence_scores = model.predict_proba([image_np])[0]
-        # Mengurutkan hasil kepercayaan dari yang tertinggi ke terendah.
-        all_confidences = sorted(
-            [(classes[i], round(score * 100, 2)) for i, score in enumerate(confidence_scores)],
-            key=lambda item: item[1],
-            reverse=True
-        )
-        # Menggunakan logika cerdas untuk mendapatkan prediksi akhir.
-        prediction, _, _ = smart_predict(all_confidences)
-        
+
+        # Status temporal per klien, jika klien mengirim ID-nya.
+        filters = current_app.temporal_filters
+        client_id = data.get('client_id')
+        temporal = filters.get(str(client_id)) if filters is not None and client_id else None
+
+        # Deteksi anomali dan prediksi cuaca dengan satu kali ekstraksi fitur.
+        # Klasifikasi hanya dijalankan jika gambar bukan anomali.
+        is_anomaly, all_confidences, reused = predict_frame_bytes(engine, base64.b64decode(encoded), temporal)
+
         # Mengirimkan hasil prediksi dalam format JSON.
-        return jsonify({
-            'prediction': prediction,
-            'confidence': all_confidences[0][1]
-        })
+        result = build_frame_result(is_anomaly, all_confidences)
+        result['reused'] = reused
+        return jsonify(result)
+
+    except SchedulerOverloadedError:
+        # Antrean penuh: frame ini dilewati dan klien mencoba lagi pada frame berikutnya.
+        return jsonify({'error': 'Server sedang sibuk'}), 503
 
     except Exception as e:
         # Menangani kesalahan yang mungkin terjadi selama proses.
         print(f"Error processing frame: {e}")
+        METRICS.inc('weather_errors_total', {'route': request.endpoint})
         return jsonify({'error': str(e)}), 500
+
+@live_bp.route('/predict_frame/stats', methods=['GET'])
+def predict_frame_stats():
+    """
+    Endpoint API untuk metrik penjadwal micro-batching.
+
+    Returns:
+        Response: Objek JSON berisi kedalaman antrean, jumlah frame yang ditolak,
+                  rata-rata ukuran batch, dan persentil latensi.
+    """
+    scheduler = current_app.scheduler
+    if not scheduler:
+        return jsonify({'error': 'Penjadwal micro-batching tidak aktif'}), 404
+    return jsonify(scheduler.stats())
+
+@live_bp.route('/live/sessions', methods=['POST'])
+def open_session():
+    """
+    Endpoint API untuk membuka sesi streaming kamera langsung.
+
+    Returns:
+        Response: Objek JSON berisi ID sesi, URL pengiriman frame, dan URL aliran hasil.
+    """
+    registry = current_app.live_sessions
+    if not current_app.engine or registry is None:
+        return jsonify({'error': 'Streaming langsung tidak aktif'}), 404
+    try:
+        session = registry.create()
+    except LiveSessionLimitError as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({
+        'session_id': session.session_id,
+        'frames_url': url_for('live.push_frame', session_id=session.session_id),
+        'results_url': url_for('live.stream_results', session_id=session.session_id),
+    })
+
+@live_bp.route('/live/sessions/<session_id>/frames', methods=['POST'])
+def push_frame(session_id):
+    """
+    Endpoint API untuk mengirim satu frame JPEG biner ke sesi streaming.
+
+    Badan permintaan adalah isi berkas gambar mentah (tanpa base64 maupun JSON).
+    Frame hanya disimpan sebagai frame terbaru sesi; inferensi berjalan di
+    aliran hasil, sehingga endpoint ini langsung menjawab.
+
+    Args:
+        session_id (str): ID sesi dari `open_session`.
+
+    Returns:
+        Response: Respons kosong 204, atau 404 jika sesi tidak dikenal.
+    """
+    registry = current_app.live_sessions
+    session = registry.get(session_id) if registry is not None else None
+    if session is None:
+        return jsonify({'error': 'Sesi tidak ditemukan'}), 404
+    frame_bytes = request.get_data(cache=False)
+    if not frame_bytes:
+        return jsonify({'error': 'Tidak ada data gambar'}), 400
+    session.offer(frame_bytes)
+    return '', 204
+
+@live_bp.route('/live/sessions/<session_id>/results', methods=['GET'])
+def stream_results(session_id):
+    """
+    Endpoint API yang mengalirkan hasil prediksi sesi sebagai NDJSON.
+
+    Setiap baris adalah hasil satu frame (dengan nomor urut frame dan jumlah
+    frame yang dibuang sejauh ini). Baris kosong dikirim secara berkala sebagai
+    heartbeat. Aliran berakhir saat sesi ditutup atau kedaluwarsa, dan sesi
+    ditutup saat klien memutus koneksi.
+
+    Satu respons tidak dibiarkan terbuka lebih lama dari `LIVE_STREAM_MAX_S`
+    (di bawah batas waktu pekerja Gunicorn). Saat batas tercapai, baris
+    `{"reconnect": true}` dikirim dan aliran berakhir tanpa menutup sesi;
+    klien membuka ulang URL hasil yang sama.
+
+    Args:
+        session_id (str): ID sesi dari `open_session`.
+
+    Returns:
+        Response: Respons streaming `application/x-ndjson`.
+    """
+    registry = current_app.live_sessions
+    session = registry.get(session_id) if registry is not None else None
+    if session is None:
+        return jsonify({'error': 'Sesi tidak ditemukan'}), 404
+    engine = current_app.engine
+    heartbeat = current_app.config['LIVE_STREAM_HEARTBEAT_S']
+    deadline = time.monotonic() + current_app.config['LIVE_STREAM_MAX_S']
+    # Status temporal milik koneksi ini.
+    filters = current_app.temporal_filters
+    temporal = filters.new_filter() if filters is not None else None
+
+    def generate():
+        reconnect = False
+        try:
+            while not session.closed:
+                if session.idle_seconds() > registry.idle_timeout:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    reconnect = True
+                    yield json.dumps({'reconnect': True}) + '\n'
+                    break
+                frame = session.take(timeout=min(heartbeat, remaining))
+                if frame is None:
+                    yield '\n'
+                    continue
+                seq, frame_bytes = frame
+                try:
+                    is_anomaly, all_confidences, reused = predict_frame_bytes(engine, frame_bytes, temporal)
+                    result = build_frame_result(is_anomaly, all_confidences)
+                    result['reused'] = reused
+                except SchedulerOverloadedError:
+                    result = {'error': 'Server sedang sibuk', 'busy': True}
+                except Exception as e:
+                    print(f"Error processing frame: {e}")
+                    METRICS.inc('weather_errors_total', {'route': request.endpoint})
+                    result = {'error': str(e)}
+                result.update(seq=seq, dropped=session.dropped)
+                yield json.dumps(result) + '\n'
+        finally:
+            if not reconnect:
+                registry.close(session_id)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@live_bp.route('/live/sessions/<session_id>', methods=['DELETE'])
+def close_session(session_id):
+    """
+    Endpoint API untuk menutup sesi streaming.
+
+    Args:
+        session_id (str): ID sesi dari `open_session`.
+
+    Returns:
+        Response: Respons kosong 204.
+    """
+    registry = current_app.live_sessions
+    if registry is not None:
+        registry.close(session_id)
+    return '', 204
@@ -0,0 +1,68 @@
+"""
+Blueprint untuk metrik operasional aplikasi.
+
+Modul ini mendaftarkan hook permintaan yang mencatat jumlah permintaan,
+permintaan yang sedang berjalan, dan durasi per rute, serta menyediakan
+endpoint `/metrics` dalam format teks Prometheus. Blueprint ini hanya
+didaftarkan jika `METRICS_ENABLED` aktif.
+"""
+
+import time
+from flask import Blueprint, Response, request, g
+
+from utils.metrics import METRICS
+
+# Membuat instance Blueprint untuk metrik.
+metrics_bp = Blueprint('metrics', __name__)
+
+# Endpoint yang tidak dicatat (berkas statis dan endpoint metrik itu sendiri).
+_IGNORED_ENDPOINTS = {'static', 'metrics.metrics'}
+
+
+def _route_label():
+    """Mengembalikan label rute untuk permintaan saat ini, atau None jika diabaikan."""
+    endpoint = request.endpoint or 'unknown'
+    return None if endpoint in _IGNORED_ENDPOINTS else endpoint
+
+@metrics_bp.before_app_request
+def start_request_timer():
+    """Menandai awal permintaan dan menaikkan gauge permintaan yang sedang berjalan."""
+    route = _route_label()
+    if route is None:
+        return
+    g.metrics_route = route
+    g.metrics_start = time.perf_counter()
+    METRICS.inc('weather_requests_in_flight', {'route': route})
+
+@metrics_bp.after_app_request
+def count_request(response):
+    """Menghitung permintaan per rute dan kode status."""
+    route = g.get('metrics_route')
+    if route is not None:
+        METRICS.inc('weather_requests_total', {'route': route, 'status': response.status_code})
+    return response
+
+@metrics_bp.teardown_app_request
+def stop_request_timer(exc):
+    """Mencatat durasi permintaan dan menurunkan gauge, termasuk saat terjadi exception.
+
+    Respons streaming dapat memicu teardown lebih dari sekali, sehingga label
+    rute diambil (pop) agar pencatatan hanya terjadi satu kali.
+    """
+    route = g.pop('metrics_route', None)
+    if route is None:
+        return
+    if exc is not None:
+        METRICS.inc('weather_errors_total', {'route': route})
+    METRICS.observe('weather_request_duration_seconds', time.perf_counter() - g.metrics_start, {'route': route})
+    METRICS.dec('weather_requests_in_flight', {'route': route})
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """
+    Endpoint metrik dalam format teks eksposisi Prometheus.
+
+    Returns:
+        Response: Teks metrik dengan tipe konten Prometheus.
+    """
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
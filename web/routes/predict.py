@@ -6,18 +6,20 @@ Modul ini berisi rute untuk:
 2. Memvalidasi dan menyimpan berkas yang diunggah.
 3. Memproses gambar melalui model deteksi anomali dan klasifikasi cuaca.
 4. Mengarahkan pengguna ke halaman hasil yang sesuai.
-5. Menyediakan endpoint API untuk pemrosesan gambar secara asinkron (untuk unggahan massal).
+5. Menyediakan endpoint API untuk pemrosesan gambar secara asinkron (untuk unggahan massal),
+   baik per gambar maupun satu batch sekaligus dengan hasil yang dialirkan (NDJSON).
 """
 
 import os
+import json
 import uuid
-import numpy as np
-from PIL import Image
-from flask import (Blueprint, render_template, request, redirect, url_for, flash, session, current_app, jsonify)
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, session, current_app, jsonify,
+                   Response, stream_with_context)
 from werkzeug.utils import secure_filename
 
-from utils.model_wrapper import preprocess_image_for_feature_extraction, extract_features
 from utils.prediction_logic import smart_predict
+from utils.image_io import decode_upload
+from utils.metrics import METRICS
 
 # Membuat instance Blueprint.
 predict_bp = Blueprint('predict', __name__)
@@ -50,6 +52,47 @@ def generate_unique_filename(filename):
     unique_name = uuid.uuid4().hex
     return f"{unique_name}.{ext}"
 
+def card_id(unique_filename):
+    """
+    Menghasilkan ID elemen kartu pada halaman hasil massal untuk sebuah berkas.
+
+    Args:
+        unique_filename (str): Nama berkas unik di dalam direktori batch.
+
+    Returns:
+        str: ID elemen HTML kartu.
+    """
+    return f"card-{unique_filename.split('.')[0]}"
+
+def build_api_result(is_anomaly, all_confidences):
+    """
+    Menyusun hasil prediksi satu gambar dalam format respons API.
+
+    Args:
+        is_anomaly (bool): True jika gambar ditolak oleh detektor anomali.
+        all_confidences (list of tuple or None): Kepercayaan per kelas yang sudah diurutkan.
+
+    Returns:
+        dict: Hasil prediksi yang siap diserialisasi ke JSON.
+    """
+    if is_anomaly:
+        return {
+            'prediction': 'Gambar Ditolak',
+            'icon_name': 'default',
+            'confidence': 100,
+            'all_confidences': [('Bukan citra cuaca', 100)],
+            'is_anomaly': True
+        }
+
+    # Prediksi cuaca.
+    prediction, icon_name, _ = smart_predict(all_confidences)
+    return {
+        'prediction': prediction,
+        'icon_name': icon_name,
+        'confidence': all_confidences[0][1],
+        'all_confidences': all_confidences
+    }
+
 @predict_bp.route('/predict', methods=['POST'])
 def predict():
     """
@@ -79,59 +122,47 @@ def handle_single_file(file):
     """
     Memproses unggahan satu berkas gambar.
 
-    Fungsi ini menyimpan berkas, menjalankan deteksi anomali, melakukan prediksi,
-    membuat thumbnail, dan kemudian merender halaman hasil yang detail.
+    Fungsi ini men-decode berkas langsung dari memori satu kali, menjalankan
+    deteksi anomali, menyimpan thumbnail, melakukan prediksi, dan kemudian
+    merender halaman hasil yang detail. Berkas asli tidak pernah ditulis ke disk.
 
     Args:
         file (FileStorage): Objek berkas yang diunggah.
     """
-    # Mengambil konfigurasi dan model dari aplikasi.
-    model = current_app.model
-    anomaly_detector = current_app.anomaly_detector
-    classes = current_app.CLASSES
+    # Mengambil konfigurasi dan mesin inferensi dari aplikasi.
+    engine = current_app.engine
     upload_folder = current_app.config['UPLOAD_FOLDER']
 
     if file and allowed_file(file.filename):
         original_filename = generate_unique_filename(file.filename)
-        filepath = os.path.join(upload_folder, original_filename)
-        file.save(filepath)
 
         try:
-            # Deteksi anomali terlebih dahulu.
-            with Image.open(filepath) as img:
-                image_np_for_check = np.array(img.convert('RGB'))
+            # Satu kali decode dari stream unggahan menghasilkan thumbnail dan input model.
+            image_np_for_check, thumbnail = decode_upload(file.stream)
 
-            gray_img, color_img = preprocess_image_for_feature_extraction(image_np_for_check)
-            features = extract_features(gray_img, color_img)
-            is_anomaly = anomaly_detector.predict(features.reshape(1, -1))
+            # Deteksi anomali dan prediksi cuaca dengan satu kali ekstraksi fitur
+            # (atau langsung dari cache hasil untuk gambar yang sama).
+            is_anomaly, all_confidences = engine.predict(image_np_for_check)
             
-            # Jika anomali terdeteksi, hapus berkas dan kembali ke halaman utama.
-            if is_anomaly[0] == -1:
-                os.remove(filepath)
+            # Jika anomali terdeteksi, kembali ke halaman utama.
+            if is_anomaly:
+                METRICS.inc('weather_anomalies_rejected_total', {'route': request.endpoint})
                 flash('Gambar yang diunggah tidak terdeteksi. Silakan coba gambar lain.')
                 return redirect(url_for('main.index'))
             
-            # Jika bukan anomali, buat thumbnail untuk ditampilkan.
-            with Image.open(filepath) as img:
-                filename_parts = original_filename.rsplit('.', 1)
-                thumb_filename = f"{filename_parts[0]}_thumb.{filename_parts[1]}"
-                thumb_filepath = os.path.join(upload_folder, thumb_filename)
-                img.thumbnail((800, 800))  # Mengubah ukuran gambar.
-                img.save(thumb_filepath, optimize=True, quality=85)
-                
-                # Menghapus berkas thumbnail sebelumnya dari sesi untuk menjaga kebersihan.
-                last_filepath = session.get('last_filepath')
-                if last_filepath and os.path.exists(last_filepath):
-                    os.remove(last_filepath)
-                session['last_filepath'] = thumb_filepath
-                os.remove(filepath) # Menghapus berkas asli yang berukuran besar.
-
-            # Lakukan prediksi cuaca pada gambar.
-            confidence_scores = model.predict_proba([image_np_for_check])[0]
-            all_confidences = sorted(
-                [(classes[i], round(score * 100, 2)) for i, score in enumerate(confidence_scores)],
-                key=lambda item: item[1], reverse=True
-            )
+            # Jika bukan anomali, simpan thumbnail untuk ditampilkan.
+            filename_parts = original_filename.rsplit('.', 1)
+            thumb_filename = f"{filename_parts[0]}_thumb.{filename_parts[1]}"
+            thumb_filepath = os.path.join(upload_folder, thumb_filename)
+            thumbnail.save(thumb_filepath, optimize=True, quality=85)
+            
+            # Menghapus berkas thumbnail sebelumnya dari sesi untuk menjaga kebersihan.
+            last_filepath = session.get('last_filepath')
+            if last_filepath and os.path.exists(last_filepath):
+                os.remove(last_filepath)
+            session['last_filepath'] = thumb_filepath
+
+            # Prediksi akhir menggunakan logika cerdas.
             prediction, icon_name, description = smart_predict(all_confidences)
             
             # Tampilkan halaman hasil dengan data prediksi.
@@ -144,8 +175,7 @@ def handle_single_file(file):
 
         except Exception as e:
             # Penanganan kesalahan umum.
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            METRICS.inc('weather_errors_total', {'route': request.endpoint})
             flash(f'Terjadi kesalahan saat memproses gambar: {e}')
             return redirect(url_for('main.index'))
 
@@ -177,7 +207,7 @@ def handle_multiple_files(uploaded_files):
             filepath = os.path.join(batch_dir, unique_filename)
             file.save(filepath)
             files_info.append({
-                'id': f"card-{unique_filename.split('.')[0]}",
+                'id': card_id(unique_filename),
                 'unique_filename': unique_filename
             })
             
@@ -197,16 +227,14 @@ def process_image():
     Ini melakukan logika prediksi yang sama dengan `handle_single_file` tetapi
     mengembalikan hasilnya dalam format JSON.
     """
-    model = current_app.model
-    anomaly_detector = current_app.anomaly_detector
-    classes = current_app.CLASSES
+    engine = current_app.engine
     upload_folder = current_app.config['UPLOAD_FOLDER']
 
     data = request.get_json()
     batch_id = data.get('batch_id')
     filename = data.get('filename')
 
-    if not all([batch_id, filename, model, anomaly_detector]):
+    if not all([batch_id, filename, engine]):
         return jsonify({'error': 'Parameter tidak valid atau model tidak dimuat'}), 400
         
     filepath = os.path.join(upload_folder, batch_id, filename)
@@ -214,38 +242,91 @@ def process_image():
         return jsonify({'error': 'File tidak ditemukan'}), 404
 
     try:
-        image = Image.open(filepath).convert('RGB')
-        image_np = np.array(image)
-        
-        # Deteksi anomali.
-        gray_img, color_img = preprocess_image_for_feature_extraction(image_np)
-        features = extract_features(gray_img, color_img)
-        is_anomaly = anomaly_detector.predict(features.reshape(1, -1))
+        # Decode tereduksi yang sama dengan unggahan tunggal (input model dan kunci cache identik).
+        image_np, _ = decode_upload(filepath)
         
-        if is_anomaly[0] == -1:
-            return jsonify({
-                'prediction': 'Gambar Ditolak',
-                'icon_name': 'default',
-                'confidence': 100,
-                'all_confidences': [('Bukan citra cuaca', 100)],
-                'is_anomaly': True
-            })
+        # Deteksi anomali dan prediksi cuaca dengan satu kali ekstraksi fitur.
+        is_anomaly, all_confidences = engine.predict(image_np)
+        if is_anomaly:
+            METRICS.inc('weather_anomalies_rejected_total', {'route': request.endpoint})
 
-        # Prediksi cuaca.
-        confidence_scores = model.predict_proba([image_np])[0]
-        all_confidences = sorted(
-            [(classes[i], round(score * 100, 2)) for i, score in enumerate(confidence_scores)],
-            key=lambda item: item[1], reverse=True
-        )
-        prediction, icon_name, _ = smart_predict(all_confidences)
-        
         # Kembalikan hasil dalam format JSON.
-        return jsonify({
-            'prediction': prediction,
-            'icon_name': icon_name,
-            'confidence': all_confidences[0][1],
-            'all_confidences': all_confidences
-        })
+        return jsonify(build_api_result(is_anomaly, all_confidences))
     except Exception as e:
         print(f"Error processing {filename}: {e}")
+        METRICS.inc('weather_errors_total', {'route': request.endpoint})
         return jsonify({'error': f'Gagal memproses gambar: {e}'}), 500
+
+@predict_bp.route('/api/process_batch', methods=['POST'])
+def process_batch():
+    """
+    Endpoint API untuk memproses seluruh gambar dalam satu batch sekaligus.
+
+    Semua berkas di direktori batch diproses per potongan sebagai satu
+    pekerjaan tervektorisasi (satu matriks fitur, satu panggilan detektor
+    anomali, dan satu panggilan klasifikasi per potongan). Hasilnya dialirkan
+    sebagai NDJSON: satu baris JSON per gambar, dikirim segera setelah
+    potongannya selesai, sehingga halaman hasil dapat diperbarui bertahap.
+    """
+    engine = current_app.engine
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    chunk_size = current_app.config['BATCH_CHUNK_SIZE']
+
+    data = request.get_json(silent=True) or {}
+    batch_id = data.get('batch_id')
+
+    # batch_id harus berupa satu nama direktori, bukan path.
+    if not batch_id or not engine or secure_filename(batch_id) != batch_id:
+        return jsonify({'error': 'Parameter tidak valid atau model tidak dimuat'}), 400
+
+    batch_dir = os.path.join(upload_folder, batch_id)
+    if not os.path.isdir(batch_dir):
+        return jsonify({'error': 'Batch tidak ditemukan'}), 404
+
+    filenames = sorted(name for name in os.listdir(batch_dir) if allowed_file(name))
+    route = request.endpoint
+
+    def generate():
+        for start in range(0, len(filenames), chunk_size):
+            chunk_lines, images, loaded = [], [], []
+            for filename in filenames[start:start + chunk_size]:
+                try:
+                    # Foto kamera besar di-decode langsung ke ukuran thumbnail (mode draft JPEG),
+                    # bukan ke resolusi penuh, sehingga satu potongan tidak menampung puluhan array besar.
+                    images.append(decode_upload(os.path.join(batch_dir, filename))[0])
+                    loaded.append(filename)
+                except Exception as e:
+                    print(f"Error processing {filename}: {e}")
+                    METRICS.inc('weather_errors_total', {'route': route})
+                    chunk_lines.append({'id': card_id(filename), 'filename': filename,
+                                        'error': f'Gagal memproses gambar: {e}'})
+
+            try:
+                for filename, (is_anomaly, all_confidences) in zip(loaded, engine.predict_batch(images)):
+                    if is_anomaly:
+                        METRICS.inc('weather_anomalies_rejected_total', {'route': route})
+                    result = build_api_result(is_anomaly, all_confidences)
+                    chunk_lines.append({'id': card_id(filename), 'filename': filename, **result})
+            except Exception as e:
+                print(f"Error processing batch {batch_id}: {e}")
+                METRICS.inc('weather_errors_total', {'route': route}, len(loaded))
+                chunk_lines.extend({'id': card_id(filename), 'filename': filename,
+                                    'error': f'Gagal memproses gambar: {e}'} for filename in loaded)
+
+            for line in chunk_lines:
+                yield json.dumps(line) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@predict_bp.route('/api/cache_stats', methods=['GET'])
+def cache_stats():
+    """
+    Endpoint API untuk penghitung cache hasil prediksi.
+
+    Returns:
+        Response: Objek JSON berisi jumlah hit, miss, rasio hit, dan ukuran cache.
+    """
+    engine = current_app.engine
+    if not engine or engine.cache is None:
+        return jsonify({'error': 'Cache hasil prediksi tidak aktif'}), 404
+    return jsonify(engine.cache.stats())
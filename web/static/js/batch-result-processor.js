@@ -3,8 +3,9 @@
  * @description Skrip ini bertanggung jawab untuk memproses dan menampilkan hasil klasifikasi
  * untuk beberapa gambar yang diunggah secara bersamaan (mode massal).
  * Skrip akan mengambil data setiap berkas dari atribut data HTML, mengirimkan
- * permintaan ke server untuk setiap berkas, dan kemudian memperbarui antarmuka
- * pengguna (UI) dengan hasil prediksi yang diterima.
+ * satu permintaan ke server untuk seluruh batch, lalu membaca hasil yang dialirkan
+ * (NDJSON, satu baris per gambar) dan memperbarui antarmuka pengguna (UI) setiap
+ * kali hasil sebuah gambar diterima.
  */
 
 // Menjalankan skrip setelah seluruh konten DOM (Document Object Model) selesai dimuat.
@@ -19,12 +20,12 @@ document.addEventListener('DOMContentLoaded', () => {
     const fallbackIconUrl = `${iconBaseUrl}default.svg`; // URL ikon cadangan jika ikon spesifik tidak ditemukan.
 
     /**
-     * @function processFile
-     * @description Mengirim permintaan ke server untuk memproses satu berkas gambar
-     * dan memperbarui kartu (card) yang sesuai dengan hasilnya.
-     * @param {object} file - Objek yang berisi informasi tentang berkas yang akan diproses.
+     * @function renderResult
+     * @description Memperbarui kartu (card) sebuah berkas dengan hasil prediksi dari server.
+     * @param {object} file - Objek yang berisi informasi tentang berkas.
+     * @param {object|null} result - Hasil prediksi, atau null jika berkas gagal diproses.
      */
-    const processFile = async (file) => {
+    const renderResult = (file, result) => {
         const cardElement = document.getElementById(file.id);
         if (!cardElement) return; // Hentikan jika elemen kartu tidak ditemukan.
 
@@ -33,22 +34,10 @@ document.addEventListener('DOMContentLoaded', () => {
         const resultState = cardElement.querySelector('.result-state');
 
         try {
-            // Mengirim permintaan POST ke server dengan ID batch dan nama berkas.
-            const response = await fetch(resultGrid.dataset.processUrl, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ 
-                    batch_id: batchId, 
-                    filename: file.unique_filename 
-                })
-            });
-
-            if (!response.ok) {
-                throw new Error(`Server error: ${response.status}`);
+            if (!result || result.error) {
+                throw new Error(result ? result.error : 'Tidak ada hasil dari server');
             }
 
-            const result = await response.json();
-            
             // Mengambil elemen-elemen untuk menampilkan hasil.
             const iconElement = resultState.querySelector('.result-icon');
             const predictionElement = resultState.querySelector('.result-prediction');
@@ -107,7 +96,7 @@ document.addEventListener('DOMContentLoaded', () => {
             }
 
         } catch (error) {
-            // Menangani kesalahan jaringan atau server.
+            // Menangani kesalahan pemrosesan pada server.
             console.error(`Gagal memproses ${file.unique_filename}:`, error);
             const predictionElement = resultState.querySelector('.result-prediction');
             const confidenceElement = resultState.querySelector('.result-confidence');
@@ -123,15 +112,55 @@ document.addEventListener('DOMContentLoaded', () => {
 
     /**
      * @function processAllFiles
-     * @description Memulai proses untuk semua berkas secara paralel dan menunggu
-     * semuanya selesai.
+     * @description Mengirim satu permintaan untuk seluruh batch dan memperbarui setiap kartu
+     * segera setelah baris hasilnya diterima dari aliran respons.
      */
-    const processAllFiles = () => {
-        const allPromises = filesToProcess.map(file => processFile(file));
-        Promise.all(allPromises).then(() => {
-            // Memperbarui teks status setelah semua proses selesai.
-            document.getElementById('status-text').textContent = 'Semua gambar telah selesai diproses.';
-        });
+    const processAllFiles = async () => {
+        const pending = new Map(filesToProcess.map(file => [file.unique_filename, file]));
+
+        // Memproses satu baris NDJSON dan memperbarui kartu yang sesuai.
+        const handleLine = (line) => {
+            if (!line.trim()) return;
+            const result = JSON.parse(line);
+            const file = pending.get(result.filename);
+            if (!file) return;
+            pending.delete(result.filename);
+            renderResult(file, result);
+        };
+
+        try {
+            const response = await fetch(resultGrid.dataset.batchProcessUrl, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ batch_id: batchId })
+            });
+
+            if (!response.ok) {
+                throw new Error(`Server error: ${response.status}`);
+            }
+
+            // Membaca aliran respons sedikit demi sedikit; setiap baris lengkap adalah hasil satu gambar.
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(handleLine);
+            }
+            handleLine(buffer + decoder.decode());
+        } catch (error) {
+            console.error(`Gagal memproses batch ${batchId}:`, error);
+        }
+
+        // Berkas yang tidak mendapat hasil ditandai sebagai gagal.
+        pending.forEach(file => renderResult(file, null));
+
+        // Memperbarui teks status setelah semua proses selesai.
+        document.getElementById('status-text').textContent = 'Semua gambar telah selesai diproses.';
     };
 
     // Memulai pemrosesan semua berkas.
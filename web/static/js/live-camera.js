@@ -4,6 +4,11 @@
  * menggunakan kamera perangkat pengguna. Ini mencakup inisialisasi kamera,
  * pengambilan frame video, pengiriman frame ke server untuk prediksi,
  * dan menampilkan hasilnya secara real-time.
+ *
+ * Secara default frame dikirim sebagai JPEG biner melalui sesi streaming:
+ * setiap frame di-POST mentah ke sesi, dan hasil prediksi diterima melalui satu
+ * aliran NDJSON yang tetap terbuka. Jika sesi streaming tidak tersedia, skrip
+ * kembali ke endpoint JSON/base64 `/predict_frame` setiap 1 detik.
  */
 
 document.addEventListener('DOMContentLoaded', () => {
@@ -18,7 +23,13 @@ document.addEventListener('DOMContentLoaded', () => {
     const statusSpinner = document.getElementById('status-spinner');
     const startCameraButton = document.getElementById('start-camera-btn');
     
+    const STREAM_INTERVAL_MS = 250; // Interval pengambilan frame pada mode streaming.
+    const LEGACY_INTERVAL_MS = 1000; // Interval pengiriman frame pada mode JSON.
+
     let modelInterval; // Variabel untuk menyimpan interval pengiriman frame.
+    let liveStream = null; // Sesi streaming aktif: { sessionId, framesUrl, resultsUrl, inFlight, controller }.
+    // ID klien untuk status temporal server pada mode JSON.
+    const clientId = window.crypto && crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random()}`;
 
     /**
      * @function initializeCamera
@@ -75,8 +86,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 canvas.width = video.videoWidth;
                 canvas.height = video.videoHeight;
                 
-                if (modelInterval) clearInterval(modelInterval);
-                modelInterval = setInterval(predictFrame, 1000); // Kirim frame setiap 1 detik.
+                startPrediction();
             };
             
         } catch (err) {
@@ -104,13 +114,157 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     };
 
+    /**
+     * @function renderPrediction
+     * @description Memperbarui UI berdasarkan hasil prediksi (normal, anomali, atau error).
+     * @param {Object} result - Hasil prediksi dari server.
+     */
+    const renderPrediction = (result) => {
+        if (result.error) {
+            // Server sibuk: prediksi terakhir tetap ditampilkan.
+            if (!result.busy) predictionText.textContent = 'Prediksi: Error Server';
+            return;
+        }
+        if (result.is_anomaly) {
+            predictionText.textContent = `Peringatan: ${result.prediction}`;
+            predictionOverlay.classList.add('bg-danger', 'bg-opacity-75');
+            predictionOverlay.classList.remove('bg-dark', 'bg-opacity-50');
+        } else {
+            predictionText.textContent = `Prediksi: ${result.prediction || 'Menganalisis...'}`;
+            predictionOverlay.classList.remove('bg-danger', 'bg-opacity-75');
+            predictionOverlay.classList.add('bg-dark', 'bg-opacity-50');
+        }
+    };
+
+    const isVideoReady = () => video.srcObject && !video.paused && !video.ended && video.readyState >= 2;
+
+    /**
+     * @function startPrediction
+     * @description Membuka sesi streaming; jika gagal, memakai pengiriman frame JSON setiap 1 detik.
+     */
+    const startPrediction = async () => {
+        if (modelInterval) clearInterval(modelInterval);
+        liveStream = null;
+        try {
+            const response = await fetch(video.dataset.sessionUrl, { method: 'POST' });
+            if (!response.ok) throw new Error(`Server error: ${response.status}`);
+            const session = await response.json();
+            liveStream = {
+                sessionId: session.session_id,
+                framesUrl: session.frames_url,
+                resultsUrl: session.results_url,
+                inFlight: false,
+                controller: new AbortController()
+            };
+            consumeResults(liveStream);
+            modelInterval = setInterval(sendFrame, STREAM_INTERVAL_MS);
+        } catch (error) {
+            console.warn("Streaming tidak tersedia, memakai mode JSON:", error);
+            modelInterval = setInterval(predictFrame, LEGACY_INTERVAL_MS);
+        }
+    };
+
+    /**
+     * @function consumeResults
+     * @description Membaca aliran hasil NDJSON sesi dan menampilkan setiap hasil.
+     * Server menutup setiap respons secara berkala dengan baris `{"reconnect": true}`;
+     * aliran sesi yang sama lalu dibuka ulang. Jika aliran berakhir tanpa baris itu
+     * (sesi kedaluwarsa atau koneksi putus), sesi baru dibuka.
+     * @param {Object} stream - Sesi streaming yang dibaca.
+     */
+    const consumeResults = async (stream) => {
+        let reconnect = true;
+        const handleLine = (line) => {
+            if (!line.trim()) return; // Baris kosong adalah heartbeat.
+            const result = JSON.parse(line);
+            if (result.reconnect) {
+                reconnect = true;
+                return;
+            }
+            renderPrediction(result);
+        };
+
+        try {
+            while (reconnect && liveStream === stream) {
+                reconnect = false;
+                const response = await fetch(stream.resultsUrl, { signal: stream.controller.signal });
+                if (!response.ok) throw new Error(`Server error: ${response.status}`);
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\n');
+                    buffer = lines.pop();
+                    lines.forEach(handleLine);
+                }
+            }
+        } catch (error) {
+            console.error("Aliran hasil terputus:", error);
+        }
+
+        // Membuka sesi baru hanya jika sesi ini masih yang aktif.
+        if (liveStream === stream) {
+            liveStream = null;
+            if (modelInterval) clearInterval(modelInterval);
+            setTimeout(startPrediction, LEGACY_INTERVAL_MS);
+        }
+    };
+
+    /**
+     * @function fallBackToPolling
+     * @description Menutup sesi streaming dan beralih ke pengiriman frame JSON `/predict_frame`.
+     * @param {Object} stream - Sesi streaming yang gagal.
+     */
+    const fallBackToPolling = (stream) => {
+        if (liveStream !== stream) return;
+        liveStream = null;
+        stream.controller.abort();
+        fetch(`${video.dataset.sessionUrl}/${stream.sessionId}`, { method: 'DELETE' }).catch(() => {});
+        if (modelInterval) clearInterval(modelInterval);
+        modelInterval = setInterval(predictFrame, LEGACY_INTERVAL_MS);
+    };
+
+    /**
+     * @function sendFrame
+     * @description Mengambil frame saat ini sebagai JPEG biner dan mengirimkannya ke sesi streaming.
+     * Frame baru tidak diambil selama frame sebelumnya masih dikirim. Jika server
+     * menolak frame (misalnya sesi tidak dikenal), skrip beralih ke mode JSON.
+     */
+    const sendFrame = () => {
+        const stream = liveStream;
+        if (!stream || stream.inFlight || !isVideoReady()) return;
+
+        stream.inFlight = true;
+        context.drawImage(video, 0, 0, canvas.width, canvas.height);
+        canvas.toBlob(async (blob) => {
+            try {
+                const response = await fetch(stream.framesUrl, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'image/jpeg' },
+                    body: blob
+                });
+                if (!response.ok) {
+                    console.warn(`Frame ditolak (${response.status}), memakai mode JSON.`);
+                    fallBackToPolling(stream);
+                }
+            } catch (error) {
+                console.error("Gagal mengirim frame:", error);
+            } finally {
+                stream.inFlight = false;
+            }
+        }, 'image/jpeg', 0.8);
+    };
+
     /**
      * @function predictFrame
      * @description Mengambil frame saat ini dari video, mengubahnya menjadi data URL,
      * dan mengirimkannya ke server untuk mendapatkan prediksi.
      */
     const predictFrame = async () => {
-        if (!video.srcObject || video.paused || video.ended || video.readyState < 2) return;
+        if (!isVideoReady()) return;
 
         // Menggambar frame video ke canvas dan mengubahnya menjadi format JPEG.
         context.drawImage(video, 0, 0, canvas.width, canvas.height);
@@ -121,21 +275,12 @@ document.addEventListener('DOMContentLoaded', () => {
             const response = await fetch(video.dataset.predictUrl, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ image: dataURL })
+                body: JSON.stringify({ image: dataURL, client_id: clientId })
             });
             if (response.ok) {
-                const result = await response.json();
-                // Memperbarui UI berdasarkan hasil prediksi (normal atau anomali).
-                if (result.is_anomaly) {
-                    predictionText.textContent = `Peringatan: ${result.prediction}`;
-                    predictionOverlay.classList.add('bg-danger', 'bg-opacity-75');
-                    predictionOverlay.classList.remove('bg-dark', 'bg-opacity-50');
-                } else {
-                    predictionText.textContent = `Prediksi: ${result.prediction || 'Menganalisis...'}`;
-                    predictionOverlay.classList.remove('bg-danger', 'bg-opacity-75');
-                    predictionOverlay.classList.add('bg-dark', 'bg-opacity-50');
-                }
-            } else {
+                renderPrediction(await response.json());
+            } else if (response.status !== 503) {
+                // Status 503 berarti server sibuk; prediksi terakhir tetap ditampilkan.
                 predictionText.textContent = 'Prediksi: Error Server';
             }
         } catch (error) {
@@ -148,4 +293,13 @@ document.addEventListener('DOMContentLoaded', () => {
     
     // Menambahkan event listener ke tombol untuk memulai kamera.
     startCameraButton.addEventListener('click', initializeCamera);
+
+    // Menutup sesi streaming saat halaman ditinggalkan.
+    window.addEventListener('pagehide', () => {
+        if (liveStream) {
+            fetch(`${video.dataset.sessionUrl}/${liveStream.sessionId}`, { method: 'DELETE', keepalive: true });
+            liveStream.controller.abort();
+            liveStream = null;
+        }
+    });
 });
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Paket `utils` diimpor relatif terhadap direktori web, seperti pada app.py.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,54 @@
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.decomposition import PCA
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from utils.compiled_model import CompiledClassifier, CompiledDetector
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(n_samples=240, n_features=40, n_informative=12, n_classes=4,
+                               n_clusters_per_class=1, random_state=0)
+    return X[:160], y[:160], X[160:]
+
+
+@pytest.fixture(scope='module')
+def classifier(data):
+    X_train, y_train, _ = data
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)  # probability=True usang di scikit-learn terbaru.
+        svc = SVC(kernel='rbf', C=10.0, gamma='scale', probability=True, class_weight='balanced', random_state=42)
+        return make_pipeline(StandardScaler(), PCA(n_components=0.95, random_state=42), svc).fit(X_train, y_train)
+
+
+def test_classifier_matches_sklearn(classifier, data):
+    _, _, X_test = data
+    compiled = CompiledClassifier.from_pipeline(classifier)
+    np.testing.assert_array_equal(compiled.predict_from_features(X_test), classifier.predict(X_test))
+    np.testing.assert_allclose(compiled.predict_proba_from_features(X_test), classifier.predict_proba(X_test),
+                               rtol=0, atol=1e-10)
+
+
+def test_classifier_roundtrip(classifier, data, tmp_path):
+    _, _, X_test = data
+    compiled = CompiledClassifier.from_pipeline(classifier)
+    compiled.save(tmp_path / 'model.npz')
+    loaded = CompiledClassifier.load(tmp_path / 'model.npz')
+    np.testing.assert_array_equal(loaded.predict_proba_from_features(X_test),
+                                  compiled.predict_proba_from_features(X_test))
+
+
+def test_detector_matches_sklearn(data):
+    X_train, y_train, X_test = data
+    labels = np.where(y_train == 0, -1, 1)
+    pipeline = make_pipeline(StandardScaler(), SVC(kernel='rbf', gamma='scale')).fit(X_train, labels)
+    compiled = CompiledDetector.from_pipeline(pipeline)
+    np.testing.assert_allclose(compiled.decision_function(X_test), pipeline.decision_function(X_test),
+                               rtol=0, atol=1e-10)
+    np.testing.assert_array_equal(compiled.predict(X_test), pipeline.predict(X_test))
@@ -0,0 +1,70 @@
+"""
+Modul gerbang anomali tahap pertama (cascade).
+
+Gerbang dilatih oleh `src.models.cascade` di direktori build dan disimpan
+sebagai dict biasa: pipeline StandardScaler -> SVC pada deskriptor murah
+(histogram warna HSV, histogram Sobel, color moments), ambang skor
+keputusan, dan nama deskriptornya. Gambar dengan skor di bawah ambang
+langsung ditolak sebagai anomali, sehingga HOG, Gabor, LBP, dan GLCM tidak
+perlu dihitung. Gambar lainnya diteruskan ke detektor anomali penuh.
+"""
+
+import numpy as np
+
+from utils.compiled_model import CompiledDetector
+from utils.model_wrapper import CHEAP_DESCRIPTORS
+
+
+# Versi format dict gerbang yang didukung (sama dengan GATE_FORMAT_VERSION di build).
+GATE_FORMAT_VERSION = 1
+
+
+class AnomalyGate:
+    """
+    Gerbang anomali tahap pertama pada deskriptor murah.
+
+    Attributes:
+        detector (CompiledDetector or Pipeline): Model dengan `decision_function`
+                                                 (skor positif berarti normal).
+        threshold (float): Skor di bawah nilai ini ditolak sebagai anomali.
+    """
+
+    def __init__(self, detector, threshold):
+        self.detector = detector
+        self.threshold = float(threshold)
+
+    @classmethod
+    def from_dict(cls, gate):
+        """
+        Membangun gerbang dari dict hasil `src.models.cascade.train_gate`.
+
+        Args:
+            gate (dict): Dict gerbang yang dimuat dengan joblib.
+
+        Returns:
+            AnomalyGate: Gerbang siap pakai; pipeline dikompilasi ke NumPy jika memungkinkan.
+
+        Raises:
+            ValueError: Jika versi format atau daftar deskriptor tidak didukung.
+        """
+        if gate.get('format_version') != GATE_FORMAT_VERSION:
+            raise ValueError(f"Versi format gerbang tidak didukung: {gate.get('format_version')}")
+        if tuple(gate['descriptors']) != CHEAP_DESCRIPTORS:
+            raise ValueError(f"Deskriptor gerbang {gate['descriptors']} tidak sesuai dengan {CHEAP_DESCRIPTORS}")
+        try:
+            detector = CompiledDetector.from_pipeline(gate['pipeline'])
+        except ValueError:
+            detector = gate['pipeline']
+        return cls(detector, gate['threshold'])
+
+    def reject(self, cheap_features):
+        """
+        Menentukan gambar yang ditolak lebih awal.
+
+        Args:
+            cheap_features (np.ndarray): Matriks deskriptor murah (N, D_murah).
+
+        Returns:
+            np.ndarray: Mask boolean; True berarti anomali yang pasti.
+        """
+        return np.asarray(self.detector.decision_function(cheap_features)) < self.threshold
@@ -0,0 +1,166 @@
+"""
+Modul format artefak model yang ringkas dan dapat di-memory-map.
+
+Memuat dua pickle dengan `joblib.load` memaksa setiap proses pekerja mengimpor
+scikit-learn, meng-unpickle seluruh pipeline, dan menyimpan salinan pribadi
+support vector di memorinya sendiri. Artefak di modul ini adalah sebuah
+direktori berisi:
+
+- `manifest.json`: versi format, daftar kelas, parameter skalar setiap model,
+  dan versi model (hash isi seluruh array) untuk kunci cache hasil.
+- Satu berkas `.npy` mentah per array, misalnya `classifier.weight.npy`
+  (StandardScaler dan PCA yang sudah dilipat), `classifier.support_vectors.npy`,
+  `classifier.pair_coef.npy` (koefisien dual), serta array detektor anomali.
+
+Array dimuat dengan `np.load(mmap_mode='r')`, sehingga halaman memorinya
+berasal dari page cache sistem operasi dan dibagi oleh semua pekerja yang
+memuat artefak yang sama (termasuk pekerja hasil fork ala gunicorn), tanpa
+salinan per proses.
+
+Artefak dapat diekspor dengan presisi tereduksi (lihat `PRECISIONS` di
+`utils.compiled_model`): 'float32' menyimpan matriks besar sebagai float32
+yang tetap di-memory-map tanpa salinan, sedangkan 'float16' memperkecil
+berkas menjadi seperempat tetapi dinaikkan ke float32 (disalin) saat dimuat.
+Ekspor presisi tereduksi wajib disertai set fitur validasi dan ditolak jika
+prediksinya tidak cukup sesuai dengan model float64.
+"""
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from utils.compiled_model import CompiledClassifier, CompiledDetector, reduce_precision
+
+
+# Naikkan versi ini jika struktur artefak berubah.
+ARTIFACT_FORMAT_VERSION = 1
+
+MANIFEST_FILENAME = 'manifest.json'
+
+_MODEL_TYPES = {'classifier': CompiledClassifier, 'detector': CompiledDetector}
+
+
+def export_artifact(model, anomaly_detector, classes, output_dir, precision='float64',
+                    validation_features=None, min_agreement=0.995, max_proba_diff=0.02):
+    """
+    Mengompilasi model klasifikasi dan detektor anomali lalu menulisnya sebagai artefak.
+
+    Args:
+        model (IntegratedClassifier): Model klasifikasi cuaca terlatih.
+        anomaly_detector (Pipeline): Detektor anomali StandardScaler -> SVC terlatih.
+        classes (list of str): Daftar nama kelas sesuai urutan label model.
+        output_dir (str): Direktori tujuan artefak.
+        precision (str): 'float64', 'float32', atau 'float16'.
+        validation_features (np.ndarray, optional): Matriks fitur held-out (N, D);
+            wajib untuk presisi selain 'float64'.
+        min_agreement (float): Proporsi minimum label yang sama dengan model float64.
+        max_proba_diff (float): Selisih probabilitas maksimum yang diizinkan.
+
+    Returns:
+        dict: Isi manifest yang ditulis.
+
+    Raises:
+        ValueError: Jika presisi tereduksi diminta tanpa `validation_features`.
+        PrecisionCheckError: Jika model presisi tereduksi gagal validasi; tidak ada
+                             berkas yang ditulis.
+    """
+    compiled = {
+        'classifier': CompiledClassifier.from_classifier(model),
+        'detector': CompiledDetector.from_pipeline(anomaly_detector),
+    }
+    reports = {}
+    if precision != 'float64':
+        if validation_features is None:
+            raise ValueError("Ekspor presisi tereduksi memerlukan validation_features (fitur held-out).")
+        # Seluruh model divalidasi sebelum berkas pertama ditulis.
+        for name in compiled:
+            compiled[name], reports[name] = reduce_precision(compiled[name], precision, validation_features,
+                                                             min_agreement, max_proba_diff)
+    os.makedirs(output_dir, exist_ok=True)
+    digest = hashlib.blake2b(digest_size=8)
+    manifest = {'format_version': ARTIFACT_FORMAT_VERSION, 'classes': list(classes), 'models': {}}
+    for name, compiled_model in compiled.items():
+        arrays = {}
+        for array_name, array in compiled_model.to_arrays(storage=True).items():
+            filename = f"{name}.{array_name}.npy"
+            array = np.ascontiguousarray(array)
+            np.save(os.path.join(output_dir, filename), array, allow_pickle=False)
+            digest.update(array.data)
+            arrays[array_name] = filename
+        manifest['models'][name] = {'gamma': compiled_model.gamma, 'precision': compiled_model.precision,
+                                    'arrays': arrays}
+        if name in reports:
+            manifest['models'][name]['precision_check'] = reports[name]
+    # Parameter skalar (gamma, presisi) dan urutan kelas juga menentukan prediksi,
+    # sehingga ikut masuk ke versi yang menjadi bagian kunci cache hasil.
+    digest.update(json.dumps(manifest['models'], sort_keys=True).encode('utf-8'))
+    digest.update(json.dumps(manifest['classes']).encode('utf-8'))
+    manifest['model_version'] = digest.hexdigest()
+
+    # Manifest ditulis terakhir secara atomik, sehingga artefak yang belum lengkap tidak pernah terbaca.
+    tmp_path = os.path.join(output_dir, MANIFEST_FILENAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_FILENAME))
+    return manifest
+
+
+def load_artifact(artifact_dir, mmap=True):
+    """
+    Memuat artefak model tanpa pickle dan tanpa scikit-learn.
+
+    Args:
+        artifact_dir (str): Direktori artefak hasil `export_artifact`.
+        mmap (bool): Jika True, array di-memory-map (read-only) alih-alih disalin ke memori.
+
+    Returns:
+        tuple: Sebuah tuple berisi:
+            - classifier (CompiledClassifier): Model klasifikasi terkompilasi.
+            - detector (CompiledDetector): Detektor anomali terkompilasi.
+            - manifest (dict): Isi manifest, termasuk `classes` dan `model_version`.
+
+    Raises:
+        ValueError: Jika versi format artefak tidak didukung.
+    """
+    with open(os.path.join(artifact_dir, MANIFEST_FILENAME), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Versi format artefak tidak didukung: {manifest.get('format_version')}")
+
+    mmap_mode = 'r' if mmap else None
+    loaded = {}
+    for name, model_type in _MODEL_TYPES.items():
+        entry = manifest['models'][name]
+        arrays = {array_name: np.load(os.path.join(artifact_dir, filename), mmap_mode=mmap_mode, allow_pickle=False)
+                  for array_name, filename in entry['arrays'].items()}
+        loaded[name] = model_type.from_arrays(arrays, entry['gamma'], entry.get('precision', 'float64'))
+    return loaded['classifier'], loaded['detector'], manifest
+
+
+if __name__ == '__main__':
+    # Penggunaan (dari direktori web/):
+    #   python -m utils.artifact model/svm_model-v1.1.pkl model/anomaly_detector.pkl model/artifact
+    # Presisi tereduksi, divalidasi terhadap fitur held-out (.npy berbentuk (N, D)):
+    #   python -m utils.artifact model/svm_model-v1.1.pkl model/anomaly_detector.pkl model/artifact \
+    #       float32 holdout_features.npy
+    import sys
+    import joblib
+    import __main__
+
+    # Pickle dari notebook dapat merujuk `__main__.IntegratedClassifier`.
+    from utils.model_wrapper import IntegratedClassifier
+    __main__.IntegratedClassifier = IntegratedClassifier
+
+    model = joblib.load(sys.argv[1])
+    anomaly_detector = joblib.load(sys.argv[2])
+    precision = sys.argv[4] if len(sys.argv) > 4 else 'float64'
+    validation_features = np.load(sys.argv[5]) if len(sys.argv) > 5 else None
+    manifest = export_artifact(model, anomaly_detector, ["Berawan", "Hujan", "Cerah", "Berkabut"], sys.argv[3],
+                               precision=precision, validation_features=validation_features)
+    print(f"Artefak v{manifest['format_version']} {precision} (model {manifest['model_version']}) "
+          f"ditulis ke {sys.argv[3]}")
+    for name, entry in manifest['models'].items():
+        if 'precision_check' in entry:
+            print(f"  {name}: {entry['precision_check']}")
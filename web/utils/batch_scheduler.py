@@ -0,0 +1,123 @@
+"""
+Modul penjadwal micro-batching untuk inferensi frame kamera langsung.
+
+Setiap klien kamera mengirim satu frame per detik ke `/predict_frame`. Tanpa
+penjadwal, setiap frame membayar sendiri overhead pemanggilan detektor anomali
+dan SVC. Penjadwal di modul ini mengumpulkan frame yang tiba dalam jendela
+waktu singkat (dibatasi ukuran batch maksimum dan waktu tunggu maksimum),
+menjalankan satu ekstraksi fitur dan satu `predict_proba` untuk seluruh
+kelompok, lalu mengembalikan hasil ke masing-masing permintaan yang menunggu.
+Jika antrean terlalu dalam, frame baru langsung ditolak (load shedding).
+"""
+
+import threading
+import time
+import queue
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class SchedulerOverloadedError(RuntimeError):
+    """Dilempar ketika antrean penuh dan frame ditolak (load shedding)."""
+
+
+class MicroBatchScheduler:
+    """
+    Mengelompokkan permintaan inferensi yang datang bersamaan menjadi satu batch.
+
+    Attributes:
+        engine (InferenceEngine): Mesin inferensi dengan metode `predict_batch`.
+        max_batch_size (int): Jumlah frame maksimum dalam satu batch.
+        max_wait (float): Waktu tunggu maksimum (detik) sejak frame pertama batch tiba.
+        max_queue_depth (int): Kedalaman antrean maksimum sebelum frame baru ditolak.
+    """
+
+    def __init__(self, engine, max_batch_size=16, max_wait_ms=20, max_queue_depth=64, latency_window=1000):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_depth = max_queue_depth
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'shed': 0, 'batches': 0}
+        self._worker = threading.Thread(target=self._run, name='micro-batch-scheduler', daemon=True)
+        self._worker.start()
+
+    def submit(self, image_np, timeout=None):
+        """
+        Memasukkan satu frame ke antrean dan menunggu hasil batch-nya.
+
+        Args:
+            image_np (np.ndarray): Gambar mentah dalam bentuk array NumPy (uint8).
+            timeout (float, optional): Batas waktu menunggu hasil dalam detik.
+
+        Returns:
+            tuple: (is_anomaly, all_confidences) dengan format yang sama seperti
+                   `InferenceEngine.predict`.
+
+        Raises:
+            SchedulerOverloadedError: Jika antrean sudah mencapai `max_queue_depth`.
+        """
+        with self._lock:
+            if self._queue.qsize() >= self.max_queue_depth:
+                self._counters['shed'] += 1
+                raise SchedulerOverloadedError('Antrean inferensi penuh')
+            self._counters['submitted'] += 1
+            future = Future()
+            self._queue.put((image_np, future, time.perf_counter()))
+        return future.result(timeout=timeout)
+
+    def _collect(self):
+        """Mengambil satu batch: menunggu frame pertama, lalu mengumpulkan hingga penuh atau batas waktu."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Loop thread pekerja: kumpulkan batch, jalankan inferensi, bagikan hasil."""
+        while True:
+            batch = self._collect()
+            images = [image for image, _, _ in batch]
+            try:
+                results = self.engine.predict_batch(images)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                with self._lock:
+                    self._counters['failed'] += len(batch)
+                    self._counters['batches'] += 1
+                continue
+
+            finished = time.perf_counter()
+            for (_, future, enqueued), result in zip(batch, results):
+                future.set_result(result)
+            with self._lock:
+                self._latencies.extend(finished - enqueued for _, _, enqueued in batch)
+                self._batch_sizes.append(len(batch))
+                self._counters['completed'] += len(batch)
+                self._counters['batches'] += 1
+
+    def stats(self):
+        """Mengembalikan metrik antrean, ukuran batch, dan latensi (milidetik)."""
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000.0
+            batch_sizes = np.array(self._batch_sizes)
+            stats = dict(self._counters)
+        stats['queue_depth'] = self._queue.qsize()
+        stats['max_queue_depth'] = self.max_queue_depth
+        stats['mean_batch_size'] = round(float(batch_sizes.mean()), 2) if len(batch_sizes) else 0.0
+        for q in (50, 95, 99):
+            stats[f'latency_p{q}_ms'] = round(float(np.percentile(latencies, q)), 2) if len(latencies) else 0.0
+        return stats
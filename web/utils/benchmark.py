@@ -0,0 +1,529 @@
+"""
+Modul benchmark kinerja yang dapat direproduksi untuk ekstraksi fitur dan inferensi.
+
+Setiap kasus diukur dengan jumlah sampel tetap setelah pemanasan (warm-up):
+latensi per panggilan (p50/p95/p99), throughput (gambar per detik), dan
+puncak memori satu panggilan yang diukur terpisah dengan `tracemalloc`
+(alokasi Python dan NumPy; buffer internal OpenCV/BLAS tidak tercatat).
+Kasus yang diukur:
+
+- `preprocess_image_for_feature_extraction` dan setiap fungsi `extract_*`
+  pada satu gambar, serta `extract_features` lengkap.
+- `extract_features_batch`, `predict_proba` (end-to-end dari gambar mentah),
+  `predict_proba_from_features`, dan skor detektor anomali untuk setiap
+  ukuran batch (default 1/8/64/512).
+- `smart_predict` dan `InferenceEngine.predict` satu gambar.
+
+Gambar uji dibentuk secara sintetis dengan seed tetap, atau dibaca dari
+direktori gambar contoh. Jika berkas model tidak diberikan, model klasifikasi
+dan detektor anomali kecil dilatih dari gambar sintetis, sehingga benchmark
+dapat dijalankan di mesin mana pun tanpa GPU maupun berkas model.
+
+Hasil disimpan sebagai JSON beserta lingkungan (versi pustaka, jumlah CPU,
+pengaturan thread) dan konfigurasi fitur/model. Dua hasil dapat dibandingkan
+dengan `compare_runs`; perubahan yang lebih buruk dari ambang relatif
+dilaporkan sebagai regresi.
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+from utils.model_wrapper import (
+    IMAGE_SIZE, HOG_ORIENTATIONS, HOG_PIXELS_PER_CELL, HOG_CELLS_PER_BLOCK, GLCM_LEVELS, GLCM_DISTANCES,
+    IntegratedClassifier, preprocess_image_for_feature_extraction, preprocess_batch, extract_features,
+    extract_features_batch, extract_hog_features, extract_color_histogram, extract_lbp_features,
+    extract_color_moments, extract_glcm_features, extract_gabor_features, extract_sobel_features
+)
+from utils.prediction_logic import smart_predict
+from utils.inference_engine import InferenceEngine
+
+
+# Naikkan versi ini jika struktur berkas hasil berubah.
+BENCHMARK_FORMAT_VERSION = 1
+
+CLASSES = ["Berawan", "Hujan", "Cerah", "Berkabut"]
+BATCH_SIZES = (1, 8, 64, 512)
+SYNTHETIC_SHAPE = (480, 640)
+
+# Metrik yang diperiksa oleh `compare_runs` beserta arahnya (True = makin besar makin buruk).
+REGRESSION_METRICS = {
+    'p50_ms': True,
+    'p95_ms': True,
+    'throughput_per_s': False,
+    'peak_memory_mb': True,
+}
+
+# Variabel lingkungan yang memengaruhi jumlah thread BLAS/OpenMP.
+_THREAD_ENV = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+# Palet BGR langit (atas, bawah) per kelas untuk gambar sintetis.
+_SKY_PALETTES = {
+    0: ((170, 165, 160), (120, 115, 110)),  # Berawan
+    1: ((110, 100, 90), (70, 65, 60)),      # Hujan
+    2: ((235, 170, 90), (250, 220, 170)),   # Cerah
+    3: ((215, 215, 210), (190, 190, 185)),  # Berkabut
+}
+
+
+def synthetic_images(n_images, shape=SYNTHETIC_SHAPE, seed=0):
+    """
+    Membentuk gambar langit sintetis yang deterministik.
+
+    Setiap kelas memiliki gradien warna, tekstur awan frekuensi rendah, dan
+    ciri khas (garis hujan atau blur kabut) sendiri, sehingga model sintetis
+    mempelajari batas kelas yang tidak trivial.
+
+    Args:
+        n_images (int): Jumlah gambar.
+        shape (tuple): (tinggi, lebar) gambar.
+        seed (int): Seed generator acak.
+
+    Returns:
+        tuple: (list gambar BGR uint8, array label kelas 0..3 bergiliran).
+    """
+    rng = np.random.default_rng(seed)
+    height, width = shape
+    ramp = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None, None]
+    images, labels = [], np.arange(n_images) % len(_SKY_PALETTES)
+    for label in labels:
+        top, bottom = (np.array(c, dtype=np.float32) for c in _SKY_PALETTES[int(label)])
+        image = np.broadcast_to(top + (bottom - top) * ramp, (height, width, 3)).copy()
+        clouds = cv2.resize(rng.random((height // 32, width // 32), dtype=np.float32), (width, height),
+                            interpolation=cv2.INTER_CUBIC)
+        image += (clouds[..., None] - 0.5) * rng.uniform(30, 90)
+        image += rng.normal(0.0, 6.0, image.shape).astype(np.float32)
+        if label == 1:
+            for _ in range(200):
+                x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+                cv2.line(image, (x, y), (x + 6, y + 25), (200, 200, 200), 1)
+        elif label == 3:
+            image = cv2.GaussianBlur(image, (0, 0), 6)
+        images.append(np.clip(image, 0, 255).astype(np.uint8))
+    return images, labels
+
+
+def load_sample_images(image_dir, limit=64):
+    """
+    Membaca gambar contoh dari sebuah direktori (urutan nama berkas, deterministik).
+
+    Args:
+        image_dir (str): Direktori berisi berkas gambar.
+        limit (int): Jumlah gambar maksimum.
+
+    Returns:
+        list: Gambar BGR uint8 yang berhasil dibaca.
+
+    Raises:
+        ValueError: Jika tidak ada gambar yang dapat dibaca.
+    """
+    images = []
+    for root, _, filenames in sorted(os.walk(image_dir)):
+        for filename in sorted(filenames):
+            image = cv2.imread(os.path.join(root, filename))
+            if image is not None:
+                images.append(image)
+            if len(images) >= limit:
+                return images
+    if not images:
+        raise ValueError(f"Tidak ada gambar yang dapat dibaca di {image_dir}")
+    return images
+
+
+def train_synthetic_models(n_images=160, seed=0):
+    """
+    Melatih model klasifikasi dan detektor anomali kecil dari gambar sintetis.
+
+    Args:
+        n_images (int): Jumlah gambar latih per model.
+        seed (int): Seed gambar latih (berbeda dari seed gambar uji).
+
+    Returns:
+        tuple: (IntegratedClassifier, Pipeline detektor anomali StandardScaler -> SVC).
+    """
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+
+    images, labels = synthetic_images(n_images, seed=seed)
+    model = IntegratedClassifier(C=10.0).fit(images, labels)
+
+    # Anomali sintetis: derau acak, berlabel -1 seperti detektor aslinya.
+    rng = np.random.default_rng(seed + 1)
+    anomalies = [rng.integers(0, 256, SYNTHETIC_SHAPE + (3,), dtype=np.uint8) for _ in range(n_images // 2)]
+    features = extract_features_batch(preprocess_batch(images[:n_images // 2] + anomalies))
+    detector_labels = np.r_[np.ones(n_images // 2), -np.ones(len(anomalies))].astype(int)
+    detector = make_pipeline(StandardScaler(), SVC(kernel='rbf', gamma='scale')).fit(features, detector_labels)
+    return model, detector
+
+
+def _summarize(samples_s, batch_size, peak_bytes):
+    """Ringkasan statistik latensi (milidetik), throughput, dan puncak memori."""
+    samples_ms = np.asarray(samples_s) * 1000.0
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {
+        'batch_size': batch_size,
+        'samples': len(samples_ms),
+        'mean_ms': float(samples_ms.mean()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'throughput_per_s': float(batch_size * len(samples_ms) / (samples_ms.sum() / 1000.0)),
+        'peak_memory_mb': peak_bytes / 2 ** 20,
+    }
+
+
+def measure(fn, make_args, n_samples, batch_size=1, warmup=2):
+    """
+    Mengukur satu kasus benchmark.
+
+    Args:
+        fn (callable): Fungsi yang diukur.
+        make_args (callable): Menerima indeks sampel dan mengembalikan tuple argumen
+                              `fn`; dibentuk di luar waktu yang diukur.
+        n_samples (int): Jumlah panggilan yang diukur.
+        batch_size (int): Jumlah gambar per panggilan (untuk throughput).
+        warmup (int): Jumlah panggilan pemanasan yang tidak diukur.
+
+    Returns:
+        dict: Ringkasan `_summarize`.
+    """
+    for i in range(warmup):
+        fn(*make_args(i))
+
+    # Puncak memori diukur pada panggilan terpisah karena tracemalloc memperlambat alokasi.
+    args = make_args(0)
+    gc.collect()
+    tracemalloc.start()
+    fn(*args)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(n_samples):
+            args = make_args(i)
+            start = time.perf_counter()
+            fn(*args)
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return _summarize(samples, batch_size, peak_bytes)
+
+
+def _n_samples(repeats, batch_size, min_samples):
+    """Jumlah sampel per kasus: total gambar kira-kira `repeats`, minimal `min_samples` panggilan."""
+    return max(min_samples, repeats // batch_size)
+
+
+def _environment():
+    """Informasi lingkungan yang memengaruhi hasil benchmark."""
+    import scipy
+    import sklearn
+    import skimage
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'sklearn': sklearn.__version__,
+        'skimage': skimage.__version__,
+        'opencv': cv2.__version__,
+        'opencv_threads': cv2.getNumThreads(),
+        'thread_env': {name: os.environ.get(name) for name in _THREAD_ENV},
+    }
+
+
+def _pipeline_config(pipeline):
+    """Parameter pipeline klasifikasi (SVC eksak atau kepala kernel aproksimasi) yang tersedia."""
+    config = {}
+    for _, step in pipeline.steps[:-1]:
+        if hasattr(step, 'n_components_'):
+            config['n_components'] = int(step.n_components_)
+    head = pipeline.steps[-1][1]
+    if hasattr(head, 'support_vectors_'):
+        config.update({'backend': 'svc', 'C': head.C, 'gamma': float(head._gamma),
+                       'n_support_vectors': int(head.support_vectors_.shape[0])})
+    elif hasattr(head, 'steps'):
+        feature_map, classifier = head.steps[0][1], head.steps[-1][1]
+        config['backend'] = type(feature_map).__name__
+        gamma = getattr(feature_map, 'gamma', None)
+        if gamma is not None:
+            config['gamma'] = gamma if isinstance(gamma, str) else float(gamma)
+        if hasattr(feature_map, 'n_components'):
+            config['kernel_components'] = int(feature_map.n_components)
+        if hasattr(classifier, 'C'):
+            config['C'] = classifier.C
+    else:
+        config['backend'] = type(head).__name__
+    return config
+
+
+def _model_config(model, anomaly_detector, n_features):
+    """Konfigurasi fitur dan parameter model yang tercatat di hasil benchmark."""
+    config = {
+        'image_size': list(IMAGE_SIZE),
+        'hog': [HOG_ORIENTATIONS, list(HOG_PIXELS_PER_CELL), list(HOG_CELLS_PER_BLOCK)],
+        'glcm': [list(GLCM_DISTANCES), GLCM_LEVELS],
+        'n_features': int(n_features),
+        'classifier': type(model).__name__,
+        'anomaly_detector': type(anomaly_detector).__name__,
+    }
+    pipeline = getattr(model, 'pipeline', None)
+    if pipeline is not None:
+        config.update(_pipeline_config(pipeline))
+    elif hasattr(model, 'support_vectors'):
+        config.update({'gamma': model.gamma, 'n_components': int(model.weight.shape[1]),
+                       'n_support_vectors': int(model.support_vectors.shape[0]),
+                       'precision': getattr(model, 'precision', 'float64')})
+    return config
+
+
+def run_benchmarks(model, anomaly_detector, images, batch_sizes=BATCH_SIZES, repeats=64, min_samples=5,
+                   verbose=True):
+    """
+    Menjalankan seluruh kasus benchmark.
+
+    Args:
+        model (IntegratedClassifier or CompiledClassifier): Model klasifikasi terlatih.
+        anomaly_detector (Pipeline or CompiledDetector): Detektor anomali terlatih.
+        images (list of np.ndarray): Gambar BGR uint8 uji (dipakai bergiliran).
+        batch_sizes (tuple of int): Ukuran batch untuk kasus batch.
+        repeats (int): Perkiraan jumlah gambar yang diukur per kasus.
+        min_samples (int): Jumlah panggilan minimum per kasus.
+        verbose (bool): Mencetak hasil setiap kasus.
+
+    Returns:
+        dict: Hasil benchmark siap disimpan sebagai JSON.
+    """
+    n_images = len(images)
+    prepared = [preprocess_image_for_feature_extraction(image) for image in images]
+    max_batch = max(batch_sizes)
+    # Matriks fitur untuk kasus yang dimulai dari fitur (baris dipakai bergiliran hingga batch terbesar).
+    base_features = extract_features_batch(preprocess_batch(images))
+    features = base_features[np.arange(max_batch + n_images) % n_images]
+    engine = InferenceEngine(model, anomaly_detector, CLASSES)
+    confidences = [engine.rank_confidences(p) for p in model.predict_proba_from_features(base_features)]
+
+    def per_image(fn, use):
+        def make_args(i):
+            gray, color = prepared[i % n_images]
+            return {'gray': (gray,), 'color': (color,), 'both': (gray, color)}[use]
+        return fn, make_args
+
+    cases = {
+        'preprocess_image_for_feature_extraction': (preprocess_image_for_feature_extraction,
+                                                    lambda i: (images[i % n_images],)),
+        'extract_hog_features': per_image(extract_hog_features, 'gray'),
+        'extract_color_histogram': per_image(extract_color_histogram, 'color'),
+        'extract_lbp_features': per_image(extract_lbp_features, 'gray'),
+        'extract_color_moments': per_image(extract_color_moments, 'color'),
+        'extract_glcm_features': per_image(extract_glcm_features, 'gray'),
+        'extract_gabor_features': per_image(extract_gabor_features, 'gray'),
+        'extract_sobel_features': per_image(extract_sobel_features, 'gray'),
+        'extract_features': per_image(extract_features, 'both'),
+        'smart_predict': (smart_predict, lambda i: (confidences[i % n_images],)),
+        'engine_predict': (engine.predict, lambda i: (images[i % n_images],)),
+    }
+    results = {}
+    for name, (fn, make_args) in cases.items():
+        results[name] = measure(fn, make_args, _n_samples(repeats, 1, min_samples))
+        if verbose:
+            _print_case(name, results[name])
+
+    if hasattr(model, 'predict_proba'):
+        predict_proba = model.predict_proba
+    else:
+        # Model terkompilasi tidak memiliki jalur gambar mentah; setara dengan `IntegratedClassifier.predict_proba`.
+        def predict_proba(X_raw):
+            return model.predict_proba_from_features(extract_features_batch(preprocess_batch(X_raw)))
+
+    for batch_size in batch_sizes:
+        def raw_batch(i, batch_size=batch_size):
+            return ([images[(i * batch_size + j) % n_images] for j in range(batch_size)],)
+
+        def feature_batch(i, batch_size=batch_size):
+            start = (i * batch_size) % n_images
+            return (features[start:start + batch_size],)
+
+        resized = preprocess_batch(raw_batch(0)[0])
+        batch_cases = {
+            'extract_features_batch': (extract_features_batch, lambda i, resized=resized: (resized,)),
+            'predict_proba': (predict_proba, raw_batch),
+            'predict_proba_from_features': (model.predict_proba_from_features, feature_batch),
+            'anomaly_decision_function': (anomaly_detector.decision_function, feature_batch),
+        }
+        n_samples = _n_samples(repeats, batch_size, min_samples)
+        for name, (fn, make_args) in batch_cases.items():
+            key = f"{name}[b={batch_size}]"
+            results[key] = measure(fn, make_args, n_samples, batch_size=batch_size, warmup=1)
+            if verbose:
+                _print_case(key, results[key])
+
+    return {
+        'format_version': BENCHMARK_FORMAT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': _environment(),
+        'config': dict(_model_config(model, anomaly_detector, base_features.shape[1]),
+                       n_images=n_images, image_shapes=[list(shape) for shape in sorted({image.shape[:2] for image in images})],
+                       batch_sizes=list(batch_sizes), repeats=repeats, min_samples=min_samples),
+        'results': results,
+    }
+
+
+def _print_case(name, result):
+    print(f"{name:<46} p50 {result['p50_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms  "
+          f"p99 {result['p99_ms']:9.3f} ms  {result['throughput_per_s']:9.1f} img/s  "
+          f"{result['peak_memory_mb']:8.2f} MB")
+
+
+def save_results(results, path):
+    """Menyimpan hasil benchmark sebagai JSON."""
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    """
+    Memuat hasil benchmark dari berkas JSON.
+
+    Raises:
+        ValueError: Jika versi format hasil tidak didukung.
+    """
+    with open(path, 'r') as f:
+        results = json.load(f)
+    if results.get('format_version') != BENCHMARK_FORMAT_VERSION:
+        raise ValueError(f"Versi format hasil benchmark tidak didukung: {results.get('format_version')}")
+    return results
+
+
+def compare_runs(baseline, candidate, threshold=0.10, metrics=REGRESSION_METRICS):
+    """
+    Membandingkan dua hasil benchmark.
+
+    Args:
+        baseline (dict): Hasil acuan (`run_benchmarks` atau `load_results`).
+        candidate (dict): Hasil yang diperiksa.
+        threshold (float): Perubahan relatif terburuk yang masih diterima (0.10 = 10%).
+        metrics (dict): Metrik -> True jika nilai lebih besar berarti lebih buruk.
+
+    Returns:
+        dict: Sebuah dict berisi:
+            - rows (list of dict): Per kasus dan metrik: nilai acuan, nilai baru,
+              perubahan relatif (positif = lebih buruk), dan status regresi.
+            - regressions (list of dict): Baris yang melewati ambang.
+            - missing (list of str): Kasus acuan yang tidak ada di hasil baru.
+            - environment_changes (dict): Kunci lingkungan yang berbeda (acuan, baru).
+            - config_changes (dict): Kunci konfigurasi yang berbeda (acuan, baru).
+    """
+    rows = []
+    for case, base in baseline['results'].items():
+        new = candidate['results'].get(case)
+        if new is None:
+            continue
+        for metric, higher_is_worse in metrics.items():
+            old_value, new_value = base[metric], new[metric]
+            if old_value <= 0:
+                continue
+            change = (new_value - old_value) / old_value
+            if not higher_is_worse:
+                change = -change
+            rows.append({'case': case, 'metric': metric, 'baseline': old_value, 'candidate': new_value,
+                         'change': change, 'regression': change > threshold})
+
+    def changed(section):
+        old, new = baseline.get(section, {}), candidate.get(section, {})
+        return {key: (old.get(key), new.get(key)) for key in sorted(set(old) | set(new))
+                if old.get(key) != new.get(key)}
+
+    return {
+        'threshold': threshold,
+        'rows': rows,
+        'regressions': [row for row in rows if row['regression']],
+        'missing': [case for case in baseline['results'] if case not in candidate['results']],
+        'environment_changes': changed('environment'),
+        'config_changes': changed('config'),
+    }
+
+
+def print_comparison(comparison):
+    """Mencetak ringkasan `compare_runs` yang mudah dibaca."""
+    for key, (old, new) in comparison['environment_changes'].items():
+        print(f"! lingkungan berbeda: {key}: {old} -> {new}")
+    for key, (old, new) in comparison['config_changes'].items():
+        print(f"! konfigurasi berbeda: {key}: {old} -> {new}")
+    for row in comparison['rows']:
+        flag = 'REGRESI' if row['regression'] else ''
+        print(f"{row['case']:<46} {row['metric']:<17} {row['baseline']:11.3f} -> {row['candidate']:11.3f} "
+              f"({row['change']:+7.1%}) {flag}")
+    for case in comparison['missing']:
+        print(f"! kasus tidak ada di hasil baru: {case}")
+    print(f"{len(comparison['regressions'])} regresi melewati ambang {comparison['threshold']:.0%}.")
+
+
+def _load_models(args):
+    """Memuat model dari artefak atau pickle; melatih model sintetis jika tidak diberikan."""
+    if args.artifact:
+        from utils.artifact import load_artifact
+        model, anomaly_detector, _ = load_artifact(args.artifact)
+        return model, anomaly_detector
+    if args.model and args.anomaly:
+        import joblib
+        import __main__
+        # Pickle dari notebook dapat merujuk `__main__.IntegratedClassifier`.
+        __main__.IntegratedClassifier = IntegratedClassifier
+        return joblib.load(args.model), joblib.load(args.anomaly)
+    print("* Model tidak diberikan, melatih model sintetis...")
+    return train_synthetic_models(seed=args.seed + 1)
+
+
+if __name__ == '__main__':
+    # Penggunaan (dari direktori web/):
+    #   python -m utils.benchmark run hasil.json [--images DIR] [--model M.pkl --anomaly A.pkl | --artifact DIR]
+    #   python -m utils.benchmark compare acuan.json hasil.json [--threshold 0.10]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark ekstraksi fitur dan inferensi.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="Menjalankan benchmark dan menyimpan hasil JSON.")
+    run_parser.add_argument('output')
+    run_parser.add_argument('--images', help="Direktori gambar contoh (default: gambar sintetis).")
+    run_parser.add_argument('--n-images', type=int, default=64)
+    run_parser.add_argument('--model')
+    run_parser.add_argument('--anomaly')
+    run_parser.add_argument('--artifact')
+    run_parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(BATCH_SIZES))
+    run_parser.add_argument('--repeats', type=int, default=64)
+    run_parser.add_argument('--seed', type=int, default=0)
+    compare_parser = commands.add_parser('compare', help="Membandingkan dua hasil benchmark.")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        if args.images:
+            images = load_sample_images(args.images, args.n_images)
+        else:
+            images, _ = synthetic_images(args.n_images, seed=args.seed)
+        model, anomaly_detector = _load_models(args)
+        results = run_benchmarks(model, anomaly_detector, images, tuple(args.batch_sizes), args.repeats)
+        save_results(results, args.output)
+        print(f"Hasil benchmark ditulis ke {args.output}")
+    else:
+        comparison = compare_runs(load_results(args.baseline), load_results(args.candidate), args.threshold)
+        print_comparison(comparison)
+        sys.exit(1 if comparison['regressions'] else 0)
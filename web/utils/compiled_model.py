@@ -0,0 +1,507 @@
+"""
+Modul inferensi terkompilasi untuk pipeline StandardScaler -> PCA -> SVC (RBF).
+
+`SVC(probability=True).predict_proba` menjalankan keputusan one-vs-one libsvm
+dan pairwise coupling untuk setiap panggilan, ditambah overhead validasi
+scikit-learn di setiap tahap pipeline. `CompiledClassifier` mengekstrak
+seluruh parameter terlatih satu kali lalu menghitung ulang jalur yang sama
+dengan NumPy:
+
+1. StandardScaler dan PCA dilipat menjadi satu proyeksi afin `x @ W + b`.
+2. Kernel RBF terhadap matriks support vector dihitung dengan satu perkalian
+   matriks (BLAS), dan seluruh nilai keputusan one-vs-one dengan satu
+   perkalian matriks lagi.
+3. Probabilitas dihitung dengan sigmoid Platt libsvm dan pairwise coupling
+   (Wu, Lin & Weng) yang divektorisasi terhadap seluruh sampel.
+
+Model terkompilasi dapat diekspor ke berkas `.npz` (tanpa pickle) dan dimuat
+kembali tanpa scikit-learn. `parity_report` membandingkan hasilnya dengan
+pipeline asli. `CompiledDetector` melakukan hal yang sama untuk detektor
+anomali biner StandardScaler -> SVC (RBF).
+
+Kedua model mendukung presisi tereduksi (`PRECISIONS`): 'float32' menghitung
+proyeksi dan kernel dalam float32 (throughput BLAS sekitar dua kali lipat,
+memori setengahnya), sedangkan 'float16' juga menyimpan matriks besar
+(proyeksi dan support vector) sebagai float16 di berkas ekspor lalu
+menaikkannya ke float32 saat dimuat. Platt scaling dan pairwise coupling
+selalu float64. `precision_report` membandingkan model presisi tereduksi
+dengan model float64 sebelum diekspor.
+"""
+
+import json
+import time
+
+import numpy as np
+
+
+# Naikkan versi ini jika format berkas ekspor berubah.
+COMPILED_FORMAT_VERSION = 1
+
+# Batas probabilitas pasangan yang sama dengan libsvm (min_prob).
+_MIN_PROB = 1e-7
+
+# Presisi -> (dtype komputasi, dtype penyimpanan matriks besar).
+PRECISIONS = {
+    'float64': (np.float64, np.float64),
+    'float32': (np.float32, np.float32),
+    'float16': (np.float32, np.float16),
+}
+
+
+def _precision_dtypes(precision):
+    """Mengembalikan (dtype komputasi, dtype penyimpanan) untuk nama presisi."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Presisi tidak dikenal: {precision}. Pilihan: {tuple(PRECISIONS)}")
+    return PRECISIONS[precision]
+
+
+def _rbf_kernel(X, support_vectors, sv_sq_norms, gamma):
+    """Kernel RBF terhadap seluruh support vector dengan satu perkalian matriks (dtype mengikuti `X`)."""
+    sq_dist = X @ support_vectors.T
+    sq_dist *= -2.0
+    sq_dist += np.einsum('ij,ij->i', X, X)[:, None]
+    sq_dist += sv_sq_norms[None, :]
+    np.maximum(sq_dist, 0.0, out=sq_dist)
+    sq_dist *= -gamma
+    return np.exp(sq_dist, out=sq_dist)
+
+
+def _platt_probability(decision, prob_a, prob_b):
+    """Sigmoid Platt libsvm yang stabil secara numerik, dipotong ke [1e-7, 1 - 1e-7]."""
+    f_ab = decision * prob_a + prob_b
+    positive = f_ab >= 0
+    exp_term = np.exp(-np.abs(f_ab))
+    prob = np.where(positive, exp_term / (1.0 + exp_term), 1.0 / (1.0 + exp_term))
+    return np.clip(prob, _MIN_PROB, 1.0 - _MIN_PROB)
+
+
+def _pairwise_coupling(r):
+    """
+    Pairwise coupling libsvm (`multiclass_probability`) untuk banyak sampel sekaligus.
+
+    Args:
+        r (np.ndarray): Probabilitas pasangan berbentuk (N, k, k) dengan
+                        r[:, i, j] = P(kelas i | kelas i atau j).
+
+    Returns:
+        np.ndarray: Probabilitas kelas berbentuk (N, k).
+    """
+    n_samples, k, _ = r.shape
+    off_diag = ~np.eye(k, dtype=bool)
+    rt = np.swapaxes(r, 1, 2)
+    Q = -rt * r
+    Q[:, np.arange(k), np.arange(k)] = np.sum(np.where(off_diag, rt ** 2, 0.0), axis=2)
+
+    p = np.full((n_samples, k), 1.0 / k)
+    active = np.ones(n_samples, dtype=bool)
+    eps = 0.005 / k
+    for _ in range(max(100, k)):
+        Qp = np.einsum('nij,nj->ni', Q, p)
+        pQp = np.sum(p * Qp, axis=1)
+        active &= np.max(np.abs(Qp - pQp[:, None]), axis=1) >= eps
+        if not active.any():
+            break
+        for t in range(k):
+            # Sampel yang sudah konvergen tidak diubah (diff = 0), sama seperti libsvm per sampel.
+            diff = np.where(active, (-Qp[:, t] + pQp) / Q[:, t, t], 0.0)
+            p[:, t] += diff
+            scale = 1.0 + diff
+            pQp = (pQp + diff * (diff * Q[:, t, t] + 2 * Qp[:, t])) / scale ** 2
+            Qp = (Qp + diff[:, None] * Q[:, t, :]) / scale[:, None]
+            p /= scale[:, None]
+    return p
+
+
+class CompiledClassifier:
+    """
+    Versi NumPy murni dari pipeline StandardScaler -> PCA -> SVC (RBF, probability=True).
+
+    Objek ini menyediakan `predict_from_features` dan `predict_proba_from_features`
+    seperti `IntegratedClassifier`, sehingga dapat langsung dipakai oleh
+    `InferenceEngine` sebagai pengganti model.
+
+    Attributes:
+        classes_ (np.ndarray): Label kelas sesuai urutan kolom probabilitas.
+        weight (np.ndarray): Matriks proyeksi afin gabungan (D, n_components).
+        bias (np.ndarray): Vektor bias proyeksi (n_components,).
+        support_vectors (np.ndarray): Support vector di ruang PCA (n_SV, n_components).
+        pair_coef (np.ndarray): Koefisien keputusan one-vs-one (n_SV, n_pairs).
+        intercept (np.ndarray): Intersep keputusan per pasangan (n_pairs,).
+        prob_a (np.ndarray): Parameter A sigmoid Platt per pasangan.
+        prob_b (np.ndarray): Parameter B sigmoid Platt per pasangan.
+        gamma (float): Parameter gamma kernel RBF.
+        precision (str): Salah satu kunci `PRECISIONS`.
+    """
+
+    ARRAY_NAMES = ('classes_', 'weight', 'bias', 'support_vectors', 'pair_coef', 'intercept', 'prob_a', 'prob_b')
+    # Matriks besar yang disimpan dengan dtype penyimpanan presisi; sisanya selalu float64.
+    STORAGE_ARRAYS = ('weight', 'support_vectors')
+
+    def __init__(self, classes_, weight, bias, support_vectors, pair_coef, intercept, prob_a, prob_b, gamma,
+                 precision='float64'):
+        dtype, _ = _precision_dtypes(precision)
+        self.precision = precision
+        self.classes_ = np.asarray(classes_)
+        # Array yang sudah ber-dtype komputasi (misalnya hasil memory-map) tidak disalin.
+        self.weight = np.ascontiguousarray(weight, dtype=dtype)
+        self.bias = np.asarray(bias, dtype=dtype)
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=dtype)
+        self.pair_coef = np.ascontiguousarray(pair_coef, dtype=dtype)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.prob_a = np.asarray(prob_a, dtype=np.float64)
+        self.prob_b = np.asarray(prob_b, dtype=np.float64)
+        self.gamma = float(gamma)
+        self._sv_sq_norms = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+        k = len(self.classes_)
+        self._pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """
+        Mengompilasi pipeline scikit-learn StandardScaler -> PCA -> SVC yang sudah dilatih.
+
+        Args:
+            pipeline (Pipeline): Pipeline terlatih dengan tiga tahap tersebut.
+
+        Returns:
+            CompiledClassifier: Model terkompilasi.
+
+        Raises:
+            ValueError: Jika pipeline tidak sesuai (kernel bukan RBF, PCA memakai
+                        whitening, atau SVC tidak dilatih dengan probability=True).
+        """
+        scaler, pca, svc = [step for _, step in pipeline.steps]
+        if getattr(svc, 'kernel', None) != 'rbf' or pca.whiten or not getattr(svc, 'probability', False):
+            raise ValueError("Hanya pipeline StandardScaler -> PCA (tanpa whiten) -> SVC RBF "
+                             "dengan probability=True yang dapat dikompilasi.")
+
+        # ((x - mean) / scale - pca_mean) @ C.T  ==  x @ (C / scale).T - (mean / scale + pca_mean) @ C.T
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(pca.components_.shape[1])
+        scale = scaler.scale_ if scaler.with_std else np.ones(pca.components_.shape[1])
+        weight = (pca.components_ / scale).T
+        bias = -(mean / scale + pca.mean_) @ pca.components_.T
+
+        # Koefisien libsvm internal (tanpa pembalikan tanda khusus kasus biner milik scikit-learn).
+        dual_coef = svc._dual_coef_
+        n_support = svc._n_support
+        starts = np.concatenate([[0], np.cumsum(n_support)])
+        k = len(svc.classes_)
+        pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+        pair_coef = np.zeros((dual_coef.shape[1], len(pairs)))
+        for p, (i, j) in enumerate(pairs):
+            sv_i = slice(starts[i], starts[i + 1])
+            sv_j = slice(starts[j], starts[j + 1])
+            pair_coef[sv_i, p] = dual_coef[j - 1, sv_i]
+            pair_coef[sv_j, p] = dual_coef[i, sv_j]
+
+        return cls(svc.classes_, weight, bias, svc.support_vectors_, pair_coef,
+                   svc._intercept_, svc._probA, svc._probB, svc._gamma)
+
+    @classmethod
+    def from_classifier(cls, model):
+        """Mengompilasi `IntegratedClassifier` yang sudah dilatih."""
+        return cls.from_pipeline(model.pipeline)
+
+    def with_precision(self, precision):
+        """
+        Membuat salinan model dengan presisi lain.
+
+        Matriks penyimpanan dibulatkan ke dtype penyimpanan presisi tujuan terlebih
+        dahulu, sehingga model yang dihasilkan sama persis dengan model yang dimuat
+        kembali dari berkas ekspornya.
+
+        Args:
+            precision (str): Salah satu kunci `PRECISIONS`.
+
+        Returns:
+            CompiledClassifier: Model baru dengan presisi `precision`.
+        """
+        return _with_precision(self, precision)
+
+    def decision_function(self, X_features):
+        """
+        Menghitung nilai keputusan one-vs-one libsvm.
+
+        Args:
+            X_features (np.ndarray): Matriks fitur (N, D).
+
+        Returns:
+            np.ndarray: Nilai keputusan berbentuk (N, n_pairs) dengan urutan
+                        pasangan (0,1), (0,2), ..., (k-2,k-1).
+        """
+        projected = np.asarray(X_features, dtype=self.weight.dtype) @ self.weight + self.bias
+        kernel = _rbf_kernel(projected, self.support_vectors, self._sv_sq_norms, self.gamma)
+        return (kernel @ self.pair_coef).astype(np.float64) + self.intercept
+
+    def predict_from_features(self, X_features):
+        """Memprediksi kelas dengan voting one-vs-one, sama seperti `SVC.predict`."""
+        decision = self.decision_function(X_features)
+        votes = np.zeros((decision.shape[0], len(self.classes_)), dtype=int)
+        for p, (i, j) in enumerate(self._pairs):
+            win_i = decision[:, p] > 0
+            votes[:, i] += win_i
+            votes[:, j] += ~win_i
+        return self.classes_[np.argmax(votes, axis=1)]
+
+    def predict_proba_from_features(self, X_features):
+        """Memprediksi probabilitas kelas dengan Platt scaling dan pairwise coupling libsvm."""
+        decision = self.decision_function(X_features)
+        pair_prob = _platt_probability(decision, self.prob_a, self.prob_b)
+        k = len(self.classes_)
+        r = np.zeros((decision.shape[0], k, k))
+        for p, (i, j) in enumerate(self._pairs):
+            r[:, i, j] = pair_prob[:, p]
+            r[:, j, i] = 1.0 - pair_prob[:, p]
+        return _pairwise_coupling(r)
+
+    def save(self, path):
+        """
+        Mengekspor model terkompilasi ke berkas `.npz` tanpa pickle.
+
+        Args:
+            path (str): Path berkas tujuan.
+        """
+        meta = {'version': COMPILED_FORMAT_VERSION, 'gamma': self.gamma, 'precision': self.precision}
+        np.savez(path, meta=np.array(json.dumps(meta)), **self.to_arrays(storage=True))
+
+    def to_arrays(self, storage=False):
+        """Mengembalikan seluruh parameter array model sebagai dict nama -> array (dtype penyimpanan jika `storage`)."""
+        return _arrays(self, storage)
+
+    @classmethod
+    def from_arrays(cls, arrays, gamma, precision='float64'):
+        """Membangun model dari dict array (misalnya array memory-map), gamma, dan presisi."""
+        return cls(*(arrays[name] for name in cls.ARRAY_NAMES), gamma, precision=precision)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memuat model terkompilasi dari berkas hasil `save`.
+
+        Args:
+            path (str): Path berkas `.npz`.
+
+        Returns:
+            CompiledClassifier: Model terkompilasi.
+
+        Raises:
+            ValueError: Jika versi format berkas tidak dikenali.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != COMPILED_FORMAT_VERSION:
+                raise ValueError(f"Versi format model terkompilasi tidak didukung: {meta['version']}")
+            return cls.from_arrays(data, meta['gamma'], meta.get('precision', 'float64'))
+
+
+class CompiledDetector:
+    """
+    Versi NumPy murni dari detektor anomali biner StandardScaler -> SVC (RBF).
+
+    Menyediakan `predict` dan `decision_function` seperti pipeline aslinya
+    (label kelas positif jika nilai keputusan > 0).
+
+    Attributes:
+        classes_ (np.ndarray): Dua label kelas (misalnya [-1, 1]).
+        mean (np.ndarray): Rata-rata StandardScaler.
+        scale (np.ndarray): Skala StandardScaler.
+        support_vectors (np.ndarray): Support vector di ruang ter-skala (n_SV, D).
+        dual_coef (np.ndarray): Koefisien dual (n_SV,).
+        intercept (np.ndarray): Intersep keputusan (1,).
+        gamma (float): Parameter gamma kernel RBF.
+        precision (str): Salah satu kunci `PRECISIONS`.
+    """
+
+    ARRAY_NAMES = ('classes_', 'mean', 'scale', 'support_vectors', 'dual_coef', 'intercept')
+    STORAGE_ARRAYS = ('support_vectors',)
+
+    def __init__(self, classes_, mean, scale, support_vectors, dual_coef, intercept, gamma, precision='float64'):
+        dtype, _ = _precision_dtypes(precision)
+        self.precision = precision
+        self.classes_ = np.asarray(classes_)
+        self.mean = np.asarray(mean, dtype=dtype)
+        self.scale = np.asarray(scale, dtype=dtype)
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=dtype)
+        self.dual_coef = np.asarray(dual_coef, dtype=dtype)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.gamma = float(gamma)
+        self._sv_sq_norms = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """
+        Mengompilasi pipeline StandardScaler -> SVC (RBF) biner yang sudah dilatih.
+
+        Args:
+            pipeline (Pipeline): Pipeline detektor anomali terlatih.
+
+        Returns:
+            CompiledDetector: Detektor terkompilasi.
+
+        Raises:
+            ValueError: Jika pipeline bukan StandardScaler -> SVC RBF biner.
+        """
+        steps = [step for _, step in pipeline.steps]
+        if len(steps) != 2 or getattr(steps[1], 'kernel', None) != 'rbf' or len(steps[1].classes_) != 2:
+            raise ValueError("Hanya pipeline StandardScaler -> SVC RBF biner yang dapat dikompilasi.")
+        scaler, svc = steps
+        n_features = svc.support_vectors_.shape[1]
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+        return cls(svc.classes_, mean, scale, svc.support_vectors_, svc.dual_coef_[0],
+                   svc.intercept_, svc._gamma)
+
+    def decision_function(self, X_features):
+        """Nilai keputusan SVC biner; positif berarti kelas `classes_[1]`."""
+        scaled = (np.asarray(X_features, dtype=self.mean.dtype) - self.mean) / self.scale
+        kernel = _rbf_kernel(scaled, self.support_vectors, self._sv_sq_norms, self.gamma)
+        return (kernel @ self.dual_coef).astype(np.float64) + self.intercept[0]
+
+    def predict(self, X_features):
+        """Memprediksi label kelas, sama seperti `SVC.predict` biner."""
+        return self.classes_[(self.decision_function(X_features) > 0).astype(int)]
+
+    def with_precision(self, precision):
+        """Membuat salinan detektor dengan presisi lain (lihat `CompiledClassifier.with_precision`)."""
+        return _with_precision(self, precision)
+
+    def to_arrays(self, storage=False):
+        """Mengembalikan seluruh parameter array detektor sebagai dict nama -> array (dtype penyimpanan jika `storage`)."""
+        return _arrays(self, storage)
+
+    @classmethod
+    def from_arrays(cls, arrays, gamma, precision='float64'):
+        """Membangun detektor dari dict array (misalnya array memory-map), gamma, dan presisi."""
+        return cls(*(arrays[name] for name in cls.ARRAY_NAMES), gamma, precision=precision)
+
+
+def _with_precision(compiled, precision):
+    """Salinan model terkompilasi dengan presisi `precision` (matriks besar dibulatkan ke dtype penyimpanannya)."""
+    _, storage = _precision_dtypes(precision)
+    arrays = compiled.to_arrays()
+    for name in compiled.STORAGE_ARRAYS:
+        arrays[name] = arrays[name].astype(storage)
+    return compiled.from_arrays(arrays, compiled.gamma, precision)
+
+
+def _arrays(compiled, storage):
+    """Parameter array model terkompilasi; matriks besar dikonversi ke dtype penyimpanan jika `storage`."""
+    arrays = {name: getattr(compiled, name) for name in compiled.ARRAY_NAMES}
+    if storage:
+        _, storage_dtype = _precision_dtypes(compiled.precision)
+        for name in compiled.STORAGE_ARRAYS:
+            arrays[name] = arrays[name].astype(storage_dtype, copy=False)
+    return arrays
+
+
+def parity_report(model, compiled, X_features, repeats=20):
+    """
+    Membandingkan model terkompilasi dengan `IntegratedClassifier` asli.
+
+    Args:
+        model (IntegratedClassifier): Model asli yang sudah dilatih.
+        compiled (CompiledClassifier): Model terkompilasi.
+        X_features (np.ndarray): Matriks fitur uji (N, D).
+        repeats (int): Jumlah pengulangan pengukuran latensi satu gambar.
+
+    Returns:
+        dict: Selisih probabilitas maksimum, kesesuaian label, dan latensi satu
+              gambar (milidetik) untuk kedua jalur.
+    """
+    proba_ref = model.predict_proba_from_features(X_features)
+    proba = compiled.predict_proba_from_features(X_features)
+    labels_ref = model.predict_from_features(X_features)
+    labels = compiled.predict_from_features(X_features)
+
+    def latency_ms(fn):
+        single = X_features[:1]
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn(single)
+        return (time.perf_counter() - start) * 1000.0 / repeats
+
+    return {
+        'max_proba_abs_diff': float(np.abs(proba - proba_ref).max()),
+        'label_agreement': float(np.mean(labels == labels_ref)),
+        'sklearn_ms_per_image': latency_ms(model.predict_proba_from_features),
+        'compiled_ms_per_image': latency_ms(compiled.predict_proba_from_features),
+    }
+
+
+class PrecisionCheckError(ValueError):
+    """Dilempar ketika model presisi tereduksi menyimpang terlalu jauh dari model float64."""
+
+
+def precision_report(reference, candidate, X_features):
+    """
+    Membandingkan model presisi tereduksi dengan model float64 pada set validasi.
+
+    Args:
+        reference (CompiledClassifier or CompiledDetector): Model float64.
+        candidate (CompiledClassifier or CompiledDetector): Model presisi tereduksi.
+        X_features (np.ndarray): Matriks fitur validasi (N, D) yang tidak dipakai pelatihan.
+
+    Returns:
+        dict: Kesesuaian label dan, untuk classifier, selisih probabilitas
+              maksimum; untuk detektor, selisih nilai keputusan maksimum.
+    """
+    is_classifier = isinstance(reference, CompiledClassifier)
+    predict = 'predict_from_features' if is_classifier else 'predict'
+    labels_ref = getattr(reference, predict)(X_features)
+    labels = getattr(candidate, predict)(X_features)
+    report = {'precision': candidate.precision, 'label_agreement': float(np.mean(labels == labels_ref))}
+    if is_classifier:
+        proba_ref = reference.predict_proba_from_features(X_features)
+        proba = candidate.predict_proba_from_features(X_features)
+        report['max_proba_abs_diff'] = float(np.abs(proba - proba_ref).max())
+    else:
+        report['max_decision_abs_diff'] = float(np.abs(candidate.decision_function(X_features)
+                                                       - reference.decision_function(X_features)).max())
+    return report
+
+
+def reduce_precision(compiled, precision, X_features, min_agreement=0.995, max_proba_diff=0.02):
+    """
+    Mengonversi model ke presisi tereduksi hanya jika lolos pemeriksaan terhadap model float64.
+
+    Args:
+        compiled (CompiledClassifier or CompiledDetector): Model float64.
+        precision (str): Presisi tujuan (kunci `PRECISIONS`).
+        X_features (np.ndarray): Matriks fitur validasi yang tidak dipakai pelatihan.
+        min_agreement (float): Proporsi minimum label yang sama dengan model float64.
+        max_proba_diff (float): Selisih probabilitas maksimum yang diizinkan (classifier saja).
+
+    Returns:
+        tuple: (model presisi tereduksi, laporan `precision_report`).
+
+    Raises:
+        PrecisionCheckError: Jika kesesuaian label atau selisih probabilitas melewati batas.
+    """
+    candidate = compiled.with_precision(precision)
+    report = precision_report(compiled, candidate, X_features)
+    if report['label_agreement'] < min_agreement:
+        raise PrecisionCheckError(f"Kesesuaian label {precision} {report['label_agreement']:.4f} "
+                                  f"di bawah batas {min_agreement}")
+    if report.get('max_proba_abs_diff', 0.0) > max_proba_diff:
+        raise PrecisionCheckError(f"Selisih probabilitas {precision} {report['max_proba_abs_diff']:.4g} "
+                                  f"melebihi batas {max_proba_diff}")
+    return candidate, report
+
+
+if __name__ == '__main__':
+    # Penggunaan (dari direktori web/):
+    #   python -m utils.compiled_model model/svm_model-v1.1.pkl model/svm_model-v1.1.npz
+    import sys
+    import joblib
+
+    model = joblib.load(sys.argv[1])
+    compiled = CompiledClassifier.from_classifier(model)
+    compiled.save(sys.argv[2])
+    compiled = CompiledClassifier.load(sys.argv[2])
+
+    # Sampel sintetis di sekitar distribusi fitur pelatihan (mean dan skala StandardScaler).
+    scaler = model.pipeline.steps[0][1]
+    rng = np.random.default_rng(42)
+    X_check = scaler.mean_ + scaler.scale_ * rng.standard_normal((256, len(scaler.mean_)))
+    for key, value in parity_report(model, compiled, X_check).items():
+        print(f"{key:>22}: {value:.6g}")
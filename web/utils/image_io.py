@@ -0,0 +1,45 @@
+"""
+Modul decoding gambar unggahan langsung dari memori.
+
+Unggahan tunggal sebelumnya disimpan utuh ke disk, dibuka ulang untuk
+pemeriksaan anomali, dibuka sekali lagi untuk membuat thumbnail 800px, lalu
+berkas aslinya dihapus. Modul ini membaca gambar langsung dari stream
+permintaan dan men-decode-nya satu kali. Untuk JPEG, decoding memakai mode
+draft PIL (penskalaan DCT) sehingga gambar besar langsung di-decode pada
+resolusi terkecil yang masih cukup untuk thumbnail. Thumbnail dan input model
+128x128 diturunkan dari hasil decode yang sama.
+"""
+
+import numpy as np
+from PIL import Image
+
+from utils.metrics import timed
+
+
+THUMBNAIL_SIZE = (800, 800)
+
+
+@timed('decode')
+def decode_upload(stream, thumbnail_size=THUMBNAIL_SIZE):
+    """
+    Men-decode gambar unggahan satu kali dan membuat thumbnail darinya.
+
+    Args:
+        stream (file-like or str): Stream berkas unggahan (misalnya `FileStorage.stream`)
+                                   atau path berkas.
+        thumbnail_size (tuple): Ukuran maksimum thumbnail (lebar, tinggi).
+
+    Returns:
+        tuple: Sebuah tuple berisi:
+            - image_np (np.ndarray): Array RGB uint8 dari thumbnail, dipakai sebagai
+              input model (diubah ukurannya ke 128x128 oleh prapemrosesan).
+            - thumbnail (PIL.Image.Image): Thumbnail RGB untuk ditampilkan.
+    """
+    with Image.open(stream) as img:
+        if img.format == 'JPEG':
+            # Decoder JPEG memperkecil gambar dengan skala 1/2, 1/4, atau 1/8 saat decode,
+            # dipilih yang terkecil tetapi masih lebih besar dari ukuran thumbnail.
+            img.draft('RGB', thumbnail_size)
+        thumbnail = img.convert('RGB')
+    thumbnail.thumbnail(thumbnail_size)
+    return np.asarray(thumbnail), thumbnail
@@ -0,0 +1,236 @@
+"""
+Modul mesin inferensi satu-lintasan (single-pass).
+
+Sebelumnya setiap permintaan menjalankan prapemrosesan dan ekstraksi fitur
+dua kali: sekali untuk detektor anomali dan sekali lagi di dalam
+`IntegratedClassifier.predict_proba`. Mesin inferensi di modul ini
+mengekstrak vektor fitur satu kali per gambar, lalu memakai vektor yang sama
+untuk detektor anomali dan pipeline klasifikasi (StandardScaler -> PCA -> SVC).
+Klasifikasi dilewati sepenuhnya jika gambar ditolak sebagai anomali.
+
+Jika cache hasil dipasang, input 128x128 yang sudah pernah diprediksi dengan
+model yang sama langsung dijawab dari cache tanpa inferensi ulang.
+
+Jika gerbang anomali tahap pertama dipasang (lihat `utils.anomaly_gate`),
+anomali yang pasti ditolak hanya dari deskriptor murah sebelum ekstraksi
+fitur penuh. Hasil antara per gambar (grayscale, HSV, Lab, gradien Sobel)
+disimpan dalam satu `ImageIntermediates`, sehingga deskriptor murah yang
+sudah dihitung gerbang dipakai ulang oleh ekstraksi fitur penuh.
+"""
+
+import numpy as np
+
+from utils.model_wrapper import (
+    ImageIntermediates, extract_features, preprocess_batch, extract_features_batch,
+    resize_image, extract_cheap_features, cheap_features_batch
+)
+from utils.metrics import METRICS, timed, stage_timer
+
+
+class InferenceEngine:
+    """
+    Menggabungkan detektor anomali dan model klasifikasi dalam satu alur inferensi.
+
+    Attributes:
+        model (IntegratedClassifier or CompiledClassifier): Model klasifikasi cuaca yang telah dilatih.
+        anomaly_detector (Pipeline): Model detektor anomali (label -1 untuk anomali).
+        classes (list of str): Daftar nama kelas sesuai urutan label model.
+        cache (MemoryResultCache or SQLiteResultCache, optional): Cache hasil prediksi.
+        anomaly_gate (AnomalyGate, optional): Gerbang anomali tahap pertama pada deskriptor murah.
+    """
+
+    def __init__(self, model, anomaly_detector, classes, cache=None, anomaly_gate=None):
+        self.model = model
+        self.anomaly_detector = anomaly_detector
+        self.classes = classes
+        self.cache = cache
+        self.anomaly_gate = anomaly_gate
+
+    def extract(self, image_np):
+        """
+        Menjalankan prapemrosesan dan ekstraksi fitur tepat satu kali.
+
+        Args:
+            image_np (np.ndarray): Gambar mentah dalam bentuk array NumPy (uint8).
+
+        Returns:
+            np.ndarray: Vektor fitur 1D.
+        """
+        return extract_features(intermediates=ImageIntermediates.from_bgr(resize_image(image_np)))
+
+    @timed('anomaly_gate')
+    def gate_rejects(self, intermediates):
+        """
+        Memeriksa gambar dengan gerbang anomali tahap pertama.
+
+        Args:
+            intermediates (ImageIntermediates): Hasil antara gambar; yang dihitung di sini
+                                                dipakai ulang oleh ekstraksi fitur penuh.
+
+        Returns:
+            bool: True jika gambar ditolak sebagai anomali tanpa ekstraksi penuh.
+        """
+        cheap = extract_cheap_features(intermediates=intermediates)
+        rejected = bool(self.anomaly_gate.reject(cheap.reshape(1, -1))[0])
+        if rejected:
+            METRICS.inc('weather_anomaly_gate_rejected_total')
+        return rejected
+
+    @timed('anomaly_detector')
+    def is_anomaly(self, features):
+        """
+        Memeriksa apakah vektor fitur dianggap anomali oleh detektor.
+
+        Args:
+            features (np.ndarray): Vektor fitur 1D hasil `extract`.
+
+        Returns:
+            bool: True jika gambar merupakan anomali (prediksi -1).
+        """
+        return self.anomaly_detector.predict(features.reshape(1, -1))[0] == -1
+
+    @timed('classifier')
+    def classify(self, features):
+        """
+        Menghitung probabilitas kelas langsung dari vektor fitur.
+
+        Args:
+            features (np.ndarray): Vektor fitur 1D hasil `extract`.
+
+        Returns:
+            np.ndarray: Probabilitas untuk setiap kelas.
+        """
+        return self.model.predict_proba_from_features(features.reshape(1, -1))[0]
+
+    def rank_confidences(self, confidence_scores):
+        """
+        Mengubah probabilitas menjadi daftar (kelas, persen) yang terurut menurun.
+
+        Args:
+            confidence_scores (np.ndarray): Probabilitas untuk setiap kelas.
+
+        Returns:
+            list of tuple: Daftar (nama kelas, kepercayaan dalam persen).
+        """
+        return sorted(
+            [(self.classes[i], round(score * 100, 2)) for i, score in enumerate(confidence_scores)],
+            key=lambda item: item[1], reverse=True
+        )
+
+    def _format(self, is_anomaly, confidence_scores):
+        """Mengubah hasil mentah (putusan, probabilitas) menjadi format keluaran `predict`."""
+        if is_anomaly:
+            return True, None
+        return False, self.rank_confidences(confidence_scores)
+
+    def predict(self, image_np):
+        """
+        Menjalankan deteksi anomali dan klasifikasi dengan satu kali ekstraksi fitur.
+
+        Args:
+            image_np (np.ndarray): Gambar mentah dalam bentuk array NumPy (uint8).
+
+        Returns:
+            tuple: Sebuah tuple berisi:
+                - is_anomaly (bool): True jika gambar ditolak oleh detektor anomali.
+                - all_confidences (list of tuple or None): Kepercayaan per kelas yang
+                  sudah diurutkan, atau None jika gambar merupakan anomali.
+        """
+        resized = resize_image(image_np)
+        key = self.cache.key(resized) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return self._format(*cached)
+
+        intermediates = ImageIntermediates.from_bgr(resized)
+        if self.anomaly_gate is not None and self.gate_rejects(intermediates):
+            result = (True, None)
+        else:
+            features = extract_features(intermediates=intermediates)
+            if self.is_anomaly(features):
+                result = (True, None)
+            else:
+                result = (False, self.classify(features))
+        if key is not None:
+            self.cache.put(key, *result)
+        return self._format(*result)
+
+    def predict_batch(self, images):
+        """
+        Menjalankan deteksi anomali dan klasifikasi untuk sekumpulan gambar sekaligus.
+
+        Fitur seluruh gambar diekstrak dalam satu matriks, detektor anomali
+        dipanggil sekali untuk seluruh matriks, dan klasifikasi hanya dijalankan
+        (juga sekali) untuk baris yang bukan anomali. Gambar yang ada di cache
+        atau ditolak gerbang anomali tahap pertama tidak ikut diekstrak penuh.
+
+        Args:
+            images (list of np.ndarray): Gambar mentah dalam bentuk array NumPy (uint8).
+
+        Returns:
+            list of tuple: Untuk setiap gambar, tuple (is_anomaly, all_confidences)
+                           dengan format yang sama seperti `predict`.
+        """
+        if len(images) == 0:
+            return []
+        resized = preprocess_batch(images)
+        results = [None] * len(images)
+        keys = [self.cache.key(image) for image in resized] if self.cache is not None else None
+        if keys is not None:
+            for i, key in enumerate(keys):
+                results[i] = self.cache.get(key)
+
+        missing = np.array([i for i, result in enumerate(results) if result is None], dtype=int)
+        if len(missing) > 0:
+            remaining = missing
+            if self.anomaly_gate is not None:
+                with stage_timer('anomaly_gate'):
+                    rejected = self.anomaly_gate.reject(cheap_features_batch(resized[missing]))
+                for i in missing[rejected]:
+                    results[i] = (True, None)
+                if rejected.any():
+                    METRICS.inc('weather_anomaly_gate_rejected_total', value=int(rejected.sum()))
+                remaining = missing[~rejected]
+            if len(remaining) > 0:
+                features = extract_features_batch(resized[remaining])
+                with stage_timer('anomaly_detector'):
+                    anomaly_mask = self.anomaly_detector.predict(features) == -1
+                for i in remaining[anomaly_mask]:
+                    results[i] = (True, None)
+                normal_rows = np.flatnonzero(~anomaly_mask)
+                if len(normal_rows) > 0:
+                    with stage_timer('classifier'):
+                        confidence_scores = self.model.predict_proba_from_features(features[normal_rows])
+                    for i, scores in zip(remaining[normal_rows], confidence_scores):
+                        results[i] = (False, scores)
+            if keys is not None:
+                for i in missing:
+                    self.cache.put(keys[i], *results[i])
+
+        return [self._format(*result) for result in results]
+
+    def warm_up(self, n_images=2):
+        """
+        Menjalankan inferensi pada gambar dummy agar panggilan pertama pengguna tidak lambat.
+
+        Jalur tunggal dan batch dijalankan sekali tanpa menyentuh cache hasil,
+        sehingga impor tertunda, inisialisasi BLAS, dan halaman array model yang
+        di-memory-map sudah siap sebelum permintaan nyata tiba. Pencatatan metrik
+        ditangguhkan agar latensi pemanasan tidak masuk ke histogram produksi.
+
+        Args:
+            n_images (int): Jumlah gambar dummy untuk jalur batch.
+        """
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, size=(n_images, 128, 128, 3), dtype=np.uint8)
+        with METRICS.suspended():
+            features = self.extract(images[0])
+            self.is_anomaly(features)
+            self.classify(features)
+            resized = preprocess_batch(list(images))
+            if self.anomaly_gate is not None:
+                self.anomaly_gate.reject(cheap_features_batch(resized))
+            features = extract_features_batch(resized)
+            self.anomaly_detector.predict(features)
+            self.model.predict_proba_from_features(features)
@@ -0,0 +1,169 @@
+"""
+Modul status per koneksi untuk kanal streaming kamera langsung.
+
+Jalur lama mengirim setiap frame sebagai data URL base64 di dalam JSON
+(sekitar 33% lebih besar) dan menunggu hasil inferensinya dalam permintaan
+yang sama. Kanal streaming memisahkan keduanya:
+
+- Klien mengirim frame JPEG biner mentah ke sesinya. Server hanya menyimpan
+  frame terbaru di kotak surat satu slot lalu langsung menjawab, tanpa
+  menunggu inferensi.
+- Satu respons HTTP chunked per sesi yang tetap terbuka mengalirkan hasil
+  inferensi sebagai baris NDJSON.
+
+Backpressure terjadi di sisi server: jika inferensi tertinggal, frame lama
+yang belum diproses ditimpa frame yang lebih baru dan dihitung sebagai
+frame yang dibuang. Yang diproses selalu frame paling baru.
+"""
+
+import uuid
+import time
+import threading
+
+
+class LiveSessionLimitError(RuntimeError):
+    """Dilempar ketika jumlah sesi streaming aktif sudah mencapai batas."""
+
+
+class LiveSession:
+    """
+    Status satu koneksi kamera: kotak surat frame terbaru dan penghitungnya.
+
+    Attributes:
+        session_id (str): ID sesi acak.
+        closed (bool): True jika sesi sudah ditutup.
+    """
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.closed = False
+        self._condition = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+        self.last_active = time.monotonic()
+
+    def offer(self, frame_bytes):
+        """
+        Menyimpan frame terbaru, menimpa frame sebelumnya yang belum diproses.
+
+        Args:
+            frame_bytes (bytes): Isi berkas JPEG (atau PNG) mentah.
+
+        Returns:
+            int: Nomor urut frame dalam sesi ini.
+        """
+        with self._condition:
+            if self._frame is not None:
+                self.dropped += 1
+            self._seq += 1
+            self._frame = (self._seq, frame_bytes)
+            self.received += 1
+            self.last_active = time.monotonic()
+            self._condition.notify()
+            return self._seq
+
+    def take(self, timeout):
+        """
+        Menunggu dan mengambil frame terbaru.
+
+        Args:
+            timeout (float): Batas waktu menunggu dalam detik.
+
+        Returns:
+            tuple or None: (nomor urut, bytes frame), atau None jika waktu habis atau sesi ditutup.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._frame is not None or self.closed, timeout)
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                self.processed += 1
+                self.last_active = time.monotonic()
+            return None if self.closed else frame
+
+    def close(self):
+        """Menutup sesi dan membangunkan aliran hasil yang sedang menunggu."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def idle_seconds(self):
+        return time.monotonic() - self.last_active
+
+    def stats(self):
+        """Mengembalikan penghitung frame sesi."""
+        return {'received': self.received, 'processed': self.processed, 'dropped': self.dropped}
+
+
+class LiveSessionRegistry:
+    """
+    Registri sesi streaming aktif dengan batas jumlah sesi dan kedaluwarsa idle.
+
+    Attributes:
+        max_sessions (int): Jumlah sesi aktif maksimum.
+        idle_timeout (float): Sesi tanpa frame selama ini (detik) dianggap mati.
+    """
+
+    def __init__(self, max_sessions=64, idle_timeout=30.0):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._totals = {'opened': 0, 'dropped': 0, 'processed': 0}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _expire(self):
+        """Menutup sesi yang idle melebihi `idle_timeout`; dipanggil dengan lock dipegang."""
+        for session_id in [sid for sid, s in self._sessions.items() if s.idle_seconds() > self.idle_timeout]:
+            self._discard(session_id)
+
+    def _discard(self, session_id):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+            self._totals['dropped'] += session.dropped
+            self._totals['processed'] += session.processed
+
+    def create(self):
+        """
+        Membuat sesi baru.
+
+        Returns:
+            LiveSession: Sesi yang baru dibuat.
+
+        Raises:
+            LiveSessionLimitError: Jika jumlah sesi aktif sudah mencapai `max_sessions`.
+        """
+        with self._lock:
+            self._expire()
+            if len(self._sessions) >= self.max_sessions:
+                raise LiveSessionLimitError('Jumlah sesi streaming sudah mencapai batas')
+            session = LiveSession(uuid.uuid4().hex)
+            self._sessions[session.session_id] = session
+            self._totals['opened'] += 1
+            return session
+
+    def get(self, session_id):
+        """Mengembalikan sesi aktif dengan ID tersebut, atau None."""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def close(self, session_id):
+        """Menutup dan menghapus sesi."""
+        with self._lock:
+            self._discard(session_id)
+
+    def stats(self):
+        """Mengembalikan jumlah sesi aktif serta total frame yang diproses dan dibuang."""
+        with self._lock:
+            self._expire()
+            active = list(self._sessions.values())
+            stats = dict(self._totals)
+        stats['active'] = len(active)
+        stats['dropped'] += sum(s.dropped for s in active)
+        stats['processed'] += sum(s.processed for s in active)
+        return stats
@@ -0,0 +1,216 @@
+"""
+Modul instrumentasi latensi dan metrik bergaya Prometheus.
+
+Menyediakan registri metrik ringan di dalam proses (counter, gauge, dan
+histogram dengan bucket tetap) tanpa dependensi tambahan, beserta timer per
+tahap inferensi: decode gambar, prapemrosesan, setiap deskriptor `extract_*`,
+detektor anomali, pipeline klasifikasi, dan `smart_predict`. Isi registri
+dirender dalam format teks Prometheus oleh endpoint `/metrics`.
+
+Instrumentasi dikendalikan oleh `METRICS.enabled`. Saat nonaktif, timer
+langsung memanggil fungsi aslinya tanpa membaca jam atau mengunci registri.
+Pekerjaan internal seperti pemanasan model dijalankan di dalam
+`METRICS.suspended()` agar tidak tercatat di histogram produksi.
+"""
+
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+
+# Batas atas bucket histogram latensi dalam detik.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_METRIC = 'weather_stage_duration_seconds'
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Registri counter, gauge, dan histogram yang aman untuk banyak thread.
+
+    Attributes:
+        enabled (bool): Jika False, semua timer dan pencatatan dilewati.
+        buckets (tuple of float): Batas atas bucket histogram.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.enabled = False
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._help = {}
+        self._types = {}
+        self._values = {}
+        self._histograms = {}
+        self._collectors = {}
+        self._local = threading.local()
+
+    def describe(self, name, metric_type, help_text):
+        """Mendaftarkan tipe dan teks bantuan sebuah metrik."""
+        self._types[name] = metric_type
+        self._help[name] = help_text
+
+    @property
+    def recording(self):
+        """True jika pencatatan aktif dan tidak ditangguhkan pada thread ini."""
+        return self.enabled and not getattr(self._local, 'suspended', False)
+
+    @contextmanager
+    def suspended(self):
+        """Context manager yang menangguhkan pencatatan hanya pada thread pemanggil."""
+        previous = getattr(self._local, 'suspended', False)
+        self._local.suspended = True
+        try:
+            yield
+        finally:
+            self._local.suspended = previous
+
+    def inc(self, name, labels=None, value=1):
+        """Menambah nilai counter (atau gauge) sebesar `value`."""
+        if not self.recording:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def dec(self, name, labels=None, value=1):
+        """Mengurangi nilai gauge sebesar `value`."""
+        self.inc(name, labels, -value)
+
+    def observe(self, name, value, labels=None):
+        """Mencatat satu observasi ke histogram."""
+        if not self.recording:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0, 0.0]
+            counts = histogram[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            histogram[1] += 1
+            histogram[2] += value
+
+    def register_collector(self, collector, name=None):
+        """
+        Mendaftarkan fungsi yang dipanggil saat render untuk metrik bernilai sesaat.
+
+        Pendaftaran ulang dengan `name` yang sama menggantikan collector
+        sebelumnya, sehingga pemanggilan `create_app` berulang tidak menumpuk
+        collector.
+
+        Args:
+            collector (callable): Mengembalikan iterable (nama, tipe, bantuan, labels, nilai).
+            name (str, optional): Kunci unik collector; default-nya collector itu sendiri.
+        """
+        with self._lock:
+            self._collectors[collector if name is None else name] = collector
+
+    def render(self):
+        """
+        Merender seluruh metrik dalam format teks eksposisi Prometheus.
+
+        Returns:
+            str: Teks metrik.
+        """
+        with self._lock:
+            values = dict(self._values)
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+            collectors = list(self._collectors.values())
+        types, helps = dict(self._types), dict(self._help)
+        for collector in collectors:
+            for name, metric_type, help_text, labels, value in collector():
+                types.setdefault(name, metric_type)
+                helps.setdefault(name, help_text)
+                values[(name, _label_key(labels))] = value
+
+        lines = []
+        names = sorted({name for name, _ in values} | {name for name, _ in histograms})
+        for name in names:
+            if name in helps:
+                lines.append(f"# HELP {name} {helps[name]}")
+            lines.append(f"# TYPE {name} {types.get(name, 'untyped')}")
+            for (metric, label_key), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(label_key)} {_format_value(value)}")
+            for (metric, label_key), (counts, count, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts + [count - sum(counts)]):
+                    cumulative += bucket_count
+                    le = (('le', _format_value(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(label_key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(label_key)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(label_key)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+# Registri global aplikasi; diaktifkan oleh `create_app` sesuai konfigurasi.
+METRICS = MetricsRegistry()
+METRICS.describe(STAGE_METRIC, 'histogram', 'Durasi setiap tahap inferensi dalam detik.')
+METRICS.describe('weather_request_duration_seconds', 'histogram', 'Durasi permintaan HTTP per rute dalam detik.')
+METRICS.describe('weather_requests_total', 'counter', 'Jumlah permintaan HTTP per rute dan status.')
+METRICS.describe('weather_requests_in_flight', 'gauge', 'Jumlah permintaan yang sedang diproses per rute.')
+METRICS.describe('weather_anomalies_rejected_total', 'counter', 'Jumlah gambar yang ditolak detektor anomali.')
+METRICS.describe('weather_errors_total', 'counter', 'Jumlah kesalahan pemrosesan per rute.')
+METRICS.describe('weather_anomaly_gate_rejected_total', 'counter', 'Jumlah gambar yang ditolak gerbang anomali tahap pertama.')
+METRICS.describe('weather_live_frames_reused_total', 'counter', 'Jumlah frame langsung yang memakai ulang hasil sebelumnya.')
+METRICS.describe('weather_result_cache_errors_total', 'counter', 'Jumlah operasi cache hasil yang gagal dan dilewati.')
+
+
+def timed(stage):
+    """
+    Dekorator yang mencatat durasi fungsi ke histogram tahap `stage`.
+
+    Args:
+        stage (str): Nama tahap (label `stage` pada metrik).
+    """
+    labels = {'stage': stage}
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.recording:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                METRICS.observe(STAGE_METRIC, time.perf_counter() - start, labels)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def stage_timer(stage):
+    """Context manager yang mencatat durasi blok ke histogram tahap `stage`."""
+    if not METRICS.recording:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        METRICS.observe(STAGE_METRIC, time.perf_counter() - start, {'stage': stage})
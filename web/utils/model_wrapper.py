@@ -1,6 +1,7 @@
 import numpy as np
 import cv2
 import random
+from scipy import fft as sp_fft
 from scipy.stats import skew
 from skimage.feature import hog, local_binary_pattern, graycomatrix, graycoprops
 from sklearn.base import BaseEstimator, ClassifierMixin
@@ -9,6 +10,8 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 from sklearn.svm import SVC
 
+from utils.metrics import timed
+
 
 # Konfigurasi yang harus sama dengan saat training
 IMAGE_SIZE = (128, 128)
@@ -29,6 +32,7 @@ def normalize_image(image):
     """Menormalisasi nilai piksel gambar ke rentang [0.0, 1.0]."""
     return image.astype('float32') / 255.0
 
+@timed('preprocess')
 def preprocess_image_for_feature_extraction(image):
     """Pipeline prapemrosesan lengkap untuk satu gambar."""
     resized_color_uint8 = resize_image(image)
@@ -37,108 +41,462 @@ def preprocess_image_for_feature_extraction(image):
     normalized_color = normalize_image(resized_color_uint8)
     return normalized_gray, normalized_color
 
-def extract_hog_features(gray_image):
-    """Mengekstrak fitur HOG."""
-    return hog(gray_image, orientations=HOG_ORIENTATIONS, pixels_per_cell=HOG_PIXELS_PER_CELL,
-               cells_per_block=HOG_CELLS_PER_BLOCK, block_norm='L2-Hys', visualize=False, transform_sqrt=True)
+class ImageIntermediates:
+    """Cache hasil antara satu gambar (uint8, HSV, Lab, gradien Sobel) yang dihitung paling banyak sekali."""
+    def __init__(self, gray_image=None, color_image=None):
+        self.gray_image = gray_image
+        self.color_image = color_image
+        self.computed = {}
+        if gray_image is not None:
+            self.computed['gray_float'] = gray_image
+    @classmethod
+    @timed('preprocess')
+    def from_bgr(cls, image):
+        """Cache langsung dari gambar BGR uint8 yang sudah di-resize (tanpa normalisasi float)."""
+        cache = cls()
+        cache.computed['bgr_u8'] = image
+        cache.computed['gray_u8'] = to_grayscale(image)
+        return cache
+    def __getitem__(self, name):
+        value = self.computed.get(name)
+        if value is None:
+            value = self.computed[name] = INTERMEDIATES[name](self)
+        return value
 
-def extract_color_histogram(color_image):
-    """Mengekstrak fitur histogram warna HSV."""
-    hsv_image = cv2.cvtColor((color_image * 255).astype(np.uint8), cv2.COLOR_BGR2HSV)
-    hist_h = cv2.calcHist([hsv_image], [0], None, [180], [0, 180])
-    hist_s = cv2.calcHist([hsv_image], [1], None, [32], [0, 256])
-    hist_v = cv2.calcHist([hsv_image], [2], None, [32], [0, 256])
-    cv2.normalize(hist_h, hist_h)
-    cv2.normalize(hist_s, hist_s)
-    cv2.normalize(hist_v, hist_v)
-    return np.concatenate((hist_h, hist_s, hist_v)).flatten()
+def _sobel_gradients(cache):
+    # Gradien Sobel 3x3 dari uint8 selalu bilangan bulat dalam [-1020, 1020], jadi int16 sudah eksak.
+    gray = cache['gray_u8']
+    return cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3), cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3)
 
-def extract_lbp_features(gray_image):
-    """Mengekstrak fitur LBP."""
-    gray_image_uint8 = (gray_image * 255).astype(np.uint8)
-    radius, n_points = 8, 24
-    lbp = local_binary_pattern(gray_image_uint8, n_points, radius, method='uniform')
-    (hist, _) = np.histogram(lbp.ravel(), bins=np.arange(0, n_points + 3), range=(0, n_points + 2))
+def _gradient_magnitude(cache):
+    sobelx, sobely = cache['sobel_gradients']
+    return cv2.magnitude(sobelx.astype(np.float32), sobely.astype(np.float32))
+
+# Simpul graf hasil antara (cermin dari src.features.feature_extraction)
+INTERMEDIATES = {
+    'gray_u8': lambda cache: (cache.gray_image * 255).astype(np.uint8),
+    'bgr_u8': lambda cache: (cache.color_image * 255).astype(np.uint8),
+    'gray_float': lambda cache: normalize_image(cache['gray_u8']),
+    'hsv': lambda cache: cv2.cvtColor(cache['bgr_u8'], cv2.COLOR_BGR2HSV),
+    'lab': lambda cache: cv2.cvtColor(cache['bgr_u8'], cv2.COLOR_BGR2Lab),
+    'sobel_gradients': _sobel_gradients,
+    'gradient_magnitude': _gradient_magnitude,
+}
+
+def _normalized_histogram(values, bins, value_range):
+    (hist, _) = np.histogram(values.ravel(), bins=bins, range=value_range)
     hist = hist.astype("float")
     hist /= (hist.sum() + 1e-6)
     return hist
 
-def extract_color_moments(color_image):
-    """Mengekstrak fitur color moments Lab."""
-    lab_image = cv2.cvtColor((color_image * 255).astype(np.uint8), cv2.COLOR_BGR2Lab)
-    l, a, b = cv2.split(lab_image)
-    channels = [l, a, b]
+@timed('extract_hog')
+def _hog(cache):
+    return hog(cache['gray_float'], orientations=HOG_ORIENTATIONS, pixels_per_cell=HOG_PIXELS_PER_CELL,
+               cells_per_block=HOG_CELLS_PER_BLOCK, block_norm='L2-Hys', visualize=False, transform_sqrt=True)
+
+@timed('extract_color_histogram')
+def _color_histogram(cache):
+    hsv_image = cache['hsv']
+    hist = np.empty(180 + 32 + 32, dtype=np.float32)
+    for channel, (start, bins, upper) in enumerate(((0, 180, 180), (180, 32, 256), (212, 32, 256))):
+        channel_hist = cv2.calcHist([hsv_image], [channel], None, [bins], [0, upper])
+        cv2.normalize(channel_hist, channel_hist)
+        hist[start:start + bins] = channel_hist.ravel()
+    return hist
+
+@timed('extract_lbp')
+def _lbp(cache):
+    lbp = local_binary_pattern(cache['gray_u8'], 24, 8, method='uniform')
+    return _normalized_histogram(lbp, np.arange(0, 24 + 3), (0, 24 + 2))
+
+@timed('extract_color_moments')
+def _color_moments(cache):
+    lab_image = cache['lab']
     features = []
-    for channel in channels:
+    for c in range(3):
+        channel = lab_image[:, :, c]
         mean = np.mean(channel)
         std = np.std(channel)
-        if std > 1e-6:
-            skewness = skew(channel.flatten())
-        else:
-            skewness = 0.0
+        skewness = skew(channel, axis=None) if std > 1e-6 else 0.0
         features.extend([mean, std, skewness])
     return np.array(features)
 
+@timed('extract_glcm')
+def _glcm(cache):
+    glcm = graycomatrix(quantize_gray(cache['gray_u8']), distances=[1, 3, 5], angles=[0, np.pi/4, np.pi/2, 3*np.pi/4],
+                        levels=GLCM_LEVELS, symmetric=True, normed=True)
+    props = ['contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation', 'ASM']
+    return np.concatenate([graycoprops(glcm, prop).ravel() for prop in props])
+
+@timed('extract_gabor')
+def _gabor(cache):
+    # Jalur FFT yang sama dengan ekstraksi batch dan pelatihan, agar satu gambar
+    # menghasilkan fitur (dan entri cache hasil) yang sama di kedua jalur.
+    return GABOR_BANK.extract_batch(cache['gray_u8'][None])[0]
+
+@timed('extract_sobel')
+def _sobel(cache):
+    return _normalized_histogram(cache['gradient_magnitude'], 32, (0, 256))
+
+def extract_hog_features(gray_image):
+    """Mengekstrak fitur HOG."""
+    return _hog(ImageIntermediates(gray_image=gray_image))
+
+def extract_color_histogram(color_image):
+    """Mengekstrak fitur histogram warna HSV."""
+    return _color_histogram(ImageIntermediates(color_image=color_image))
+
+def extract_lbp_features(gray_image):
+    """Mengekstrak fitur LBP."""
+    return _lbp(ImageIntermediates(gray_image=gray_image))
+
+def extract_color_moments(color_image):
+    """Mengekstrak fitur color moments Lab."""
+    return _color_moments(ImageIntermediates(color_image=color_image))
+
 def extract_glcm_features(gray_image):
     """Mengekstrak fitur tekstur GLCM."""
-    gray_image_uint8 = (gray_image * 255).astype(np.uint8)
-    distances = [1, 3, 5]
-    angles = [0, np.pi/4, np.pi/2, 3*np.pi/4]
-    glcm = graycomatrix(gray_image_uint8, distances=distances, angles=angles, symmetric=True, normed=True)
-    
-    features = []
-    props = ['contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation', 'ASM']
-    for prop in props:
-        features.append(graycoprops(glcm, prop).ravel())
-        
-    return np.concatenate(features)
+    return _glcm(ImageIntermediates(gray_image=gray_image))
 
-def extract_gabor_features(gray_image):
-    """Mengekstrak fitur tekstur Gabor."""
-    img = (gray_image * 255).astype(np.uint8)
-    filters = []
-    ksize = 31
-    for theta in np.arange(0, np.pi, np.pi / 4):
-        for lambd in np.arange(np.pi / 4, np.pi, np.pi / 4):
-            for sigma in (1, 3):
-                kernel = cv2.getGaborKernel((ksize, ksize), sigma, theta, lambd, 0.5, 0, ktype=cv2.CV_32F)
-                filters.append(kernel)
+class GaborFilterBank:
+    """Bank filter Gabor yang kernelnya dibangun sekali saat model dimuat."""
+    def __init__(self, ksize=31):
+        self.ksize = ksize
+        kernels = []
+        for theta in np.arange(0, np.pi, np.pi / 4):
+            for lambd in np.arange(np.pi / 4, np.pi, np.pi / 4):
+                for sigma in (1, 3):
+                    kernels.append(cv2.getGaborKernel((ksize, ksize), sigma, theta, lambd, 0.5, 0, ktype=cv2.CV_32F))
+        self.kernels = np.ascontiguousarray(np.stack(kernels))
+        self._spectra = {}
+    def extract(self, img_uint8):
+        """Fitur Gabor satu gambar uint8 dengan filter2D per kernel (acuan bit-exact)."""
+        features = np.empty(2 * len(self.kernels))
+        for i, kernel in enumerate(self.kernels):
+            filtered_img = cv2.filter2D(img_uint8, cv2.CV_8U, kernel)
+            features[2 * i] = filtered_img.mean()
+            features[2 * i + 1] = filtered_img.std()
+        return features
+    @timed('extract_gabor_batch')
+    def extract_batch(self, gray_stack_uint8, chunk_size=8):
+        """Fitur Gabor untuk tumpukan gambar uint8 (N, H, W) melalui konvolusi FFT float32.
 
-    features = []
-    for kernel in filters:
-        filtered_img = cv2.filter2D(img, cv2.CV_8UC3, kernel)
-        features.append(filtered_img.mean())
-        features.append(filtered_img.std())
-    
-    return np.array(features)
+        Respons berbeda paling banyak satu tingkat keabuan dari `extract` pada piksel
+        di batas pembulatan; lihat `GaborFilterBank.responses_batch` di build.
+        """
+        n_images, height, width = gray_stack_uint8.shape
+        pad = self.ksize // 2
+        features = np.empty((n_images, 2 * len(self.kernels)))
+        for start in range(0, n_images, chunk_size):
+            chunk = gray_stack_uint8[start:start + chunk_size].astype(np.float32)
+            padded = np.pad(chunk, ((0, 0), (pad, pad), (pad, pad)), mode='reflect')
+            fft_shape = tuple(sp_fft.next_fast_len(n, real=True) for n in padded.shape[1:])
+            spectra = self._spectra.get(fft_shape)
+            if spectra is None:
+                # filter2D melakukan korelasi, sehingga kernel dibalik untuk konvolusi FFT.
+                flipped = np.zeros((len(self.kernels),) + fft_shape, dtype=np.float32)
+                flipped[:, :self.ksize, :self.ksize] = self.kernels[:, ::-1, ::-1]
+                spectra = self._spectra[fft_shape] = sp_fft.rfft2(flipped)
+            full = sp_fft.irfft2(sp_fft.rfft2(padded, s=fft_shape)[:, None] * spectra[None], s=fft_shape)
+            valid = full[:, :, 2 * pad:2 * pad + height, 2 * pad:2 * pad + width]
+            responses = np.clip(np.rint(valid), 0, 255).astype(np.uint8).reshape(len(chunk), len(self.kernels), -1)
+            features[start:start + chunk_size, 0::2] = responses.mean(axis=2)
+            features[start:start + chunk_size, 1::2] = responses.std(axis=2)
+        return features
+
+GABOR_BANK = GaborFilterBank()
+
+def extract_gabor_features(gray_image):
+    """Mengekstrak fitur tekstur Gabor dengan bank filter yang sudah dibangun."""
+    return _gabor(ImageIntermediates(gray_image=gray_image))
 
 def extract_sobel_features(gray_image):
     """Mengekstrak fitur tepi Sobel."""
-    img_uint8 = (gray_image * 255).astype(np.uint8)
-    sobelx = cv2.Sobel(img_uint8, cv2.CV_64F, 1, 0, ksize=3)
-    sobely = cv2.Sobel(img_uint8, cv2.CV_64F, 0, 1, ksize=3)
-    magnitude = np.sqrt(sobelx**2 + sobely**2)
-    (hist, _) = np.histogram(magnitude.ravel(), bins=32, range=(0, 256))
-    hist = hist.astype("float")
-    hist /= (hist.sum() + 1e-6)
-    return hist
+    return _sobel(ImageIntermediates(gray_image=gray_image))
+
+# Urutan deskriptor di dalam vektor fitur gabungan
+DESCRIPTORS = {
+    'hog': _hog,
+    'color_histogram': _color_histogram,
+    'lbp': _lbp,
+    'gabor': _gabor,
+    'sobel': _sobel,
+    'glcm': _glcm,
+    'color_moments': _color_moments,
+}
 
-def extract_features(gray_image, color_image):
-    """Menggabungkan semua fitur menjadi satu vektor tunggal."""
-    hog_features = extract_hog_features(gray_image)
-    color_hist_features = extract_color_histogram(color_image)
-    lbp_features = extract_lbp_features(gray_image)
-    gabor_features = extract_gabor_features(gray_image)
-    sobel_features = extract_sobel_features(gray_image)
-    glcm_features = extract_glcm_features(gray_image)
-    color_moments = extract_color_moments(color_image)
-    all_features = np.hstack([hog_features, color_hist_features, lbp_features, gabor_features, sobel_features, glcm_features, color_moments])
+@timed('extract_features')
+def extract_features(gray_image=None, color_image=None, intermediates=None):
+    """Menggabungkan semua fitur menjadi satu vektor tunggal; hasil antara dibagi lewat `ImageIntermediates`."""
+    if intermediates is None:
+        intermediates = ImageIntermediates(gray_image, color_image)
+    all_features = np.hstack([descriptor(intermediates) for descriptor in DESCRIPTORS.values()])
     
     if np.isnan(all_features).any():
         all_features = np.nan_to_num(all_features)
         
     return all_features
 
+# Deskriptor murah untuk gerbang anomali tahap pertama (cermin dari src.models.cascade)
+CHEAP_DESCRIPTORS = ('color_histogram', 'sobel', 'color_moments')
+
+@timed('extract_cheap')
+def extract_cheap_features(gray_image=None, color_image=None, intermediates=None):
+    """Menggabungkan deskriptor murah (histogram warna, Sobel, color moments) satu gambar."""
+    if intermediates is None:
+        intermediates = ImageIntermediates(gray_image, color_image)
+    features = np.hstack([DESCRIPTORS[name](intermediates) for name in CHEAP_DESCRIPTORS])
+    return np.nan_to_num(features)
+
+# Ekstraksi fitur tervektorisasi untuk tumpukan gambar (cermin dari src.features.batch_extraction)
+LBP_RADIUS, LBP_POINTS = 8, 24
+GLCM_DISTANCES = (1, 3, 5)
+GLCM_ANGLES = (0, np.pi/4, np.pi/2, 3*np.pi/4)
+GLCM_LEVELS = 256
+
+@timed('preprocess_batch')
+def preprocess_batch(images):
+    """Mengubah ukuran sekumpulan gambar mentah menjadi satu tumpukan uint8 (N, H, W, 3)."""
+    resized = [resize_image(image) for image in images]
+    if not resized:
+        return np.empty((0, IMAGE_SIZE[1], IMAGE_SIZE[0], 3), dtype=np.uint8)
+    return np.ascontiguousarray(np.stack(resized))
+
+def _batch_bincount(values, n_bins):
+    """Histogram bilangan bulat per gambar dalam satu panggilan bincount."""
+    n_images = values.shape[0]
+    flat = values.reshape(n_images, -1).astype(np.int64)
+    flat += (np.arange(n_images, dtype=np.int64) * n_bins)[:, None]
+    return np.bincount(flat.ravel(), minlength=n_images * n_bins).reshape(n_images, n_bins)
+
+def _l2_normalize_rows(hist):
+    """Normalisasi L2 per baris, setara dengan cv2.normalize(hist, hist)."""
+    norms = np.sqrt(np.sum(hist.astype(np.float64) ** 2, axis=1, keepdims=True))
+    return hist / np.where(norms > 0, norms, 1.0)
+
+@timed('extract_color_histogram_batch')
+def color_histogram_batch(hsv_stack):
+    """Histogram HSV ternormalisasi untuk tumpukan gambar."""
+    hist_h = _l2_normalize_rows(_batch_bincount(hsv_stack[..., 0], 180))
+    hist_s = _l2_normalize_rows(_batch_bincount(hsv_stack[..., 1] >> 3, 32))
+    hist_v = _l2_normalize_rows(_batch_bincount(hsv_stack[..., 2] >> 3, 32))
+    return np.hstack([hist_h, hist_s, hist_v])
+
+@timed('extract_color_moments_batch')
+def color_moments_batch(lab_stack):
+    """Color moments Lab untuk tumpukan gambar."""
+    n_images = lab_stack.shape[0]
+    channels = lab_stack.reshape(n_images, -1, 3).astype(np.float64)
+    mean = channels.mean(axis=1)
+    centered = channels - mean[:, None, :]
+    m2 = np.mean(centered ** 2, axis=1)
+    m3 = np.mean(centered ** 3, axis=1)
+    std = np.sqrt(m2)
+    skewness = np.where(std > 1e-6, m3 / np.where(m2 > 0, m2, 1.0) ** 1.5, 0.0)
+    return np.stack([mean, std, skewness], axis=2).reshape(n_images, 9)
+
+@timed('extract_sobel_batch')
+def sobel_histogram_batch(gray_stack):
+    """Histogram magnitudo Sobel untuk tumpukan gambar uint8 (bin dihitung dari kuadrat magnitudo)."""
+    padded = np.pad(gray_stack.astype(np.int32), ((0, 0), (1, 1), (1, 1)), mode='reflect')
+    smooth_rows = padded[:, :-2, :] + 2 * padded[:, 1:-1, :] + padded[:, 2:, :]
+    smooth_cols = padded[:, :, :-2] + 2 * padded[:, :, 1:-1] + padded[:, :, 2:]
+    sobelx = smooth_rows[:, :, 2:] - smooth_rows[:, :, :-2]
+    sobely = smooth_cols[:, 2:, :] - smooth_cols[:, :-2, :]
+    magnitude_sq = sobelx.astype(np.int64) ** 2 + sobely.astype(np.int64) ** 2
+    bins = np.searchsorted((np.arange(1, 32) * 8) ** 2, magnitude_sq, side='right')
+    bins[magnitude_sq > 256 ** 2] = 32
+    hist = _batch_bincount(bins, 33)[:, :32].astype(np.float64)
+    return hist / (hist.sum(axis=1, keepdims=True) + 1e-6)
+
+class LBPSampler:
+    """LBP uniform tervektorisasi (cermin dari src.features.texture); offset dan bobot bilinear disimpan per ukuran gambar."""
+    def __init__(self, points=LBP_POINTS, radius=LBP_RADIUS):
+        self.points, self.radius = points, radius
+        self.pad = int(np.ceil(radius)) + 1
+        self._samplings = {}
+    def _sampling(self, height, width):
+        if (height, width) not in self._samplings:
+            angles = 2 * np.pi * np.arange(self.points, dtype=np.float64) / self.points
+            rows, cols = np.arange(height, dtype=np.float64), np.arange(width, dtype=np.float64)
+            sampling = []
+            for dr, dc in zip(np.round(-self.radius * np.sin(angles), 5), np.round(self.radius * np.cos(angles), 5)):
+                r, c = rows + dr, cols + dc
+                frac_r, frac_c = (r - np.floor(r))[:, None], (c - np.floor(c))[None, :]
+                sampling.append((int(np.floor(r[0])) + self.pad, int(np.ceil(r[0])) + self.pad,
+                                 int(np.floor(c[0])) + self.pad, int(np.ceil(c[0])) + self.pad,
+                                 (1 - frac_r, frac_r) if frac_r.any() else None,
+                                 (1 - frac_c, frac_c) if frac_c.any() else None))
+            self._samplings[(height, width)] = sampling
+        return self._samplings[(height, width)]
+    def codes(self, gray_stack):
+        """Kode LBP uniform (N, H, W) yang identik dengan local_binary_pattern(..., method='uniform')."""
+        n_images, height, width = gray_stack.shape
+        pad = self.pad
+        image = np.zeros((n_images, height + 2 * pad, width + 2 * pad))
+        image[:, pad:pad + height, pad:pad + width] = gray_stack
+        center = image[:, pad:pad + height, pad:pad + width]
+        shape = (n_images, height, width)
+        top, bottom, scratch = np.empty(shape), np.empty(shape), np.empty(shape)
+        bit, previous = np.empty(shape, dtype=bool), np.empty(shape, dtype=bool)
+        ones, changes = np.zeros(shape, dtype=np.uint8), np.zeros(shape, dtype=np.uint8)
+        window = lambda r, c: image[:, r:r + height, c:c + width]
+        for i, (r0, r1, c0, c1, weight_r, weight_c) in enumerate(self._sampling(height, width)):
+            if weight_c is None:
+                upper, lower = window(r0, c0), window(r1, c0)
+            else:
+                np.multiply(weight_c[0], window(r0, c0), out=top)
+                top += np.multiply(weight_c[1], window(r0, c1), out=scratch)
+                np.multiply(weight_c[0], window(r1, c0), out=bottom)
+                bottom += np.multiply(weight_c[1], window(r1, c1), out=scratch)
+                upper, lower = top, bottom
+            if weight_r is None:
+                texture = upper
+            else:
+                np.multiply(weight_r[0], upper, out=scratch)
+                texture = np.multiply(weight_r[1], lower, out=bottom if weight_c is not None else top)
+                texture += scratch
+            np.greater_equal(texture, center, out=bit)
+            ones += bit
+            if i:
+                changes += bit != previous
+            bit, previous = previous, bit
+        return np.where(changes <= 2, ones, np.uint8(self.points + 1))
+
+LBP_SAMPLER = LBPSampler()
+TEXTURE_CHUNK_SIZE = 4
+
+@timed('extract_lbp_batch')
+def lbp_histogram_batch(gray_stack):
+    """Histogram LBP uniform untuk tumpukan gambar uint8."""
+    codes = np.concatenate([LBP_SAMPLER.codes(gray_stack[start:start + TEXTURE_CHUNK_SIZE])
+                            for start in range(0, len(gray_stack), TEXTURE_CHUNK_SIZE)])
+    hist = _batch_bincount(codes, LBP_POINTS + 2).astype(np.float64)
+    return hist / (hist.sum(axis=1, keepdims=True) + 1e-6)
+
+def quantize_gray(gray, levels=GLCM_LEVELS):
+    """Kuantisasi grayscale uint8 ke `levels` tingkat keabuan (tanpa perubahan untuk 256)."""
+    return gray if levels == 256 else ((gray.astype(np.uint16) * levels) >> 8).astype(np.uint8)
+
+_GLCM_OFFSETS = [(int(round(np.sin(a) * d)), int(round(np.cos(a) * d))) for d in GLCM_DISTANCES for a in GLCM_ANGLES]
+_GLCM_DIFFS = np.arange(GLCM_LEVELS, dtype=np.float64)
+_GLCM_DIFF_WEIGHTS = np.stack([_GLCM_DIFFS ** 2, _GLCM_DIFFS, 1.0 / (1.0 + _GLCM_DIFFS ** 2)], axis=1)
+
+def _glcm_chunk(gray_stack):
+    """Enam properti GLCM simetris dalam satu lintasan: histogram |i - j|, jumlah pasangan, dan hitungan co-occurrence untuk ASM."""
+    n_images, height, width = gray_stack.shape
+    levels = GLCM_LEVELS
+    image = gray_stack.astype(np.int64)
+    pair_base = (np.arange(n_images, dtype=np.int64) * levels * levels)[:, None]
+    diff_base = (np.arange(n_images, dtype=np.int64) * levels)[:, None]
+    props = np.empty((6, n_images, len(_GLCM_OFFSETS)))
+    for p, (dr, dc) in enumerate(_GLCM_OFFSETS):
+        rows = slice(max(0, -dr), min(height, height - dr))
+        cols = slice(max(0, -dc), min(width, width - dc))
+        src = image[:, rows, cols].reshape(n_images, -1)
+        dst = image[:, rows.start + dr:rows.stop + dr, cols.start + dc:cols.stop + dc].reshape(n_images, -1)
+        total = 2.0 * src.shape[1]
+        diff_hist = np.bincount((np.abs(src - dst) + diff_base).ravel(), minlength=n_images * levels)
+        contrast, dissimilarity, homogeneity = (diff_hist.reshape(n_images, levels) @ _GLCM_DIFF_WEIGHTS).T * (2.0 / total)
+        mean = (src.sum(axis=1) + dst.sum(axis=1)) / total
+        variance = np.maximum((np.einsum('nk,nk->n', src, src) + np.einsum('nk,nk->n', dst, dst)) / total - mean ** 2, 0.0)
+        covariance = 2.0 * np.einsum('nk,nk->n', src, dst) / total - mean ** 2
+        degenerate = np.sqrt(variance) < 1e-15
+        correlation = np.where(degenerate, 1.0, covariance / np.where(degenerate, 1.0, variance))
+        counts = np.bincount((src * levels + dst + pair_base).ravel(), minlength=n_images * levels * levels)
+        counts = counts.reshape(n_images, levels, levels)
+        symmetric = counts + counts.transpose(0, 2, 1)
+        asm = np.einsum('nij,nij->n', symmetric, symmetric) / total ** 2
+        props[:, :, p] = (contrast, dissimilarity, homogeneity, np.sqrt(asm), correlation, asm)
+    return props.transpose(1, 0, 2).reshape(n_images, -1)
+
+@timed('extract_glcm_batch')
+def glcm_features_batch(gray_stack):
+    """Properti GLCM (contrast, dissimilarity, homogeneity, energy, correlation, ASM) untuk tumpukan gambar."""
+    quantized = quantize_gray(gray_stack)
+    return np.vstack([_glcm_chunk(quantized[start:start + TEXTURE_CHUNK_SIZE])
+                      for start in range(0, len(quantized), TEXTURE_CHUNK_SIZE)])
+
+@timed('extract_hog_batch')
+def hog_features_batch(gray_float_stack):
+    """HOG (L2-Hys, transform_sqrt) untuk tumpukan gambar grayscale float32, setara skimage."""
+    n_images, height, width = gray_float_stack.shape
+    c_row, c_col = HOG_PIXELS_PER_CELL
+    b_row, b_col = HOG_CELLS_PER_BLOCK
+    n_cells_row, n_cells_col = height // c_row, width // c_col
+    image = np.sqrt(gray_float_stack)
+    g_row = np.zeros_like(image)
+    g_col = np.zeros_like(image)
+    g_row[:, 1:-1, :] = image[:, 2:, :] - image[:, :-2, :]
+    g_col[:, :, 1:-1] = image[:, :, 2:] - image[:, :, :-2]
+    g_row, g_col = g_row.astype(np.float64), g_col.astype(np.float64)
+    magnitude = np.hypot(g_col, g_row)
+    orientation = np.rad2deg(np.arctan2(g_row, g_col)) % 180
+    bin_width = 180.0 / HOG_ORIENTATIONS
+    bins = np.floor(orientation / bin_width).astype(np.int64)
+    bins[orientation < bins * bin_width] -= 1
+    bins[orientation >= (bins + 1) * bin_width] += 1
+    valid = (bins >= 0) & (bins < HOG_ORIENTATIONS)
+    cropped = (slice(None), slice(0, n_cells_row * c_row), slice(0, n_cells_col * c_col))
+    cell_index = ((np.arange(n_cells_row * c_row) // c_row)[:, None] * n_cells_col
+                  + (np.arange(n_cells_col * c_col) // c_col)[None, :]) * HOG_ORIENTATIONS
+    n_cell_bins = n_cells_row * n_cells_col * HOG_ORIENTATIONS
+    flat_index = cell_index[None] + np.where(valid, bins, 0)[cropped] + (np.arange(n_images) * n_cell_bins)[:, None, None]
+    histogram = np.bincount(flat_index.ravel(), weights=np.where(valid, magnitude, 0.0)[cropped].ravel(),
+                            minlength=n_images * n_cell_bins)
+    histogram = histogram.reshape(n_images, n_cells_row, n_cells_col, HOG_ORIENTATIONS) / (c_row * c_col)
+    n_blocks_row, n_blocks_col = n_cells_row - b_row + 1, n_cells_col - b_col + 1
+    blocks = np.empty((n_images, n_blocks_row, n_blocks_col, b_row, b_col, HOG_ORIENTATIONS))
+    for r in range(b_row):
+        for c in range(b_col):
+            blocks[:, :, :, r, c, :] = histogram[:, r:r + n_blocks_row, c:c + n_blocks_col, :]
+    eps = 1e-5
+    blocks = blocks.reshape(n_images, n_blocks_row, n_blocks_col, -1)
+    blocks = blocks / np.sqrt(np.sum(blocks ** 2, axis=3, keepdims=True) + eps ** 2)
+    blocks = np.minimum(blocks, 0.2)
+    blocks = blocks / np.sqrt(np.sum(blocks ** 2, axis=3, keepdims=True) + eps ** 2)
+    return blocks.reshape(n_images, -1)
+
+@timed('extract_features_batch')
+def extract_features_batch(images, chunk_size=64):
+    """Mengekstrak matriks fitur float32 (N, D) untuk tumpukan gambar uint8 (N, 128, 128, 3)."""
+    images = np.asarray(images)
+    if images.ndim != 4 or images.shape[3] != 3 or images.dtype != np.uint8:
+        raise ValueError(f"Diharapkan tumpukan uint8 (N, H, W, 3), diterima {images.shape} {images.dtype}")
+    n_images, height, width, _ = images.shape
+    blocks = []
+    for start in range(0, n_images, chunk_size):
+        chunk = np.ascontiguousarray(images[start:start + chunk_size])
+        n_chunk = chunk.shape[0]
+        tall = chunk.reshape(n_chunk * height, width, 3)
+        gray = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(n_chunk, height, width)
+        hsv = cv2.cvtColor(tall, cv2.COLOR_BGR2HSV).reshape(n_chunk, height, width, 3)
+        lab = cv2.cvtColor(tall, cv2.COLOR_BGR2Lab).reshape(n_chunk, height, width, 3)
+        features = np.hstack([
+            hog_features_batch(gray.astype(np.float32) / 255.0),
+            color_histogram_batch(hsv),
+            lbp_histogram_batch(gray),
+            GABOR_BANK.extract_batch(gray),
+            sobel_histogram_batch(gray),
+            glcm_features_batch(gray),
+            color_moments_batch(lab),
+        ])
+        blocks.append(np.nan_to_num(features).astype(np.float32))
+    if not blocks:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(np.vstack(blocks))
+
+@timed('extract_cheap_batch')
+def cheap_features_batch(images):
+    """Deskriptor murah float32 (N, D_murah) untuk tumpukan gambar uint8 (N, 128, 128, 3)."""
+    n_images, height, width, _ = images.shape
+    tall = np.ascontiguousarray(images).reshape(n_images * height, width, 3)
+    gray = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(n_images, height, width)
+    hsv = cv2.cvtColor(tall, cv2.COLOR_BGR2HSV).reshape(n_images, height, width, 3)
+    lab = cv2.cvtColor(tall, cv2.COLOR_BGR2Lab).reshape(n_images, height, width, 3)
+    features = np.hstack([color_histogram_batch(hsv), sobel_histogram_batch(gray), color_moments_batch(lab)])
+    return np.nan_to_num(features).astype(np.float32)
+
 class IntegratedClassifier(BaseEstimator, ClassifierMixin):
     def __init__(self, C=1.0, gamma='scale'):
         self.C = C
@@ -149,19 +507,20 @@ class IntegratedClassifier(BaseEstimator, ClassifierMixin):
             SVC(kernel='rbf', C=self.C, gamma=self.gamma, probability=True, random_state=42, class_weight='balanced')
         )
     def _preprocess_and_extract(self, X_raw):
-        feature_list = []
-        for image in X_raw:
-            gray_img, color_img = preprocess_image_for_feature_extraction(image)
-            features = extract_features(gray_img, color_img)
-            feature_list.append(features)
-        return np.array(feature_list)
+        return extract_features_batch(preprocess_batch(X_raw))
     def fit(self, X_raw, y):
         X_features = self._preprocess_and_extract(X_raw)
         self.pipeline.fit(X_features, y)
         return self
     def predict(self, X_raw):
         X_features = self._preprocess_and_extract(X_raw)
-        return self.pipeline.predict(X_features)
+        return self.predict_from_features(X_features)
     def predict_proba(self, X_raw):
         X_features = self._preprocess_and_extract(X_raw)
+        return self.predict_proba_from_features(X_features)
+    def predict_from_features(self, X_features):
+        """Memprediksi kelas dari matriks fitur yang sudah diekstrak."""
+        return self.pipeline.predict(X_features)
+    def predict_proba_from_features(self, X_features):
+        """Memprediksi probabilitas kelas dari matriks fitur yang sudah diekstrak."""
         return self.pipeline.predict_proba(X_features)
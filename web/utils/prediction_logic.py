@@ -11,6 +11,8 @@ untuk mengidentifikasi kondisi cuaca campuran.
 import re
 import numpy as np
 
+from utils.metrics import timed
+
 def sanitize_for_filename(text):
     """
     Membersihkan dan mengubah teks prediksi menjadi nama berkas yang aman.
@@ -50,6 +52,7 @@ def sanitize_for_filename(text):
     s = re.split(r'[\s(]', s)[0]
     return s
 
+@timed('smart_predict')
 def smart_predict(confidences):
     """
     Menganalisis distribusi probabilitas untuk menghasilkan prediksi yang cerdas.
@@ -0,0 +1,285 @@
+"""
+Modul cache hasil prediksi berbasis hash konten gambar.
+
+Gambar yang identik (dikirim ulang oleh pengguna atau kamera) tidak perlu
+melewati detektor anomali, ekstraksi fitur, dan SVC lagi. Kunci cache adalah
+hash input model 128x128 yang sudah di-resize ditambah versi model, sehingga
+hasil lama otomatis tidak terpakai saat model diganti. Nilai yang disimpan
+adalah putusan anomali dan vektor probabilitas kelas.
+
+Tersedia dua backend:
+- `MemoryResultCache`: LRU dalam proses dengan batas jumlah entri dan memori.
+- `SQLiteResultCache`: berkas SQLite lokal yang dapat dibagi antar proses
+  pekerja (misalnya beberapa worker gunicorn), dengan eviksi LRU perkiraan.
+
+Cache hanyalah akselerator: kegagalan backend (misalnya "database is locked")
+diperlakukan sebagai miss atau penulisan yang dilewati dan dihitung di metrik
+`weather_result_cache_errors_total`, tanpa menggagalkan permintaan pengguna.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.metrics import METRICS
+
+
+# Perkiraan overhead per entri (objek tuple, kunci, dan node OrderedDict) dalam byte.
+_ENTRY_OVERHEAD = 256
+
+
+def model_version(*paths):
+    """
+    Menghitung versi model dari isi berkas-berkas model.
+
+    Args:
+        *paths (str): Path berkas model (misalnya model klasifikasi dan detektor anomali).
+
+    Returns:
+        str: Hash heksadesimal pendek dari isi seluruh berkas.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+class _ResultCache:
+    """Dasar bersama: pembuatan kunci dan penghitung hit/miss."""
+
+    def __init__(self, version):
+        self.version = version.encode('utf-8')
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, resized_image):
+        """
+        Membuat kunci cache dari input model yang sudah di-resize.
+
+        Args:
+            resized_image (np.ndarray): Gambar uint8 128x128 hasil `resize_image`.
+
+        Returns:
+            str: Kunci heksadesimal (hash konten dan versi model).
+        """
+        digest = hashlib.blake2b(self.version, digest_size=16)
+        digest.update(np.ascontiguousarray(resized_image).data)
+        return digest.hexdigest()
+
+    def _count(self, hit):
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        """Mengembalikan penghitung hit/miss dan ukuran cache."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'entries': len(self),
+        }
+
+
+class MemoryResultCache(_ResultCache):
+    """
+    Cache LRU dalam memori proses dengan batas jumlah entri dan ukuran memori.
+
+    Attributes:
+        max_entries (int): Jumlah entri maksimum.
+        max_bytes (int): Perkiraan ukuran memori maksimum dalam byte.
+    """
+
+    def __init__(self, version, max_entries=4096, max_bytes=16 * 1024 * 1024):
+        super().__init__(version)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _entry_size(key, scores):
+        return _ENTRY_OVERHEAD + len(key) + (scores.nbytes if scores is not None else 0)
+
+    def get(self, key):
+        """
+        Mengambil hasil dari cache.
+
+        Args:
+            key (str): Kunci hasil `key`.
+
+        Returns:
+            tuple or None: (is_anomaly, confidence_scores), atau None jika tidak ada.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self._count(entry is not None)
+        return entry
+
+    def put(self, key, is_anomaly, confidence_scores):
+        """
+        Menyimpan hasil ke cache dan membuang entri yang paling lama tidak dipakai.
+
+        Args:
+            key (str): Kunci hasil `key`.
+            is_anomaly (bool): Putusan detektor anomali.
+            confidence_scores (np.ndarray or None): Probabilitas kelas, None untuk anomali.
+        """
+        if confidence_scores is not None:
+            confidence_scores = np.array(confidence_scores, dtype=np.float64)
+        size = self._entry_size(key, confidence_scores)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_size(key, old[1])
+            self._entries[key] = (bool(is_anomaly), confidence_scores)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                old_key, (_, old_scores) = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(old_key, old_scores)
+
+    def stats(self):
+        stats = super().stats()
+        stats['bytes'] = self._bytes
+        return stats
+
+
+class SQLiteResultCache(_ResultCache):
+    """
+    Cache LRU dalam berkas SQLite yang dapat dibagi antar proses pekerja.
+
+    Setiap thread memakai koneksinya sendiri. Penghitung hit/miss bersifat
+    per proses.
+
+    Agar pembacaan tidak menjadi penulisan yang berebut kunci antar pekerja,
+    waktu akses terakhir hanya diperbarui jika sudah lebih lama dari
+    `touch_interval` detik (LRU dengan resolusi tersebut). Jumlah entri
+    dilacak secara perkiraan per proses; `COUNT(*)` dan eviksi hanya berjalan
+    saat perkiraan melewati `max_entries`, lalu cache dipangkas hingga
+    `evict_fraction` di bawah batas agar eviksi berikutnya tidak langsung terjadi.
+
+    Attributes:
+        path (str): Path berkas SQLite.
+        max_entries (int): Jumlah entri maksimum.
+        touch_interval (float): Resolusi pembaruan waktu akses (detik).
+        evict_fraction (float): Proporsi `max_entries` yang dibuang sekaligus saat eviksi.
+    """
+
+    def __init__(self, version, path, max_entries=65536, touch_interval=60.0, evict_fraction=0.1):
+        super().__init__(version)
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.evict_fraction = evict_fraction
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, is_anomaly INTEGER NOT NULL, scores BLOB, last_access REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        self._approx_entries = connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _connection(self):
+        """Mengambil koneksi milik thread saat ini (dibuat saat pertama dipakai)."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def __len__(self):
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        except sqlite3.Error:
+            return self._approx_entries
+
+    @staticmethod
+    def _error(operation, error):
+        """Mencatat kegagalan backend; cache dilewati untuk operasi ini."""
+        print(f"Cache hasil SQLite gagal ({operation}): {error}")
+        METRICS.inc('weather_result_cache_errors_total', {'operation': operation})
+
+    def get(self, key):
+        """
+        Mengambil hasil dari cache dan memperbarui waktu akses terakhir jika sudah usang.
+
+        Args:
+            key (str): Kunci hasil `key`.
+
+        Returns:
+            tuple or None: (is_anomaly, confidence_scores), atau None jika tidak ada
+                           atau backend gagal.
+        """
+        try:
+            connection = self._connection()
+            row = connection.execute("SELECT is_anomaly, scores, last_access FROM results WHERE key = ?",
+                                     (key,)).fetchone()
+            now = time.time()
+            if row is not None and now - row[2] > self.touch_interval:
+                connection.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            self._error('get', e)
+            row = None
+        self._count(row is not None)
+        if row is None:
+            return None
+        scores = np.frombuffer(row[1], dtype=np.float64) if row[1] is not None else None
+        return bool(row[0]), scores
+
+    def put(self, key, is_anomaly, confidence_scores):
+        """
+        Menyimpan hasil ke cache dan membuang entri yang paling lama tidak dipakai.
+
+        Args:
+            key (str): Kunci hasil `key`.
+            is_anomaly (bool): Putusan detektor anomali.
+            confidence_scores (np.ndarray or None): Probabilitas kelas, None untuk anomali.
+        """
+        blob = None
+        if confidence_scores is not None:
+            blob = np.ascontiguousarray(confidence_scores, dtype=np.float64).tobytes()
+        try:
+            connection = self._connection()
+            connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                               (key, int(bool(is_anomaly)), blob, time.time()))
+            with self._counter_lock:
+                self._approx_entries += 1
+                check = self._approx_entries > self.max_entries
+            if check:
+                self._evict(connection)
+        except sqlite3.Error as e:
+            self._error('put', e)
+
+    def _evict(self, connection):
+        """Menghitung ulang jumlah entri dan membuang entri paling lama hingga di bawah batas."""
+        count = connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        target = int(self.max_entries * (1.0 - self.evict_fraction))
+        if count > self.max_entries:
+            connection.execute("DELETE FROM results WHERE key IN "
+                               "(SELECT key FROM results ORDER BY last_access ASC LIMIT ?)", (count - target,))
+            count = target
+        with self._counter_lock:
+            self._approx_entries = count
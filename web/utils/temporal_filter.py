@@ -0,0 +1,177 @@
+"""
+Modul pelewatan frame temporal untuk mode kamera langsung.
+
+Frame berurutan dari kamera luar ruangan yang diam hampir identik, tetapi
+sebelumnya setiap frame tetap melalui decode penuh, ekstraksi fitur, dan dua
+SVC. `TemporalFilter` menyimpan status per klien dan memutuskan apakah
+inferensi perlu dijalankan ulang:
+
+1. Setiap frame diringkas menjadi tanda tangan grayscale kecil (32x32). Untuk
+   JPEG, decoding memakai mode draft PIL sehingga hanya koefisien DCT skala
+   1/8 yang di-decode. Biayanya jauh lebih kecil daripada decode penuh.
+2. Tanda tangan dibandingkan (rata-rata selisih absolut) dengan tanda tangan
+   frame terakhir yang benar-benar diinferensi, sehingga perubahan perlahan
+   tetap terakumulasi hingga melewati ambang.
+3. Jika adegan tidak berubah dan hasil terakhir belum melewati batas
+   kedaluwarsa, hasil sebelumnya dipakai ulang tanpa inferensi.
+
+Probabilitas kelas dapat dihaluskan dengan EMA sebelum `smart_predict`,
+sehingga prediksi tidak berkedip di antara dua kelas yang berdekatan.
+"""
+
+import io
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+
+SIGNATURE_SIZE = (32, 32)
+
+
+def frame_signature(frame_bytes, size=SIGNATURE_SIZE):
+    """
+    Menghitung tanda tangan grayscale kecil dari byte gambar frame.
+
+    Args:
+        frame_bytes (bytes): Isi berkas JPEG atau PNG.
+        size (tuple): Ukuran tanda tangan (lebar, tinggi).
+
+    Returns:
+        np.ndarray: Array float32 berukuran (tinggi, lebar) bernilai 0-255.
+    """
+    with Image.open(io.BytesIO(frame_bytes)) as img:
+        if img.format == 'JPEG':
+            # Decode langsung pada skala DCT terkecil yang masih lebih besar dari tanda tangan.
+            img.draft('L', (size[0] * 2, size[1] * 2))
+        small = img.convert('L').resize(size, Image.BILINEAR)
+    return np.asarray(small, dtype=np.float32)
+
+
+class TemporalFilter:
+    """
+    Status temporal satu klien kamera: tanda tangan, hasil terakhir, dan EMA probabilitas.
+
+    Attributes:
+        classes (list of str): Daftar nama kelas sesuai urutan label model.
+        change_threshold (float): Rata-rata selisih absolut (skala 0-255) minimum agar
+                                  adegan dianggap berubah.
+        max_staleness (float): Umur maksimum (detik) hasil yang dipakai ulang.
+        ema_alpha (float or None): Bobot frame baru pada EMA probabilitas; None menonaktifkan.
+    """
+
+    def __init__(self, classes, change_threshold=4.0, max_staleness=10.0, ema_alpha=0.5):
+        self.classes = list(classes)
+        self.change_threshold = change_threshold
+        self.max_staleness = max_staleness
+        self.ema_alpha = ema_alpha
+        self._lock = threading.Lock()
+        self._signature = None
+        self._result = None
+        self._ema = None
+        self._inferred_at = 0.0
+        self.last_active = time.monotonic()
+        self.inferred = 0
+        self.reused = 0
+
+    def reuse(self, signature):
+        """
+        Mengembalikan hasil sebelumnya jika adegan belum berubah dan hasilnya belum kedaluwarsa.
+
+        Args:
+            signature (np.ndarray): Tanda tangan frame dari `frame_signature`.
+
+        Returns:
+            tuple or None: (is_anomaly, all_confidences) yang dipakai ulang, atau None jika
+                           inferensi perlu dijalankan.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.last_active = now
+            if (self._result is None or self._signature.shape != signature.shape
+                    or now - self._inferred_at > self.max_staleness
+                    or float(np.abs(signature - self._signature).mean()) > self.change_threshold):
+                return None
+            self.reused += 1
+            return self._result
+
+    def update(self, signature, is_anomaly, all_confidences):
+        """
+        Menyimpan hasil inferensi baru dan menghaluskan probabilitasnya dengan EMA.
+
+        Args:
+            signature (np.ndarray): Tanda tangan frame yang diinferensi.
+            is_anomaly (bool): Putusan detektor anomali.
+            all_confidences (list of tuple or None): Kepercayaan per kelas yang sudah diurutkan.
+
+        Returns:
+            tuple: (is_anomaly, all_confidences) setelah penghalusan.
+        """
+        with self._lock:
+            self._signature = signature
+            self._inferred_at = self.last_active = time.monotonic()
+            self.inferred += 1
+            if is_anomaly:
+                # Anomali memutus riwayat; EMA dimulai ulang dari frame normal berikutnya.
+                self._ema = None
+                self._result = (True, None)
+                return self._result
+            if self.ema_alpha is not None:
+                scores = dict(all_confidences)
+                probabilities = np.array([scores[name] for name in self.classes], dtype=np.float64)
+                if self._ema is None:
+                    self._ema = probabilities
+                else:
+                    self._ema = self.ema_alpha * probabilities + (1.0 - self.ema_alpha) * self._ema
+                all_confidences = sorted(
+                    [(name, round(float(score), 2)) for name, score in zip(self.classes, self._ema)],
+                    key=lambda item: item[1], reverse=True
+                )
+            self._result = (False, all_confidences)
+            return self._result
+
+
+class TemporalFilterStore:
+    """
+    Kumpulan `TemporalFilter` per ID klien dengan batas jumlah klien dan kedaluwarsa idle.
+
+    Attributes:
+        max_clients (int): Jumlah klien maksimum; klien yang paling lama tidak aktif dibuang.
+        idle_timeout (float): Status klien yang idle melebihi ini (detik) dibuang.
+    """
+
+    def __init__(self, classes, max_clients=256, idle_timeout=60.0, **filter_kwargs):
+        self.classes = classes
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.filter_kwargs = filter_kwargs
+        self._filters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._filters)
+
+    def new_filter(self):
+        """Membuat filter baru dengan parameter store (misalnya untuk satu sesi streaming)."""
+        return TemporalFilter(self.classes, **self.filter_kwargs)
+
+    def get(self, client_id):
+        """
+        Mengambil (atau membuat) filter milik klien.
+
+        Args:
+            client_id (str): ID klien kamera.
+
+        Returns:
+            TemporalFilter: Filter temporal klien.
+        """
+        with self._lock:
+            temporal = self._filters.pop(client_id, None)
+            if temporal is None or time.monotonic() - temporal.last_active > self.idle_timeout:
+                temporal = self.new_filter()
+            self._filters[client_id] = temporal
+            while len(self._filters) > self.max_clients:
+                self._filters.popitem(last=False)
+            return temporal